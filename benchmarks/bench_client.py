@@ -0,0 +1,85 @@
+"""
+Микробенчмарк Client.from_json: пропускная способность разбора и память на объект.
+
+Запуск: python benchmarks/bench_client.py [--count 20000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wg_easy_api_wrapper.client import Client  # noqa: E402
+
+
+def make_payload(count: int) -> list:
+    """Строит список клиентов в формате ответа /api/wireguard/client."""
+    return [
+        {
+            "id": f"00000000-0000-4000-8000-{i:012d}",
+            "name": f"peer-{i}",
+            "enabled": i % 7 != 0,
+            "address": f"10.8.{i // 250}.{i % 250 + 2}",
+            "publicKey": f"pk{i:042d}=",
+            "createdAt": "2024-03-01T10:15:30.123Z",
+            "updatedAt": "2024-06-11T08:01:02.456Z",
+            "expiredAt": None,
+            "persistentKeepalive": "off",
+            "latestHandshakeAt": "2024-06-12T21:45:00.789Z" if i % 3 else None,
+            "transferRx": i * 1024,
+            "transferTx": i * 512,
+        }
+        for i in range(count)
+    ]
+
+
+def bench_parse(payload: list, repeat: int) -> float:
+    """Лучшее время разбора всего списка, в секундах."""
+    return min(timeit.repeat(
+        lambda: [Client.from_json(item, None, None) for item in payload],
+        number=1,
+        repeat=repeat,
+    ))
+
+
+def bench_parse_and_access(payload: list, repeat: int) -> float:
+    """Лучшее время разбора с обращением ко всем датам, в секундах."""
+    def run():
+        for client in [Client.from_json(item, None, None) for item in payload]:
+            client.created_at, client.updated_at, client.last_handshake_at
+    return min(timeit.repeat(run, number=1, repeat=repeat))
+
+
+def bench_memory(payload: list) -> float:
+    """Память на один объект Client в байтах (без исходного JSON)."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    clients = [Client.from_json(item, None, None) for item in payload]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del clients
+    return total / len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = make_payload(args.count)
+    parse = bench_parse(payload, args.repeat)
+    access = bench_parse_and_access(payload, args.repeat)
+    memory = bench_memory(payload)
+
+    print(f"clients:               {args.count}")
+    print(f"from_json:             {args.count / parse:,.0f} clients/s ({parse * 1000:.1f} ms)")
+    print(f"from_json + dates:     {args.count / access:,.0f} clients/s ({access * 1000:.1f} ms)")
+    print(f"memory per client:     {memory:,.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Время запуска wg-cli: импорт модуля CLI и wg-cli --help в новом процессе.
+
+Кроме времени проверяется, что для справки не загружаются тяжёлые модули
+(aiohttp, asyncio, dotenv): их появление - регрессия ленивой загрузки.
+
+Запуск: python benchmarks/bench_startup.py [--repeat 10]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модули, которые не должны загружаться ради справки
+HEAVY_MODULES = ("aiohttp", "asyncio", "dotenv", "yarl", "multidict")
+
+IMPORT_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+import wg_easy_api_wrapper.cli
+print(time.perf_counter() - started)
+"""
+
+HELP_MODULES_SCRIPT = """
+import sys
+from wg_easy_api_wrapper.cli import cli
+try:
+    cli(["--help"], obj={})
+except SystemExit:
+    pass
+print(",".join(name for name in %r if name in sys.modules), file=sys.stderr)
+""" % (HEAVY_MODULES,)
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def _wall_time(arguments: List[str], repeat: int) -> float:
+    """Лучшее время выполнения процесса из repeat прогонов."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *arguments],
+            env=_env(),
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _import_time(repeat: int) -> float:
+    """Лучшее время импорта wg_easy_api_wrapper.cli, измеренное внутри процесса."""
+    best = float("inf")
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_SCRIPT],
+            env=_env(), cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        best = min(best, float(output))
+    return best
+
+
+def heavy_modules_on_help() -> List[str]:
+    """Тяжёлые модули, загруженные при выводе wg-cli --help."""
+    output = subprocess.run(
+        [sys.executable, "-c", HELP_MODULES_SCRIPT],
+        env=_env(), cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stderr.strip()
+    return output.split(",") if output else []
+
+
+def bench_startup(repeat: int = 10) -> Dict[str, dict]:
+    """Метрики запуска в формате benchmarks/run.py."""
+    def _result(value: float, unit: str) -> dict:
+        return {"value": round(value, 6), "unit": unit, "better": "lower"}
+
+    return {
+        "startup_python": _result(_wall_time(["-c", "pass"], repeat), "s"),
+        "startup_import_cli": _result(_import_time(repeat), "s"),
+        "startup_cli_help": _result(_wall_time(["-m", "wg_easy_api_wrapper.cli", "--help"], repeat), "s"),
+        "startup_command_help": _result(
+            _wall_time(["-m", "wg_easy_api_wrapper.cli", "get-conf", "--help"], repeat), "s",
+        ),
+        "startup_help_heavy_modules": _result(len(heavy_modules_on_help()), "modules"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    results = bench_startup(args.repeat)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    heavy = heavy_modules_on_help()
+    if heavy:
+        print(f"wg-cli --help загружает тяжёлые модули: {', '.join(heavy)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
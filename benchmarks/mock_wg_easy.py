@@ -0,0 +1,247 @@
+"""
+Локальная замена WG-Easy на aiohttp для бенчмарков и проверки без реального сервера.
+
+Реализует /api/session и /api/wireguard/client с запросами к отдельному
+клиенту. Число клиентов, задержка ответа и доля ошибок настраиваются.
+
+Запуск: python benchmarks/mock_wg_easy.py [--peers 1000] [--port 51821]
+        [--latency 0.005] [--jitter 0.002] [--error-rate 0.01]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import uuid
+from collections import Counter
+
+from aiohttp import web
+
+PASSWORD = "password"
+SESSION_COOKIE = "connect.sid"
+
+
+def _iso(moment: datetime.datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def _json_error(error_class, message: str):
+    return error_class(text=json.dumps({"error": message}), content_type="application/json")
+
+
+class MockWGEasy:
+    """
+    Сервер, повторяющий API WG-Easy v14 в памяти.
+
+    Задержка latency (плюс случайная добавка до jitter) применяется ко всем
+    запросам; с вероятностью error_rate запрос к /api/wireguard/* завершается
+    статусом error_status. Генератор случайных чисел детерминирован при
+    заданном seed, поэтому прогоны бенчмарков сопоставимы.
+    """
+
+    def __init__(
+        self,
+        peers: int = 100,
+        password: str = PASSWORD,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 0,
+    ):
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._sessions = set()
+        self._next_address = 0
+        self.clients = {}
+        self.requests = Counter()
+
+        now = datetime.datetime.utcnow()
+        for index in range(peers):
+            self.add_client(f"peer-{index}", now - datetime.timedelta(minutes=index))
+
+    def add_client(self, name: str, created: datetime.datetime = None, expired_at: str = None) -> dict:
+        created = created or datetime.datetime.utcnow()
+        uid = str(uuid.UUID(int=self._random.getrandbits(128), version=4))
+        index = self._next_address
+        self._next_address += 1
+        # Рукопожатие - между созданием и текущим моментом, не в будущем
+        handshake = created + (datetime.datetime.utcnow() - created) * self._random.random()
+        client = {
+            "id": uid,
+            "name": name,
+            "enabled": True,
+            "address": f"10.{8 + index // 62500}.{index // 250 % 250}.{index % 250 + 2}",
+            "publicKey": f"{uid.replace('-', '')[:43]}=",
+            "createdAt": _iso(created),
+            "updatedAt": _iso(created),
+            "expiredAt": expired_at,
+            "persistentKeepalive": "off",
+            "latestHandshakeAt": _iso(handshake) if self._random.random() < 0.7 else None,
+            "transferRx": self._random.randint(0, 10 ** 10),
+            "transferTx": self._random.randint(0, 10 ** 9),
+        }
+        self.clients[uid] = client
+        return client
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        resource = request.match_info.route.resource
+        self.requests[f"{request.method} {resource.canonical if resource else request.path}"] += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        if (
+            self.error_rate
+            and request.path.startswith("/api/wireguard/")
+            and self._random.random() < self.error_rate
+        ):
+            return web.json_response({"error": "Injected error"}, status=self.error_status)
+        return await handler(request)
+
+    def _authorize(self, request: web.Request):
+        if request.cookies.get(SESSION_COOKIE) not in self._sessions:
+            raise _json_error(web.HTTPUnauthorized, "Not Logged In")
+
+    def _client(self, request: web.Request) -> dict:
+        self._authorize(request)
+        client = self.clients.get(request.match_info["id"])
+        if client is None:
+            raise _json_error(web.HTTPNotFound, "Client Not Found")
+        return client
+
+    @staticmethod
+    def _touch(client: dict):
+        client["updatedAt"] = _iso(datetime.datetime.utcnow())
+
+    async def get_session(self, request: web.Request):
+        return web.json_response({
+            "requiresPassword": True,
+            "authenticated": request.cookies.get(SESSION_COOKIE) in self._sessions,
+        })
+
+    async def create_session(self, request: web.Request):
+        body = await request.json()
+        if body.get("password") != self.password:
+            return web.json_response({"error": "Incorrect Password"}, status=401)
+        session_id = uuid.uuid4().hex
+        self._sessions.add(session_id)
+        response = web.json_response({"success": True})
+        response.set_cookie(SESSION_COOKIE, session_id)
+        return response
+
+    async def delete_session(self, request: web.Request):
+        self._sessions.discard(request.cookies.get(SESSION_COOKIE))
+        return web.Response(status=204)
+
+    async def list_clients(self, request: web.Request):
+        self._authorize(request)
+        return web.json_response(list(self.clients.values()))
+
+    async def create_client(self, request: web.Request):
+        self._authorize(request)
+        body = await request.json()
+        if not body.get("name"):
+            raise _json_error(web.HTTPBadRequest, "Missing: Name")
+        self.add_client(body["name"], expired_at=body.get("expiredDate"))
+        return web.json_response({"success": True})
+
+    async def delete_client(self, request: web.Request):
+        client = self._client(request)
+        del self.clients[client["id"]]
+        return web.Response(status=204)
+
+    async def enable_client(self, request: web.Request):
+        client = self._client(request)
+        client["enabled"] = True
+        self._touch(client)
+        return web.json_response({"success": True})
+
+    async def disable_client(self, request: web.Request):
+        client = self._client(request)
+        client["enabled"] = False
+        self._touch(client)
+        return web.json_response({"success": True})
+
+    async def update_client(self, request: web.Request):
+        client = self._client(request)
+        field = request.match_info["field"]
+        if field not in ("name", "address", "expireDate"):
+            raise _json_error(web.HTTPNotFound, "Not Found")
+        body = await request.json()
+        if field == "expireDate":
+            client["expiredAt"] = body.get("expireDate")
+        else:
+            client[field] = body[field]
+        self._touch(client)
+        return web.json_response({"success": True})
+
+    async def client_configuration(self, request: web.Request):
+        client = self._client(request)
+        text = (
+            "[Interface]\n"
+            f"PrivateKey = {client['publicKey']}\n"
+            f"Address = {client['address']}/24\n"
+            "DNS = 1.1.1.1\n\n"
+            "[Peer]\n"
+            "PublicKey = server=\n"
+            "AllowedIPs = 0.0.0.0/0, ::/0\n"
+            "Endpoint = 127.0.0.1:51820\n"
+        )
+        return web.Response(text=text, headers={
+            "Content-Disposition": f'attachment; filename="{client["name"]}.conf"',
+        })
+
+    async def client_qr_code(self, request: web.Request):
+        client = self._client(request)
+        svg = f'<svg xmlns="http://www.w3.org/2000/svg"><text>{client["id"]}</text></svg>'
+        return web.Response(text=svg, content_type="image/svg+xml")
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        router = app.router
+        router.add_get("/api/session", self.get_session)
+        router.add_post("/api/session", self.create_session)
+        router.add_delete("/api/session", self.delete_session)
+        router.add_get("/api/wireguard/client", self.list_clients)
+        router.add_post("/api/wireguard/client", self.create_client)
+        router.add_delete("/api/wireguard/client/{id}", self.delete_client)
+        router.add_post("/api/wireguard/client/{id}/enable", self.enable_client)
+        router.add_post("/api/wireguard/client/{id}/disable", self.disable_client)
+        router.add_put("/api/wireguard/client/{id}/{field}", self.update_client)
+        router.add_get("/api/wireguard/client/{id}/configuration", self.client_configuration)
+        router.add_get("/api/wireguard/client/{id}/qrcode.svg", self.client_qr_code)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=51821)
+    parser.add_argument("--peers", type=int, default=100)
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка каждого ответа в секундах")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Случайная добавка к задержке, до N секунд")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля запросов, завершающихся ошибкой")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    mock = MockWGEasy(
+        peers=args.peers,
+        password=args.password,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+    web.run_app(mock.make_app(), host=args.host, port=args.port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
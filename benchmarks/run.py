@@ -0,0 +1,284 @@
+"""
+Набор бенчмарков против локального MockWGEasy (benchmarks/mock_wg_easy.py).
+
+Измеряет разбор списка клиентов, поиск клиента, массовые create/disable/
+enable/delete, время выполнения команд wg-cli и время его запуска
+(benchmarks/bench_startup.py). Результаты выводятся в JSON,
+который можно сравнить с сохранённым прогоном предыдущей версии.
+
+Запуск:
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --compare results.json [--threshold 0.1]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wg_easy_api_wrapper import Server  # noqa: E402
+from wg_easy_api_wrapper.client import Client  # noqa: E402
+
+from bench_startup import bench_startup  # noqa: E402
+
+MOCK = os.path.join(ROOT, "benchmarks", "mock_wg_easy.py")
+PASSWORD = "password"
+
+HIGHER = "higher"
+LOWER = "lower"
+
+
+def _result(value: float, unit: str, better: str) -> dict:
+    return {"value": round(value, 6), "unit": unit, "better": better}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock(args) -> Tuple[subprocess.Popen, str]:
+    """Запускает MockWGEasy в отдельном процессе и ждёт, пока он начнёт отвечать."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable, MOCK,
+            "--port", str(port),
+            "--peers", str(args.peers),
+            "--latency", str(args.latency),
+            "--error-rate", str(args.error_rate),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("MockWGEasy завершился при запуске.")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process, url
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("MockWGEasy не начал отвечать за 15 секунд.")
+
+
+async def bench_parse(url: str, repeat: int) -> Dict[str, dict]:
+    """Разбор списка без сети: json.loads + Client.from_json на готовом ответе."""
+    async with Server(url, PASSWORD) as server:
+        async with server._request("GET", "/api/wireguard/client") as response:
+            raw = await response.read()
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            clients = [Client.from_json(item, None, server) for item in json.loads(raw)]
+            best = min(best, time.perf_counter() - started)
+    return {"parse_offline": _result(len(clients) / best, "clients/s", HIGHER)}
+
+
+async def bench_list(url: str, repeat: int) -> Dict[str, dict]:
+    """get_clients и iter_clients целиком: запрос, чтение и разбор."""
+    results = {}
+    async with Server(url, PASSWORD) as server:
+        for name, fetch in (
+            ("get_clients", server.get_clients),
+            ("iter_clients", lambda: _collect(server.iter_clients())),
+        ):
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                clients = await fetch()
+                best = min(best, time.perf_counter() - started)
+            results[name] = _result(len(clients) / best, "clients/s", HIGHER)
+    return results
+
+
+async def _collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+async def bench_lookup(url: str, lookups: int, repeat: int) -> Dict[str, dict]:
+    """Задержка поиска по имени с кэшем клиентов и без него."""
+    randomizer = random.Random(0)
+    async with Server(url, PASSWORD, cache_ttl=3600) as server:
+        names = [client.name for client in await server.get_clients()]
+        timings = []
+        for name in randomizer.choices(names, k=lookups):
+            started = time.perf_counter()
+            await server.get_client_by_name(name)
+            timings.append(time.perf_counter() - started)
+    results = {
+        "lookup_cached_p50": _result(_percentile(timings, 0.5) * 1e6, "us", LOWER),
+        "lookup_cached_p95": _result(_percentile(timings, 0.95) * 1e6, "us", LOWER),
+    }
+
+    async with Server(url, PASSWORD) as server:
+        timings = []
+        for name in randomizer.choices(names, k=repeat):
+            started = time.perf_counter()
+            await server.get_client_by_name(name)
+            timings.append(time.perf_counter() - started)
+    results["lookup_uncached_p50"] = _result(statistics.median(timings) * 1000, "ms", LOWER)
+    return results
+
+
+async def bench_bulk(url: str, count: int, concurrency: int) -> Dict[str, dict]:
+    """Пропускная способность массовых операций над count новыми клиентами."""
+    results = {}
+    async with Server(url, PASSWORD) as server:
+        names = [f"bench-{index}" for index in range(count)]
+        started = time.perf_counter()
+        created = await server.create_clients(names, concurrency=concurrency)
+        results["bulk_create"] = _result(count / (time.perf_counter() - started), "ops/s", HIGHER)
+        clients = [client for client in created.values() if isinstance(client, Client)]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _each(operation):
+            async def _run(client):
+                async with semaphore:
+                    await operation(client)
+            begun = time.perf_counter()
+            await asyncio.gather(*(_run(client) for client in clients), return_exceptions=True)
+            return len(clients) / (time.perf_counter() - begun)
+
+        results["bulk_disable"] = _result(await _each(lambda client: client.disable()), "ops/s", HIGHER)
+        results["bulk_enable"] = _result(await _each(lambda client: client.enable()), "ops/s", HIGHER)
+        results["bulk_delete"] = _result(
+            await _each(lambda client: server.remove_client(client.uid)), "ops/s", HIGHER,
+        )
+    return results
+
+
+def bench_cli(url: str, repeat: int) -> Dict[str, dict]:
+    """Время выполнения команд wg-cli в отдельном процессе, лучший из repeat прогонов."""
+    env = dict(os.environ, WG_EASY_SERVER_URL=url, WG_EASY_PASSWORD=PASSWORD)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    results = {}
+    for name, arguments in (("cli_help", ["--help"]), ("cli_list_clients", ["list-clients"])):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "wg_easy_api_wrapper.cli", *arguments],
+                env=env,
+                cwd=ROOT,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            )
+            best = min(best, time.perf_counter() - started)
+        results[name] = _result(best, "s", LOWER)
+    return results
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Печатает сравнение с прошлым прогоном; возвращает имена ухудшившихся метрик."""
+    regressions = []
+    print(f"{'метрика':<22} {'было':>14} {'стало':>14} {'изменение':>10}")
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None or not old["value"]:
+            print(f"{name:<22} {'-':>14} {result['value']:>14.4g} {'':>10}")
+            continue
+        change = (result["value"] - old["value"]) / old["value"]
+        worse = change < -threshold if result["better"] == HIGHER else change > threshold
+        mark = "  хуже" if worse else ""
+        print(f"{name:<22} {old['value']:>14.4g} {result['value']:>14.4g} {change:>+9.1%}{mark}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--peers", type=int, default=5000, help="Число клиентов на MockWGEasy")
+    parser.add_argument("--bulk", type=int, default=200, help="Число клиентов в массовых операциях")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=2000, help="Число поисков с кэшем")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="Задержка MockWGEasy в секундах")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ошибок MockWGEasy")
+    parser.add_argument("--skip-cli", action="store_true", help="Не измерять время команд wg-cli")
+    parser.add_argument("--output", help="Файл для JSON с результатами; по умолчанию stdout")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Допустимое ухудшение при сравнении, доля (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    process, url = start_mock(args)
+    try:
+        results = {}
+        results.update(asyncio.run(bench_parse(url, args.repeat)))
+        results.update(asyncio.run(bench_list(url, args.repeat)))
+        results.update(asyncio.run(bench_lookup(url, args.lookups, args.repeat)))
+        results.update(asyncio.run(bench_bulk(url, args.bulk, args.concurrency)))
+        if not args.skip_cli:
+            results.update(bench_cli(url, min(args.repeat, 3)))
+            results.update(bench_startup(args.repeat))
+    finally:
+        process.terminate()
+        process.wait()
+
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "aiohttp": aiohttp.__version__,
+            "platform": platform.platform(),
+            "peers": args.peers,
+            "bulk": args.bulk,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"Ухудшились: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ from wg_easy_api_wrapper.errors import (
     AuthenticationError,
     AlreadyLoggedInError,
     ClientNotFoundError,
-    InvalidDateFormatError,
 )
 import datetime
 
@@ -35,15 +34,10 @@ async def main():
 
     try:
         async with Server(server_url, password) as server:
-            await server.update_client_expired_date(
-                uid=client_uid,
-                expired_date=new_expired_date
-            )
+            await server.update_client_expire_date(client_uid, new_expired_date)
             logger.info("Дата истечения клиента успешно обновлена.")
     except ClientNotFoundError as e:
         logger.error(f"Клиент не найден: {e}")
-    except InvalidDateFormatError as e:
-        logger.error(f"Неверный формат даты: {e}")
     except AuthenticationError as e:
         logger.error(f"Ошибка аутентификации: {e}")
     except AlreadyLoggedInError as e:
@@ -10,15 +10,20 @@ setup(
     long_description=open('README.md').read(),
     long_description_content_type='text/markdown',
     url='https://github.com/akadorkin/wg-easy-api-wrapper',
-    packages=find_packages(),
+    packages=find_packages(exclude=('tests', 'tests.*', 'benchmarks', 'benchmarks.*')),
     install_requires=[
         'aiohttp>=3.8.1',
         'python-dotenv>=0.19.2',
-        'cairosvg>=2.5.2'
     ],
+    extras_require={
+        'yaml': ['PyYAML>=5.1'],
+        'qr': ['segno>=1.5'],
+        'png': ['cairosvg>=2.5.2'],
+        'query': ['numpy>=1.20'],
+    },
     entry_points={
         'console_scripts': [
-            'wg-cli=cli:main',
+            'wg-cli=wg_easy_api_wrapper.cli:main',
         ],
     },
     classifiers=[
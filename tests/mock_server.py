@@ -0,0 +1,78 @@
+"""
+MockWGEasy из benchmarks.mock_wg_easy, запущенный на свободном порту внутри теста.
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+from aiohttp import web
+
+from benchmarks.mock_wg_easy import PASSWORD, MockWGEasy
+from wg_easy_api_wrapper.retry import RetryPolicy
+from wg_easy_api_wrapper.server import Server
+
+
+class FlakyMockWGEasy(MockWGEasy):
+    """MockWGEasy, отвечающий 503 на fail_next ближайших запросов к /api/wireguard/*."""
+
+    fail_next = 0
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        if self.fail_next and request.path.startswith("/api/wireguard/"):
+            self.fail_next -= 1
+            self.requests[f"{request.method} {request.match_info.route.resource.canonical}"] += 1
+            return web.json_response({"error": "Injected error"}, status=503)
+        return await MockWGEasy._middleware(self, request, handler)
+
+
+@asynccontextmanager
+async def serve(mock: MockWGEasy):
+    """Запускает mock и отдаёт его адрес."""
+    runner = web.AppRunner(mock.make_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        host, port = runner.addresses[0][:2]
+        yield f"http://{host}:{port}"
+    finally:
+        await runner.cleanup()
+
+
+@asynccontextmanager
+async def mock_server(peers: int = 10, mock_class=MockWGEasy, **server_kwargs):
+    """
+    Запускает mock с peers клиентами и входит в него; отдаёт (mock, server).
+    По умолчанию повторы выполняются без задержки.
+    """
+    server_kwargs.setdefault("retry", RetryPolicy(base_delay=0))
+    mock = mock_class(peers=peers)
+    async with serve(mock) as url:
+        async with Server(url, PASSWORD, **server_kwargs) as server:
+            yield mock, server
+
+
+@contextmanager
+def serve_in_thread(mock):
+    """Запускает mock в отдельном потоке, например для команд wg-cli со своим циклом событий."""
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    stop = asyncio.Event()
+    urls = []
+
+    async def _main():
+        async with serve(mock) as url:
+            urls.append(url)
+            started.set()
+            await stop.wait()
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(_main(),))
+    thread.start()
+    started.wait(5)
+    try:
+        yield urls[0]
+    finally:
+        loop.call_soon_threadsafe(stop.set)
+        thread.join(5)
+        loop.close()
@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+from wg_easy_api_wrapper.batch import ERROR, OK, SKIPPED, parse_operations, run_batch
+
+from .mock_server import mock_server
+
+
+def _lines(*operations):
+    return [json.dumps(operation) for operation in operations]
+
+
+def test_operations_on_one_client_run_in_order():
+    operations = parse_operations(_lines(
+        {"op": "create", "name": "alice", "id": "a1"},
+        {"op": "rename", "name": "alice", "new_name": "alice-laptop"},
+        {"op": "disable", "name": "alice-laptop"},
+        {"op": "disable", "name": "peer-0"},
+        {"op": "delete", "name": "peer-0"},
+        {"op": "enable", "name": "peer-0"},
+        {"op": "rename", "uid": "missing", "new_name": "x"},
+        {"op": "disable", "uid": "missing"},
+        {"op": "unknown"},
+    ))
+
+    async def scenario():
+        async with mock_server(peers=3) as (mock, server):
+            results = [result async for result in run_batch(server, operations, concurrency=4)]
+            by_line = {result["line"]: result for result in results}
+            assert len(results) == len(operations)
+            assert [by_line[line]["status"] for line in range(1, 10)] == [
+                OK, OK, OK, OK, OK, ERROR, ERROR, SKIPPED, ERROR,
+            ]
+            assert by_line[1]["id"] == "a1"
+
+            # Операции над одним клиентом завершаются в порядке строк
+            order = [result["line"] for result in results]
+            assert order.index(1) < order.index(2) < order.index(3)
+            assert order.index(4) < order.index(5)
+
+            state = {client["name"]: client for client in mock.clients.values()}
+            assert "peer-0" not in state and "alice" not in state
+            assert not state["alice-laptop"]["enabled"]
+            assert by_line[3]["uid"] == state["alice-laptop"]["id"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+from wg_easy_api_wrapper.cache import ClientCache
+
+from .mock_server import mock_server
+
+LIST = "GET /api/wireguard/client"
+
+
+def _client(uid, name):
+    return SimpleNamespace(uid=uid, name=name, public_key=f"key-{uid}", address=f"10.0.0.{uid}")
+
+
+def test_indexes_follow_rename_readdress_and_delete():
+    async def scenario():
+        async with mock_server(peers=5, cache_ttl=60) as (mock, server):
+            client = await server.get_client_by_name("peer-1")
+            lists = mock.requests[LIST]
+
+            await client.rename("renamed")
+            assert await server.get_client_by_name("peer-1") is None
+            assert await server.get_client_by_name("renamed") is client
+
+            old_address = client.address
+            await client.update_address("10.99.0.1")
+            assert await server.get_client_by_address(old_address) is None
+            assert await server.get_client_by_address("10.99.0.1") is client
+
+            await server.remove_client(client.uid)
+            assert await server.get_client(client.uid) is None
+            assert await server.get_client_by_public_key(client.public_key) is None
+            assert await server.get_client_by_name("peer-2") is not None
+
+            # Все изменения отражены в индексах без перечитывания списка
+            assert mock.requests[LIST] == lists
+            assert client.uid not in mock.clients
+
+    asyncio.run(scenario())
+
+
+def test_duplicate_name_passes_to_next_client():
+    cache = ClientCache(ttl=60)
+    first, second = _client("1", "dup"), _client("2", "dup")
+    cache.fill([first, second, _client("3", "other")])
+    assert cache.lookup("name", "dup") is first
+
+    first.name = "unique"
+    cache.reindex(first, old_name="dup")
+    assert cache.lookup("name", "dup") is second
+    assert cache.lookup("name", "unique") is first
+
+    cache.remove("2")
+    assert cache.lookup("name", "dup") is None
+    assert cache.lookup("address", "10.0.0.2") is None
+    assert len(cache.clients()) == 2
+
+
+def test_invalidate_forces_relist():
+    async def scenario():
+        async with mock_server(peers=3, cache_ttl=60) as (mock, server):
+            await server.get_client_by_name("peer-0")
+            await server.get_client_by_name("peer-1")
+            assert mock.requests[LIST] == 1
+            await server.create_client("new")
+            assert (await server.get_client_by_name("new")).name == "new"
+            assert mock.requests[LIST] == 2
+
+    asyncio.run(scenario())
+
+
+def test_analytics_ignore_fresh_cache():
+    async def scenario():
+        async with mock_server(peers=3, cache_ttl=300) as (mock, server):
+            await server.get_client_by_name("peer-0")
+            for client in mock.clients.values():
+                client["transferRx"] = 5 * 1024 ** 3
+                client["expiredAt"] = "2000-01-01T00:00:00.000Z"
+
+            stats = await server.stats()
+            assert stats.transfer_rx == 15 * 1024 ** 3
+            snapshot = await server.snapshot()
+            assert len(snapshot.query("rx >= 5G")) == 3
+            assert len(await server.expiring_within(1, include_expired=True)) == 3
+            assert mock.requests[LIST] == 4
+
+    asyncio.run(scenario())
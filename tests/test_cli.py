@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from wg_easy_api_wrapper.cli import COMMANDS, cli
+
+
+def _invoke(directory, value):
+    return CliRunner().invoke(
+        cli,
+        ['--cache-dir', str(directory / 'cache'), 'query', '--help'],
+        obj={},
+        env={'WG_EASY_CACHE_MAX_SIZE': value},
+    )
+
+
+@pytest.mark.parametrize("value", ["abc", "0", "1.5"])
+def test_invalid_cache_max_size_from_env_is_usage_error(tmp_path, monkeypatch, value):
+    # Рабочий каталог без .env, чтобы load_dotenv не подменил переменные
+    monkeypatch.chdir(tmp_path)
+    result = _invoke(tmp_path, value)
+    assert result.exit_code == 2, result.output
+    assert "WG_EASY_CACHE_MAX_SIZE" in result.output
+    assert result.exception is None or isinstance(result.exception, SystemExit)
+
+
+def test_cache_max_size_from_env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert _invoke(tmp_path, '8').exit_code == 0
+
+
+def test_cache_max_size_ignored_without_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('WG_EASY_CACHE_DIR', raising=False)
+    result = CliRunner().invoke(cli, ['query', '--help'], obj={}, env={'WG_EASY_CACHE_MAX_SIZE': 'abc'})
+    assert result.exit_code == 0, result.output
+
+
+def test_lazy_commands_resolve_to_their_modules():
+    ctx = click.Context(cli)
+    assert cli.list_commands(ctx) == sorted(COMMANDS)
+    for name in COMMANDS:
+        command = cli.get_command(ctx, name)
+        assert isinstance(command, click.Command)
+        assert command.name == name
+    assert cli.get_command(ctx, 'missing') is None
+
+
+@pytest.mark.parametrize("args", [['--help'], ['list-clients', '--help'], ['shell', '--help']])
+def test_help_does_not_import_aiohttp(tmp_path, args):
+    code = (
+        "import sys\n"
+        "from wg_easy_api_wrapper.cli import cli\n"
+        "try:\n"
+        "    cli(sys.argv[1:], obj={})\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "sys.exit('aiohttp' in sys.modules)\n"
+    )
+    # Отдельный процесс: в процессе pytest aiohttp уже импортирован другими тестами
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        cwd=tmp_path, env=dict(os.environ, PYTHONPATH=root), capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Usage" in result.stdout
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+
+from wg_easy_api_wrapper.client import Client, parse_timestamp, time_format, unix_time
+
+JSON = {
+    "id": "uid-1",
+    "name": "alice",
+    "enabled": True,
+    "address": "10.8.0.2",
+    "publicKey": "key",
+    "createdAt": "2024-03-01T10:15:30.123Z",
+    "updatedAt": "2024-03-02T00:00:00.5Z",
+    "expiredAt": "2024-04-01",
+    "latestHandshakeAt": None,
+    "persistentKeepalive": "off",
+    "transferRx": 1,
+    "transferTx": 2,
+}
+
+
+@pytest.mark.parametrize("value", [
+    "2024-03-01T10:15:30.123Z",
+    "2024-03-01T10:15:30.000001Z",
+    "2024-03-01T10:15:30.123456Z",
+    "1999-12-31T23:59:59.9Z",
+])
+def test_fast_path_matches_strptime(value):
+    assert parse_timestamp(value) == datetime.strptime(value, time_format)
+
+
+def test_strptime_fallback():
+    assert parse_timestamp("2024-03-01T10:15:30Z") == datetime(2024, 3, 1, 10, 15, 30)
+    assert parse_timestamp("2024-03-01") == datetime(2024, 3, 1)
+    assert parse_timestamp(None) is None
+    assert parse_timestamp("") is None
+    with pytest.raises(ValueError):
+        parse_timestamp("01.03.2024")
+    # Похожая на быстрый формат, но некорректная метка не разбирается молча
+    with pytest.raises(ValueError):
+        parse_timestamp("2024-13-01T10:15:30.123Z")
+
+
+def test_unix_time():
+    assert unix_time(datetime(1970, 1, 2, 0, 0, 0, 500000)) == 86400.5
+    assert unix_time(None) is None
+
+
+def test_from_json_parses_timestamps_lazily():
+    client = Client.from_json(JSON, None, None)
+    assert not hasattr(client, "__dict__")
+    assert client.created_at_raw == JSON["createdAt"]
+    assert client.updated_at_raw == JSON["updatedAt"]
+
+    assert client.created_at == datetime(2024, 3, 1, 10, 15, 30, 123000)
+    assert client.updated_at == datetime(2024, 3, 2, 0, 0, 0, 500000)
+    assert client.expired_at == datetime(2024, 4, 1)
+    assert client.last_handshake_at is None
+    # Разобранное значение запоминается
+    assert client.created_at is client.created_at
+
+    assert client.is_expired(datetime(2024, 4, 1))
+    assert not client.is_expired(datetime(2024, 3, 31))
+    assert (client.uid, client.name, client.enabled, client.address) == ("uid-1", "alice", True, "10.8.0.2")
+    assert (client.transfer_rx, client.transfer_tx) == (1, 2)
+
+
+def test_from_json_matches_init():
+    from_json = Client.from_json(JSON, None, None)
+    client = Client(
+        address=JSON["address"],
+        created_at=JSON["createdAt"],
+        enabled=JSON["enabled"],
+        uid=JSON["id"],
+        last_handshake_at=JSON["latestHandshakeAt"],
+        name=JSON["name"],
+        persistent_keepalive=JSON["persistentKeepalive"],
+        public_key=JSON["publicKey"],
+        transfer_rx=JSON["transferRx"],
+        transfer_tx=JSON["transferTx"],
+        updated_at=JSON["updatedAt"],
+        session=None,
+        server=None,
+        expired_at=JSON["expiredAt"],
+    )
+    for attribute in ("uid", "name", "enabled", "address", "public_key", "created_at", "updated_at", "expired_at"):
+        assert getattr(client, attribute) == getattr(from_json, attribute)
+
+
+def test_assignment_points_to_async_methods():
+    client = Client.from_json(JSON, None, None)
+    with pytest.raises(AttributeError, match="rename"):
+        client.name = "bob"
+    with pytest.raises(AttributeError, match="update_address"):
+        client.address = "10.8.0.3"
+    assert (client.name, client.address) == ("alice", "10.8.0.2")
@@ -0,0 +1,56 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from wg_easy_api_wrapper.connection import ConnectionConfig
+from wg_easy_api_wrapper.server import Server
+
+
+def test_defaults_match_plain_client_session():
+    async def scenario():
+        plain = aiohttp.ClientSession()
+        server = Server("http://wg.example.com:51821/", "password")
+        try:
+            session = server._session
+            assert server.url == "http://wg.example.com:51821"
+            assert session.timeout == plain.timeout
+            assert session.connector.limit == plain.connector.limit
+            assert session.connector.limit_per_host == plain.connector.limit_per_host
+            assert session.connector_owner
+            assert "Accept-Encoding" not in session.headers
+        finally:
+            await plain.close()
+            await server._session.close()
+
+    asyncio.run(scenario())
+
+
+def test_from_env_and_overrides():
+    config = ConnectionConfig.from_env(
+        {"WG_EASY_LIMIT_PER_HOST": "4", "WG_EASY_TIMEOUT": "2.5", "WG_EASY_COMPRESS": "off", "WG_EASY_LIMIT": ""},
+        limit_per_host=8,
+        read_timeout=None,
+    )
+    assert config.limit_per_host == 8
+    assert config.total_timeout == 2.5
+    assert config.limit is None
+    assert config.read_timeout is None
+    assert config.headers() == {"Accept-Encoding": "identity"}
+    assert config.make_timeout() == aiohttp.ClientTimeout(total=2.5)
+
+    with pytest.raises(ValueError, match="WG_EASY_DNS_CACHE_TTL"):
+        ConnectionConfig.from_env({"WG_EASY_DNS_CACHE_TTL": "soon"})
+
+
+def test_shared_connector_is_not_owned():
+    async def scenario():
+        config = ConnectionConfig(limit_per_host=2, keepalive_timeout=5)
+        connector = config.make_connector()
+        assert connector.limit_per_host == 2
+        session = config.make_session(connector=connector)
+        await session.close()
+        assert not connector.closed
+        await connector.close()
+
+    asyncio.run(scenario())
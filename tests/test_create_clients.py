@@ -0,0 +1,45 @@
+import asyncio
+
+from wg_easy_api_wrapper.errors import ServerUnavailableError
+
+from .mock_server import FlakyMockWGEasy, mock_server
+
+LIST = "GET /api/wireguard/client"
+
+
+def test_single_listing_after_creates():
+    async def scenario():
+        async with mock_server(peers=3) as (mock, server):
+            old = next(client for client in mock.clients.values() if client["name"] == "peer-1")
+            # Существующий тёзка создан раньше нового клиента
+            old["createdAt"] = "2020-01-01T00:00:00.000Z"
+            lists = mock.requests[LIST]
+
+            results = await server.create_clients(["peer-1", "alice", "bob"], expire_date="2030-01-01")
+            assert mock.requests[LIST] == lists + 1
+            assert {name: client.name for name, client in results.items()} == {
+                "peer-1": "peer-1", "alice": "alice", "bob": "bob",
+            }
+            assert results["peer-1"].uid != old["id"]
+            assert all(client.expired_at_raw == "2030-01-01" for client in results.values())
+            assert len(mock.clients) == 6
+
+    asyncio.run(scenario())
+
+
+def test_failed_creates_are_reported_per_name():
+    async def scenario():
+        async with mock_server(peers=0, mock_class=FlakyMockWGEasy) as (mock, server):
+            mock.fail_next = 1
+            results = await server.create_clients(["a", "b", "c"], concurrency=1)
+            assert isinstance(results["a"], ServerUnavailableError)
+            assert results["b"].name == "b" and results["c"].name == "c"
+
+            # Если не создан ни один клиент, список не перечитывается
+            lists = mock.requests[LIST]
+            mock.fail_next = 2
+            results = await server.create_clients(["d", "e"])
+            assert all(isinstance(result, ServerUnavailableError) for result in results.values())
+            assert mock.requests[LIST] == lists
+
+    asyncio.run(scenario())
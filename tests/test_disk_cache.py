@@ -0,0 +1,75 @@
+import asyncio
+import os
+
+from wg_easy_api_wrapper.disk_cache import DiskCache
+
+from .mock_server import mock_server
+
+CONFIGURATION = "GET /api/wireguard/client/{id}/configuration"
+
+
+def _age(cache, key, seconds):
+    """Сдвигает время последнего использования записи на seconds назад."""
+    path = cache._path(key)
+    moment = os.stat(path).st_mtime - seconds
+    os.utime(path, (moment, moment))
+
+
+def test_lru_eviction_down_to_low_watermark(tmp_path):
+    cache = DiskCache(str(tmp_path), max_size=1000)
+    keys = [DiskCache.make_key("http://wg", f"uid-{index}", "v1", "configuration") for index in range(10)]
+    for index, key in enumerate(keys):
+        cache.put(key, b"x" * 100)
+        # keys[0] - самая старая запись
+        _age(cache, key, 1000 - index)
+    # Чтение делает keys[0] самой свежей записью
+    assert cache.get(keys[0]) is not None
+
+    cache.put(DiskCache.make_key("http://wg", "uid-new", "v1", "configuration"), b"x" * 100)
+    # 1100 байт больше 1000: вытесняются самые давние записи, пока не останется 900
+    assert [key for key in keys if cache.get(key) is None] == keys[1:3]
+    assert sum(size for _, size, _ in cache._entries()) == 900
+
+
+def test_get_bumps_mtime(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    key = DiskCache.make_key("http://wg", "uid", "v1", "qrcode.svg")
+    assert cache.get(key) is None
+    cache.put(key, b"svg")
+    _age(cache, key, 3600)
+    before = os.stat(cache._path(key)).st_mtime
+    assert cache.get(key) == b"svg"
+    assert os.stat(cache._path(key)).st_mtime > before
+
+
+def test_put_replaces_atomically(tmp_path):
+    cache = DiskCache(str(tmp_path))
+    key = DiskCache.make_key("http://wg", "uid", "v1", "configuration")
+    cache.put(key, b"old")
+    cache.put(key, b"new")
+    assert cache.get(key) == b"new"
+    # Временные файлы не остаются в каталоге записи
+    assert os.listdir(os.path.dirname(cache._path(key))) == [key]
+    cache.delete(key)
+    assert cache.get(key) is None
+
+
+def test_key_changes_with_updated_at(tmp_path):
+    cache = DiskCache(str(tmp_path))
+
+    async def scenario():
+        async with mock_server(peers=1, disk_cache=cache) as (mock, server):
+            client, = await server.get_clients()
+            first = await client.get_configuration()
+            assert await client.get_configuration() == first
+            assert mock.requests[CONFIGURATION] == 1
+
+            # Новый updatedAt - новый ключ, запись запрашивается заново
+            mock.clients[client.uid]["updatedAt"] = "2099-01-01T00:00:00.000Z"
+            client, = await server.get_clients()
+            await client.get_configuration()
+            assert mock.requests[CONFIGURATION] == 2
+            await client.get_configuration()
+            assert mock.requests[CONFIGURATION] == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+from wg_easy_api_wrapper.client import parse_timestamp, unix_time
+from wg_easy_api_wrapper.expiry import ExpirySweeper
+
+from .mock_server import mock_server
+
+
+def _add_clients(mock):
+    mock.add_client("a", expired_at="2020-01-03T00:00:00.000Z")
+    mock.add_client("b", expired_at="2020-01-01T00:00:00.000Z")
+    mock.add_client("c", expired_at="2999-01-01T00:00:00.000Z")
+    mock.add_client("d")
+    return {client["name"]: client for client in mock.clients.values()}
+
+
+def test_heap_returns_due_clients_in_deadline_order():
+    async def scenario():
+        async with mock_server(peers=0) as (mock, server):
+            state = _add_clients(mock)
+            sweeper = ExpirySweeper(server)
+            await sweeper.refresh()
+            assert sweeper.scheduled == 3
+            assert sweeper.next_deadline() == unix_time(parse_timestamp("2020-01-01T00:00:00.000Z"))
+
+            # Изменённый срок заменяет прежний, устаревшая запись кучи отбрасывается
+            state["c"]["expiredAt"] = "2020-01-02T00:00:00.000Z"
+            await sweeper.refresh()
+            assert sweeper.scheduled == 3
+            assert [client.name for client in sweeper.due(time.time())] == ["b", "c", "a"]
+            assert sweeper.scheduled == 0
+            assert sweeper.due(time.time()) == []
+            assert sweeper.next_deadline() is None
+
+    asyncio.run(scenario())
+
+
+def test_sweep_disables_only_expired_clients():
+    async def scenario():
+        async with mock_server(peers=0) as (mock, server):
+            state = _add_clients(mock)
+            processed = []
+            sweeper = ExpirySweeper(server, on_result=lambda client, error: processed.append(client.name))
+            await sweeper.refresh()
+            results = await sweeper.sweep()
+            assert all(error is None for _, error in results)
+            assert sorted(processed) == ["a", "b"]
+            assert [name for name, client in sorted(state.items()) if not client["enabled"]] == ["a", "b"]
+            assert sweeper.scheduled == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,45 @@
+import asyncio
+import json
+import os
+
+from wg_easy_api_wrapper.export import EXPORT_STATE_FILE, EXPORTED, SKIPPED, export_clients
+
+from .mock_server import mock_server
+
+CONFIGURATION = "GET /api/wireguard/client/{id}/configuration"
+
+
+def test_unchanged_clients_are_skipped(tmp_path):
+    out_dir = str(tmp_path)
+
+    async def scenario():
+        async with mock_server(peers=3) as (mock, server):
+            results = await export_clients(server, out_dir)
+            assert set(results.values()) == {EXPORTED}
+            downloads = mock.requests[CONFIGURATION]
+            assert downloads == 3
+
+            with open(os.path.join(out_dir, EXPORT_STATE_FILE), encoding="utf-8") as file:
+                state = json.load(file)
+            assert set(state) == set(results)
+            assert all(entry["formats"] == ["conf", "svg"] for entry in state.values())
+
+            results = await export_clients(server, out_dir)
+            assert set(results.values()) == {SKIPPED}
+            assert mock.requests[CONFIGURATION] == downloads
+
+            # Изменённый клиент и клиент без файла выгружаются заново
+            renamed, missing, untouched = await server.get_clients()
+            await renamed.rename("renamed")
+            os.unlink(os.path.join(out_dir, f"{missing.uid}.svg"))
+            results = await export_clients(server, out_dir)
+            assert results == {renamed.uid: EXPORTED, missing.uid: EXPORTED, untouched.uid: SKIPPED}
+            assert mock.requests[CONFIGURATION] == downloads + 2
+
+            # Подмножество выгруженных форматов не требует загрузки, force выгружает всех
+            results = await export_clients(server, out_dir, formats=("conf",))
+            assert set(results.values()) == {SKIPPED}
+            results = await export_clients(server, out_dir, force=True)
+            assert set(results.values()) == {EXPORTED}
+
+    asyncio.run(scenario())
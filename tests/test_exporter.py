@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+
+from wg_easy_api_wrapper.client import parse_timestamp
+from wg_easy_api_wrapper.exporter import MetricsExporter, parse_listen
+from wg_easy_api_wrapper.retry import RetryPolicy
+
+from .mock_server import FlakyMockWGEasy, mock_server
+
+
+def _client(uid, name, rx, tx, enabled=True, handshake=None):
+    return SimpleNamespace(
+        uid=uid, name=name, address=f"10.8.0.{uid}", enabled=enabled,
+        transfer_rx=rx, transfer_tx=tx, last_handshake_at=parse_timestamp(handshake),
+    )
+
+
+def _types(text):
+    return dict(line.split()[2:4] for line in text.splitlines() if line.startswith("# TYPE"))
+
+
+def test_render_clients():
+    text = MetricsExporter.render_clients([
+        _client("1", 'say "hi"', 100, 50, handshake="1970-01-01T00:01:40.000Z"),
+        _client("2", "bob", None, 7, enabled=False),
+    ])
+    lines = text.splitlines()
+    assert 'wg_easy_client_rx_bytes_total{uid="1",name="say \\"hi\\"",address="10.8.0.1"} 100' in lines
+    assert 'wg_easy_client_rx_bytes_total{uid="2",name="bob",address="10.8.0.2"} 0' in lines
+    assert 'wg_easy_client_enabled{uid="2",name="bob",address="10.8.0.2"} 0' in lines
+    # Клиент без рукопожатия не получает метку времени
+    assert [line for line in lines if line.startswith("wg_easy_client_latest_handshake")] == [
+        'wg_easy_client_latest_handshake_timestamp_seconds{uid="1",name="say \\"hi\\"",address="10.8.0.1"} 100.000',
+    ]
+    assert "wg_easy_clients 2" in lines
+    assert "wg_easy_clients_enabled 1" in lines
+    assert "wg_easy_rx_bytes_total 100" in lines
+    assert "wg_easy_tx_bytes_total 57" in lines
+    assert "seconds_since_handshake" not in text
+
+    types = _types(text)
+    assert types["wg_easy_client_rx_bytes_total"] == "counter"
+    assert types["wg_easy_rx_bytes_total"] == "gauge"
+    assert types["wg_easy_tx_bytes_total"] == "gauge"
+
+
+def test_failed_refresh_keeps_last_good_scrape():
+    async def scenario():
+        async with mock_server(
+            peers=3, mock_class=FlakyMockWGEasy, retry=RetryPolicy(attempts=0),
+        ) as (mock, server):
+            exporter = MetricsExporter(server)
+            assert b"wg_easy_up 0" in exporter.body
+
+            await exporter.refresh()
+            good = exporter.body.decode()
+            assert "wg_easy_up 1" in good
+            assert "wg_easy_clients 3" in good.splitlines()
+
+            mock.fail_next = 1
+            await exporter.refresh()
+            failed = exporter.body.decode()
+            assert "wg_easy_up 0" in failed
+            # Метрики клиентов и время последнего удачного обновления остаются прежними
+            assert failed.split("wg_easy_last_refresh_timestamp_seconds", 1)[1] == \
+                good.split("wg_easy_last_refresh_timestamp_seconds", 1)[1]
+
+            await exporter.refresh()
+            assert b"wg_easy_up 1" in exporter.body
+
+    asyncio.run(scenario())
+
+
+def test_parse_listen():
+    assert parse_listen(":9000") == ("0.0.0.0", 9000)
+    assert parse_listen("127.0.0.1:9000") == ("127.0.0.1", 9000)
+    assert parse_listen("[::1]:9000") == ("::1", 9000)
@@ -0,0 +1,21 @@
+import asyncio
+from contextlib import AsyncExitStack
+
+from wg_easy_api_wrapper.fleet import Fleet
+
+from .mock_server import PASSWORD, MockWGEasy, serve
+
+
+def test_create_client_spreads_across_nodes():
+    async def scenario():
+        mocks = {"a": MockWGEasy(peers=3), "b": MockWGEasy(peers=0)}
+        async with AsyncExitStack() as stack:
+            urls = {node: await stack.enter_async_context(serve(mock)) for node, mock in mocks.items()}
+            async with Fleet({node: (url, PASSWORD) for node, url in urls.items()}) as fleet:
+                placed = [(await fleet.create_client(f"new-{index}"))[0] for index in range(7)]
+        # Сначала догоняется пустой узел, затем клиенты чередуются
+        assert placed == ["b", "b", "b", "a", "b", "a", "b"]
+        assert len(mocks["a"].clients) == 5
+        assert len(mocks["b"].clients) == 5
+
+    asyncio.run(scenario())
@@ -0,0 +1,113 @@
+import asyncio
+import io
+import json
+import socket
+
+import pytest
+
+from wg_easy_api_wrapper.errors import ServerUnavailableError
+from wg_easy_api_wrapper.instrumentation import (
+    Histogram,
+    Instrumentation,
+    JSONLogSink,
+    MemorySink,
+    StatsDSink,
+    endpoint_template,
+)
+from wg_easy_api_wrapper.retry import RetryPolicy
+from wg_easy_api_wrapper.server import Server
+
+from .mock_server import FlakyMockWGEasy, mock_server
+
+
+@pytest.mark.parametrize("path, template", [
+    ("/api/wireguard/client", "/api/wireguard/client"),
+    ("/api/wireguard/client/3f2a-b1", "/api/wireguard/client/{id}"),
+    ("/api/wireguard/client/3f2a-b1/qrcode.svg", "/api/wireguard/client/{id}/qrcode.svg"),
+    ("/api/wireguard/client/3f2a/name?x=1", "/api/wireguard/client/{id}/name"),
+    ("/api/session", "/api/session"),
+])
+def test_endpoint_template(path, template):
+    assert endpoint_template(path) == template
+
+
+def test_every_attempt_is_recorded():
+    stream = io.StringIO()
+    instrumentation = Instrumentation([MemorySink(), JSONLogSink(stream)])
+
+    async def scenario():
+        async with mock_server(
+            peers=3, mock_class=FlakyMockWGEasy, instrumentation=instrumentation,
+        ) as (mock, server):
+            mock.fail_next = 2
+            clients = await server.get_clients()
+            mock._sessions.clear()
+            await clients[0].rename("renamed")
+
+    asyncio.run(scenario())
+
+    summary = instrumentation.memory.summary()
+    assert summary["GET /api/wireguard/client"]["statuses"] == {"200": 1, "503": 2}
+    assert summary["PUT /api/wireguard/client/{id}/name"]["statuses"] == {"200": 1, "401": 1}
+    assert summary["POST /api/session"]["count"] == 2
+    listing = summary["GET /api/wireguard/client"]
+    assert listing["bytes"] > 0
+    assert listing["latency_ms"]["total"]["count"] == 3
+    assert "GET /api/wireguard/client" in instrumentation.memory.format_table()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert sum(record["count"] for record in summary.values()) == len(records)
+    rename = [record for record in records if record["method"] == "PUT"]
+    assert [record["status"] for record in rename] == [401, 200]
+    assert all(record["endpoint"] == "/api/wireguard/client/{id}/name" for record in rename)
+    assert all("total_ms" in record and "time" in record for record in records)
+
+
+def test_connection_errors_are_recorded():
+    instrumentation = Instrumentation()
+    # Свободный порт, который никто не слушает
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    async def scenario():
+        server = Server(
+            f"http://127.0.0.1:{port}", "password",
+            retry=RetryPolicy(attempts=1, base_delay=0),
+            instrumentation=instrumentation,
+        )
+        with pytest.raises(ServerUnavailableError):
+            async with server:
+                pass
+
+    asyncio.run(scenario())
+    stats = instrumentation.memory.summary()["POST /api/session"]
+    assert stats["count"] == 2
+    assert stats["errors"] == 2
+    assert stats["statuses"] == {}
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(1, 10, 100))
+    for value in (0.5, 5, 5, 50, 500):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.quantile(0.5) == 10
+    assert histogram.quantile(1.0) == 500
+    assert histogram.mean == pytest.approx(112.1)
+    assert Histogram().quantile(0.5) is None
+
+
+def test_statsd_lines():
+    sink = StatsDSink(prefix="wg")
+    instrumentation = Instrumentation([sink])
+    timing = instrumentation.start("GET", "/api/wireguard/client/abc/configuration")
+    timing.status = 200
+    timing.bytes = 10
+    timing.total = 1.5
+    assert sink.lines(timing) == [
+        "wg.get.api.wireguard.client.id.configuration.requests:1|c",
+        "wg.get.api.wireguard.client.id.configuration.status.200:1|c",
+        "wg.get.api.wireguard.client.id.configuration.bytes:10|c",
+        "wg.get.api.wireguard.client.id.configuration.total:1.500|ms",
+    ]
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from wg_easy_api_wrapper.json_stream import JSONArrayDecoder
+
+from .mock_server import mock_server
+
+
+def _decode(chunks):
+    decoder = JSONArrayDecoder()
+    items = []
+    for chunk in chunks:
+        items.extend(decoder.feed(chunk))
+    decoder.close()
+    return items
+
+
+def test_objects_split_into_small_chunks():
+    data = [{"name": "клиент", "n": index, "tags": ["a", {"b": None}]} for index in range(20)]
+    raw = json.dumps(data, ensure_ascii=False).encode()
+    chunks = [raw[index:index + 7] for index in range(0, len(raw), 7)]
+    assert _decode(chunks) == data
+
+
+def test_rejects_incomplete_or_trailing_data():
+    with pytest.raises(ValueError):
+        _decode([b'[{"a": 1}'])
+    with pytest.raises(ValueError):
+        _decode([b'[1] 2'])
+    with pytest.raises(ValueError):
+        _decode([b'{"a": 1}'])
+
+
+def test_iter_clients_matches_get_clients():
+    async def scenario():
+        async with mock_server(peers=30) as (mock, server):
+            streamed = [client.uid async for client in server.iter_clients(chunk_size=64)]
+            listed = [client.uid for client in await server.get_clients()]
+            assert streamed == listed == list(mock.clients)
+
+    asyncio.run(scenario())
+
+
+VALID_ARRAYS = [
+    "[]",
+    "[ ]",
+    "[1, 2.5]",
+    "[-12.5e+3, true, false, null]",
+    "[0, -0.0, 1E5, 123456789, 7]",
+    '["a", {"b": [1, 2]}, 3, "юникод"]',
+    ' [ 1 ,2\n,\t3 ] ',
+    '[{"transferRx": 10, "latestHandshakeAt": null}, {"name": "x,]"}]',
+]
+
+
+@pytest.mark.parametrize("text", VALID_ARRAYS)
+def test_every_chunk_boundary(text):
+    raw = text.encode()
+    expected = json.loads(text)
+    for offset in range(len(raw) + 1):
+        assert _decode([raw[:offset], raw[offset:]]) == expected, offset
+    assert _decode([raw[index:index + 1] for index in range(len(raw))]) == expected
+
+
+def test_scalar_split_inside_number():
+    decoder = JSONArrayDecoder()
+    assert decoder.feed(b"[1, 2.") == [1]
+    assert decoder.feed(b"5]") == [2.5]
+    decoder.close()
@@ -0,0 +1,44 @@
+import csv
+import io
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from benchmarks.mock_wg_easy import PASSWORD, MockWGEasy
+from wg_easy_api_wrapper.cli import cli
+
+from .mock_server import serve_in_thread
+
+
+@pytest.fixture
+def list_clients(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    mock = MockWGEasy(peers=3)
+    with serve_in_thread(mock) as url:
+        def _invoke(*args):
+            result = CliRunner().invoke(cli, ["--url", url, "--password", PASSWORD, "list-clients", *args], obj={})
+            assert result.exit_code == 0, result.output
+            return result.output
+        yield _invoke
+
+
+def test_text_is_default_format(list_clients):
+    output = list_clients()
+    assert output == list_clients("--format", "text")
+    assert output.count("UID: ") == 3
+    assert "  Имя: peer-0" in output
+
+
+def test_machine_readable_formats_are_opt_in(list_clients):
+    rows = json.loads(list_clients("--format", "json", "--sort", "name", "--fields", "name,enabled"))
+    assert rows == [{"name": f"peer-{index}", "enabled": True} for index in range(3)]
+
+    lines = list_clients("--format", "ndjson", "--name-glob", "peer-1").splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["peer-1"]
+
+    table = list(csv.DictReader(io.StringIO(list_clients("--format", "csv", "--fields", "name,address"))))
+    assert sorted(row["name"] for row in table) == ["peer-0", "peer-1", "peer-2"]
+
+    header = list_clients("--format", "table").splitlines()[0]
+    assert "name" in header.lower() and "UID: " not in header
@@ -0,0 +1,35 @@
+import asyncio
+import datetime
+
+import aiohttp
+
+from benchmarks.mock_wg_easy import PASSWORD, MockWGEasy
+
+from .mock_server import serve
+
+
+def test_handshakes_between_creation_and_now():
+    mock = MockWGEasy(peers=2000)
+    now = datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.999Z")
+    handshakes = [client for client in mock.clients.values() if client["latestHandshakeAt"]]
+    assert handshakes
+    for client in handshakes:
+        assert client["createdAt"] <= client["latestHandshakeAt"] <= now
+
+
+def test_requires_session_and_counts_requests():
+    async def scenario():
+        mock = MockWGEasy(peers=3)
+        async with serve(mock) as url, aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+            async with session.get(f"{url}/api/wireguard/client") as response:
+                assert response.status == 401
+            async with session.post(f"{url}/api/session", json={"password": "wrong"}) as response:
+                assert response.status == 401
+            async with session.post(f"{url}/api/session", json={"password": PASSWORD}) as response:
+                assert response.status == 200
+            async with session.get(f"{url}/api/wireguard/client") as response:
+                assert len(await response.json()) == 3
+        assert mock.requests["GET /api/wireguard/client"] == 2
+        assert mock.requests["POST /api/session"] == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,98 @@
+import asyncio
+import struct
+import zlib
+
+import pytest
+
+from wg_easy_api_wrapper.export import export_clients
+from wg_easy_api_wrapper.qr import QRRenderer, matrix_to_png, render_qr
+
+from .mock_server import mock_server
+
+CONFIGURATION = "GET /api/wireguard/client/{id}/configuration"
+
+
+def _decode_png(data):
+    """Разбирает PNG из matrix_to_png в строки пикселей; True - тёмный пиксель."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks, offset = {}, 8
+    while offset < len(data):
+        length, kind = struct.unpack(">I4s", data[offset:offset + 8])
+        body = data[offset + 8:offset + 8 + length]
+        crc, = struct.unpack(">I", data[offset + 8 + length:offset + 12 + length])
+        assert crc == zlib.crc32(kind + body) & 0xFFFFFFFF
+        chunks[kind] = body
+        offset += 12 + length
+    width, height, depth, color = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert (depth, color) == (1, 0)
+    raw = zlib.decompress(chunks[b"IDAT"])
+    stride = 1 + (width + 7) // 8
+    rows = []
+    for y in range(height):
+        line = raw[y * stride:(y + 1) * stride]
+        assert line[0] == 0
+        bits = "".join(f"{byte:08b}" for byte in line[1:])[:width]
+        rows.append([bit == "0" for bit in bits])
+    return rows
+
+
+def test_png_encoder_scales_matrix_with_border():
+    matrix = [[True, False, True], [False, True, False], [True, True, False]]
+    rows = _decode_png(matrix_to_png(matrix, scale=3, border=2))
+    assert len(rows) == len(rows[0]) == (3 + 2 * 2) * 3
+    # Рамка светлая, каждый модуль - квадрат scale x scale
+    assert not any(rows[0]) and not any(rows[-1])
+    for y, row in enumerate(matrix):
+        for x, module in enumerate(row):
+            for dy in range(3):
+                pixels = rows[(y + 2) * 3 + dy][(x + 2) * 3:(x + 3) * 3]
+                assert pixels == [module] * 3
+
+
+def test_render_qr_png_matches_matrix():
+    segno = pytest.importorskip("segno")
+    text = "[Interface]\nPrivateKey = test\n"
+    rows = _decode_png(render_qr(text, "png", scale=1, border=0))
+    assert rows == [[bool(module) for module in row] for row in segno.make(text, error="m", micro=False).matrix]
+
+
+def test_renderer_cache_is_lru():
+    pytest.importorskip("segno")
+    renderer = QRRenderer(cache_size=2)
+    first = renderer.render_sync("a", "svg")
+    assert renderer.render_sync("a", "svg") is first
+    assert renderer.render_sync("a", "png") is not first
+    renderer.render_sync("b", "svg")
+    # "a" в svg вытеснен как самый давно использованный
+    assert renderer.render_sync("a", "svg") is not first
+    with pytest.raises(ValueError):
+        asyncio.run(renderer.render("a", "gif"))
+
+
+def test_renderer_process_pool():
+    pytest.importorskip("segno")
+
+    async def scenario():
+        with QRRenderer(processes=1) as renderer:
+            bodies = await renderer.render_many(["a", "b", "a"], "svg")
+            assert bodies[0] is bodies[2]
+            assert bodies[0] == QRRenderer().render_sync("a", "svg")
+            assert await renderer.render("b", "svg") is bodies[1]
+
+    asyncio.run(scenario())
+
+
+def test_export_reuses_configuration_for_png(tmp_path):
+    pytest.importorskip("segno")
+
+    async def scenario():
+        async with mock_server(peers=2) as (mock, server):
+            await export_clients(server, str(tmp_path), formats=("conf", "png"))
+            assert mock.requests[CONFIGURATION] == 2
+            for client in await server.get_clients():
+                configuration = (tmp_path / f"{client.uid}.conf").read_text()
+                assert configuration == await client.get_configuration()
+                png = (tmp_path / f"{client.uid}.png").read_bytes()
+                assert png == QRRenderer().render_sync(configuration, "png")
+
+    asyncio.run(scenario())
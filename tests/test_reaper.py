@@ -0,0 +1,79 @@
+import asyncio
+import datetime
+
+from wg_easy_api_wrapper.reaper import DELETE, DISABLE
+
+from .mock_server import mock_server
+
+NOW = datetime.datetime(2024, 6, 1)
+DELETE_REQUEST = "DELETE /api/wireguard/client/{id}"
+DISABLE_REQUEST = "POST /api/wireguard/client/{id}/disable"
+
+
+def _iso(days_ago):
+    return (NOW - datetime.timedelta(days=days_ago)).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _add(mock, name, created_days_ago, handshake_days_ago=None, enabled=True):
+    client = mock.add_client(name, created=NOW - datetime.timedelta(days=created_days_ago))
+    client["latestHandshakeAt"] = None if handshake_days_ago is None else _iso(handshake_days_ago)
+    client["enabled"] = enabled
+    return client
+
+
+def _populate(mock):
+    _add(mock, "active", 100, handshake_days_ago=1)
+    _add(mock, "idle", 100, handshake_days_ago=45)
+    # Ни разу не подключавшиеся клиенты оцениваются по дате создания
+    _add(mock, "never-old", 60)
+    _add(mock, "never-new", 5)
+    _add(mock, "idle-disabled", 100, handshake_days_ago=90, enabled=False)
+
+
+def _names(result):
+    return [peer.client.name for peer in result.peers]
+
+
+def test_dry_run_selects_without_changes():
+    async def scenario():
+        async with mock_server(peers=0) as (mock, server):
+            _populate(mock)
+            result = await server.reap(30, dry_run=True, now=NOW)
+            assert _names(result) == ["never-old", "idle"]
+            assert [round(peer.idle_days) for peer in result.peers] == [60, 45]
+            assert result.summary() == {
+                "scanned": 5, "selected": 2, "never_connected": 1, "processed": 0, "errors": 0,
+            }
+            assert mock.requests[DISABLE_REQUEST] == 0
+            assert all(client["enabled"] for client in mock.clients.values() if client["name"] != "idle-disabled")
+
+    asyncio.run(scenario())
+
+
+def test_disable_skips_already_disabled():
+    async def scenario():
+        async with mock_server(peers=0) as (mock, server):
+            _populate(mock)
+            processed = []
+            result = await server.reap(30, action=DISABLE, now=NOW, on_result=processed.append)
+            assert sorted(_names(result)) == sorted(peer.client.name for peer in processed)
+            assert mock.requests[DISABLE_REQUEST] == 2
+            enabled = {client["name"]: client["enabled"] for client in mock.clients.values()}
+            assert enabled == {
+                "active": True, "idle": False, "never-old": False, "never-new": True, "idle-disabled": False,
+            }
+
+    asyncio.run(scenario())
+
+
+def test_delete_includes_disabled():
+    async def scenario():
+        async with mock_server(peers=0) as (mock, server):
+            _populate(mock)
+            result = await server.reap(30, action=DELETE, now=NOW)
+            assert _names(result) == ["idle-disabled", "never-old", "idle"]
+            assert result.summary()["processed"] == 3
+            assert mock.requests[DELETE_REQUEST] == 3
+            assert sorted(client["name"] for client in mock.clients.values()) == ["active", "never-new"]
+
+    asyncio.run(scenario())
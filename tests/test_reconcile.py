@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from wg_easy_api_wrapper.errors import ClientNotFoundError
+from wg_easy_api_wrapper.reconcile import (
+    CREATE,
+    DELETE,
+    DISABLE,
+    RENAME,
+    SET_EXPIRE,
+    DesiredClient,
+    parse_desired,
+    plan,
+)
+
+from .mock_server import mock_server
+
+
+def test_plan_contains_only_needed_changes():
+    async def scenario():
+        async with mock_server(peers=4) as (mock, server):
+            clients = await server.get_clients()
+            by_name = {client.name: client for client in clients}
+            desired = [
+                DesiredClient("peer-0"),
+                DesiredClient("peer-1", enabled=False),
+                DesiredClient("renamed", uid=by_name["peer-2"].uid),
+                DesiredClient("peer-3", expire_date="2031-01-01"),
+                DesiredClient("new", expire_date="2030-01-01"),
+            ]
+            actions = plan(clients, desired)
+            assert [(action.kind, action.name) for action in actions] == [
+                (CREATE, "new"),
+                (RENAME, "peer-2"),
+                (DISABLE, "peer-1"),
+                (SET_EXPIRE, "peer-3"),
+            ]
+            assert actions[0].value == "2030-01-01"
+
+            # Без prune лишние клиенты не трогаются, с prune - удаляются
+            pruned = plan(clients, desired[:2], prune=True)
+            assert {action.name for action in pruned if action.kind == DELETE} == {"peer-2", "peer-3"}
+
+            with pytest.raises(ClientNotFoundError):
+                plan(clients, [DesiredClient("x", uid="missing")])
+
+    asyncio.run(scenario())
+
+
+def test_reconcile_converges():
+    async def scenario():
+        async with mock_server(peers=3) as (mock, server):
+            desired, prune = parse_desired({
+                "prune": True,
+                "clients": {
+                    "peer-0": {"enabled": False},
+                    "alice": {"expire_date": "2030-01-01"},
+                    "bob": {"enabled": False},
+                },
+            })
+            result = await server.reconcile(desired, prune=prune)
+            assert not result.errors
+            state = {client["name"]: client for client in mock.clients.values()}
+            assert set(state) == {"peer-0", "alice", "bob"}
+            assert not state["peer-0"]["enabled"]
+            assert not state["bob"]["enabled"]
+            assert state["alice"]["expiredAt"] == "2030-01-01"
+
+            # Повторный прогон ничего не меняет и не выполняет запросов, кроме списка
+            requests = sum(mock.requests.values())
+            again = await server.reconcile(desired, prune=prune)
+            assert not again.changed
+            assert sum(mock.requests.values()) == requests + 1
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("data", [
+    {"prune": "false", "clients": ["alice"]},
+    {"prune": 1, "clients": ["alice"]},
+    {"clients": [{"name": "alice", "enabled": "no"}]},
+    {"alice": {"enabled": 0}},
+])
+def test_parse_desired_requires_real_booleans(data):
+    with pytest.raises(ValueError):
+        parse_desired(data)
+
+
+def test_parse_desired_accepts_booleans():
+    desired, prune = parse_desired({"prune": False, "clients": {"alice": {"enabled": False}, "bob": None}})
+    assert prune is False
+    assert [(client.name, client.enabled) for client in desired] == [("alice", False), ("bob", True)]
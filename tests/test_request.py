@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from wg_easy_api_wrapper.errors import CircuitOpenError, ServerUnavailableError
+from wg_easy_api_wrapper.retry import CircuitBreaker, RetryPolicy
+
+from .mock_server import FlakyMockWGEasy, mock_server
+
+LIST = "GET /api/wireguard/client"
+CREATE = "POST /api/wireguard/client"
+LOGIN = "POST /api/session"
+
+
+def test_relogin_after_expired_session():
+    async def scenario():
+        async with mock_server(peers=3) as (mock, server):
+            mock._sessions.clear()
+            clients = await server.get_clients()
+            assert len(clients) == 3
+            assert mock.requests[LOGIN] == 2
+            assert mock.requests[LIST] == 2
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_401_share_one_login():
+    async def scenario():
+        async with mock_server(peers=3) as (mock, server):
+            mock._sessions.clear()
+            results = await asyncio.gather(*(server.get_clients() for _ in range(5)))
+            assert all(len(clients) == 3 for clients in results)
+            assert mock.requests[LOGIN] == 2
+
+    asyncio.run(scenario())
+
+
+def test_idempotent_request_retried_until_success():
+    async def scenario():
+        async with mock_server(peers=3, mock_class=FlakyMockWGEasy) as (mock, server):
+            mock.fail_next = 2
+            assert len(await server.get_clients()) == 3
+            assert mock.requests[LIST] == 3
+
+    asyncio.run(scenario())
+
+
+def test_only_idempotent_requests_are_retried():
+    async def scenario():
+        async with mock_server(
+            peers=3,
+            mock_class=FlakyMockWGEasy,
+            retry=RetryPolicy(attempts=2, base_delay=0),
+            circuit_breaker=CircuitBreaker(failure_threshold=100),
+        ) as (mock, server):
+            mock.fail_next = 100
+            with pytest.raises(ServerUnavailableError):
+                await server.get_clients()
+            assert mock.requests[LIST] == 3
+
+            with pytest.raises(ServerUnavailableError):
+                await server.create_client("new")
+            assert mock.requests[CREATE] == 1
+
+    asyncio.run(scenario())
+
+
+def test_circuit_counts_one_failure_per_request():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        async with mock_server(
+            peers=3,
+            mock_class=FlakyMockWGEasy,
+            retry=RetryPolicy(attempts=2, base_delay=0),
+            circuit_breaker=breaker,
+        ) as (mock, server):
+            # Три неудачные попытки одного запроса - один сбой
+            mock.fail_next = 3
+            with pytest.raises(ServerUnavailableError):
+                await server.get_clients()
+            assert breaker.state == CircuitBreaker.CLOSED
+
+            # Запрос, удавшийся после повторов, сбрасывает счётчик
+            mock.fail_next = 2
+            assert len(await server.get_clients()) == 3
+            mock.fail_next = 3
+            with pytest.raises(ServerUnavailableError):
+                await server.get_clients()
+            assert breaker.state == CircuitBreaker.CLOSED
+
+            mock.fail_next = 3
+            with pytest.raises(ServerUnavailableError):
+                await server.get_clients()
+            assert breaker.state == CircuitBreaker.OPEN
+
+    asyncio.run(scenario())
+
+
+def test_circuit_opens_after_consecutive_failures():
+    async def scenario():
+        async with mock_server(
+            peers=3,
+            mock_class=FlakyMockWGEasy,
+            retry=RetryPolicy(attempts=0),
+            circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        ) as (mock, server):
+            mock.fail_next = 100
+            for _ in range(2):
+                with pytest.raises(ServerUnavailableError) as error:
+                    await server.get_clients()
+                assert not isinstance(error.value, CircuitOpenError)
+            with pytest.raises(CircuitOpenError):
+                await server.get_clients()
+            # Разомкнутая цепь не пропускает запрос к узлу
+            assert mock.requests[LIST] == 2
+
+    asyncio.run(scenario())
+
+
+def test_circuit_half_open_allows_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.before_request("node")
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("node")
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert not breaker.before_request("node")
+
+
+def test_cancelled_probe_is_released():
+    async def scenario():
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        async with mock_server(peers=3, circuit_breaker=breaker) as (mock, server):
+            breaker.record_failure()
+            mock.latency = 0.5
+            probe = asyncio.ensure_future(server.get_clients())
+            await asyncio.sleep(0.1)
+            with pytest.raises(CircuitOpenError):
+                await server.get_clients()
+
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            # Отменённый пробный запрос освобождает место для следующего
+            mock.latency = 0
+            assert len(await server.get_clients()) == 3
+            assert breaker.state == CircuitBreaker.CLOSED
+
+    asyncio.run(scenario())
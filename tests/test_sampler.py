@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from wg_easy_api_wrapper.sampler import TrafficSampler
+
+from .mock_server import mock_server
+
+
+def _peer(uid, rx, tx=0):
+    return SimpleNamespace(uid=uid, transfer_rx=rx, transfer_tx=tx)
+
+
+def _sampler(interval=10.0, history=30.0):
+    return TrafficSampler(server=None, interval=interval, history=history)
+
+
+def test_ring_wraps_around_and_keeps_last_samples():
+    sampler = _sampler()
+    assert sampler.capacity == 5
+    # Скорость растёт на 1 байт/с на каждом интервале
+    total = 0
+    for step in range(12):
+        total += 10 * step
+        sampler.record([_peer("a", total)], timestamp=10.0 * step)
+
+    assert sampler.rate("a") == (11.0, 0.0)
+    # Окно длиннее истории усредняется по самому старому замеру в буфере
+    assert sampler.rate("a", window=1000) == pytest.approx(((11 + 10 + 9 + 8) / 4, 0.0))
+    assert sampler.rate("a", window=20) == pytest.approx((10.5, 0.0))
+
+
+def test_counter_reset_is_folded_into_offset():
+    sampler = _sampler()
+    sampler.record([_peer("a", 1000, 500)], timestamp=0)
+    sampler.record([_peer("a", 2000, 700)], timestamp=10)
+    # WireGuard перезапущен: счётчики начались с нуля
+    sampler.record([_peer("a", 300, 100)], timestamp=20)
+    assert sampler.rate("a") == (30.0, 10.0)
+    sampler.record([_peer("a", 400, 100)], timestamp=30)
+    assert sampler.rate("a") == (10.0, 0.0)
+    assert sampler.rate("a", window=30) == pytest.approx(((2000 + 400 - 1000) / 30, (700 + 100 - 500) / 30))
+
+
+def test_windowed_rate_picks_sample_at_window_start():
+    sampler = _sampler(interval=1.0, history=100.0)
+    # Неравномерные интервалы: окно начинается с последнего замера не позже его границы
+    times = [0, 1, 2, 5, 9, 10]
+    for moment in times:
+        sampler.record([_peer("a", moment * 100)], timestamp=moment)
+    assert sampler.rate("a", window=4) == pytest.approx((100.0, 0.0))
+    assert sampler.rate("a", window=6) == pytest.approx((100.0, 0.0))
+    assert sampler.rate("a", window=0.5) == pytest.approx((100.0, 0.0))
+
+    rates = sampler.rates("a")
+    assert set(rates) == {"current", "1m", "5m", "1h"}
+
+
+def test_peers_missing_from_listing_are_evicted():
+    sampler = _sampler()
+    sampler.record([_peer("a", 0), _peer("b", 0)], timestamp=0)
+    sampler.record([_peer("a", 10)], timestamp=10)
+    assert sampler.peers == 1
+    assert sampler.rate("b") is None
+
+    # Вернувшийся клиент отслеживается заново, без старой истории
+    sampler.record([_peer("a", 20), _peer("b", 1000)], timestamp=20)
+    assert sampler.rate("b") is None
+    sampler.record([_peer("a", 30), _peer("b", 1100)], timestamp=30)
+    assert sampler.rate("b") == (10.0, 0.0)
+    assert sampler.rate("b", window=1000) == (10.0, 0.0)
+
+
+def test_top_talkers():
+    sampler = _sampler()
+    sampler.record([_peer("a", 0, 0), _peer("b", 0, 0), _peer("c", 0, 0)], timestamp=0)
+    sampler.record([_peer("a", 100, 0), _peer("b", 0, 300), _peer("c", 150, 100)], timestamp=10)
+    sampler.record([_peer("a", 100, 0), _peer("b", 0, 300), _peer("c", 150, 100), _peer("d", 5)], timestamp=20)
+
+    assert [uid for uid, _, _ in sampler.top_talkers(window=20)] == ["b", "c", "a"]
+    assert sampler.top_talkers(n=1, window=20, direction="rx") == [("c", 7.5, 5.0)]
+    assert sampler.top_talkers(n=1, window=20, direction="tx") == [("b", 0.0, 15.0)]
+    # Без окна считается последний интервал, где трафика не было
+    assert sampler.top_talkers(n=2)[0][1:] == (0.0, 0.0)
+    with pytest.raises(ValueError):
+        sampler.top_talkers(direction="up")
+
+
+def test_sample_reads_server_listing():
+    async def scenario():
+        async with mock_server(peers=4) as (mock, server):
+            sampler = TrafficSampler(server, interval=1)
+            await sampler.sample()
+            client = next(iter(mock.clients.values()))
+            client["transferRx"] += 1000
+            await sampler.sample()
+            assert sampler.peers == 4
+            assert sampler.rate(client["id"])[0] > 0
+
+    asyncio.run(scenario())
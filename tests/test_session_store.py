@@ -0,0 +1,76 @@
+import asyncio
+import json
+import os
+import stat
+
+from benchmarks.mock_wg_easy import PASSWORD, MockWGEasy
+from wg_easy_api_wrapper.server import Server
+from wg_easy_api_wrapper.session_store import SessionStore
+
+from .mock_server import serve
+
+LOGIN = "POST /api/session"
+LIST = "GET /api/wireguard/client"
+
+
+def test_store_writes_private_file_atomically(tmp_path):
+    path = tmp_path / "nested" / "sessions.json"
+    store = SessionStore(str(path))
+    assert store.load("http://a") is None
+
+    store.save("http://a", {"connect.sid": "one"})
+    store.save("http://b", {"connect.sid": "two"})
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert store.load("http://a") == {"connect.sid": "one"}
+    # Временные файлы не остаются рядом с хранилищем
+    assert os.listdir(path.parent) == ["sessions.json"]
+
+    store.clear("http://a")
+    assert store.load("http://a") is None
+    assert json.loads(path.read_text())["http://b"]["cookies"] == {"connect.sid": "two"}
+
+    path.write_text("{not json")
+    assert store.load("http://b") is None
+
+
+def test_restored_session_skips_login(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.json"))
+    mock = MockWGEasy(peers=3)
+
+    async def scenario():
+        async with serve(mock) as url:
+            # Стандартный CookieJar принимает привязанные к хосту куки только для имён
+            url = url.replace("127.0.0.1", "localhost")
+            async with Server(url, PASSWORD, session_store=store, logout_on_exit=False) as server:
+                await server.get_clients()
+            assert mock.requests[LOGIN] == 1
+            assert store.load(url)
+
+            async with Server(url, PASSWORD, session_store=store, logout_on_exit=False) as server:
+                assert len(await server.get_clients()) == 3
+            assert mock.requests[LOGIN] == 1
+
+            # Истёкшая на сервере сессия приводит к повторному входу
+            mock._sessions.clear()
+            async with Server(url, PASSWORD, session_store=store) as server:
+                assert len(await server.get_clients()) == 3
+            assert mock.requests[LOGIN] == 2
+            # Выход удаляет сохранённую сессию
+            assert store.load(url) is None
+
+    asyncio.run(scenario())
+
+
+def test_rejected_cookies_fall_back_to_login(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.json"))
+    mock = MockWGEasy(peers=1)
+
+    async def scenario():
+        async with serve(mock) as url:
+            store.save(url, {"connect.sid": "stale"})
+            async with Server(url, PASSWORD, session_store=store) as server:
+                await server.get_clients()
+            assert mock.requests[LOGIN] == 1
+            assert mock.requests[LIST] == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,39 @@
+from click.testing import CliRunner
+
+from benchmarks.mock_wg_easy import PASSWORD, MockWGEasy
+from wg_easy_api_wrapper.cli import cli
+
+from .mock_server import serve_in_thread
+
+LOGIN = "POST /api/session"
+
+
+def test_shell_dispatches_aliases_with_one_login(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    mock = MockWGEasy(peers=2)
+    uid = next(iter(mock.clients))
+    commands = [
+        "list",
+        f"disable {uid}",
+        f"conf {uid}",
+        "exporter",
+        "unknown",
+        "create",
+        "exit",
+    ]
+    with serve_in_thread(mock) as url:
+        result = CliRunner().invoke(
+            cli, ["--url", url, "--password", PASSWORD, "shell"],
+            obj={}, input="\n".join(commands) + "\n",
+        )
+
+    assert result.exit_code == 0, result.output
+    assert mock.requests[LOGIN] == 1
+    assert mock.requests["POST /api/wireguard/client/{id}/disable"] == 1
+    assert mock.requests["GET /api/wireguard/client/{id}/configuration"] == 1
+    assert not mock.clients[uid]["enabled"]
+    assert "peer-1" in result.output
+    assert "Команда 'exporter' недоступна" in result.output
+    assert "Команда 'unknown' недоступна" in result.output
+    # Ошибка разбора аргументов не завершает shell
+    assert "Missing argument" in result.output
@@ -0,0 +1,78 @@
+import asyncio
+import fnmatch
+
+import pytest
+
+from wg_easy_api_wrapper import snapshot as snapshot_module
+from wg_easy_api_wrapper.client import unix_time
+from wg_easy_api_wrapper.snapshot import QueryError, Snapshot, parse_query
+
+from .mock_server import mock_server
+
+GIB = 1024 ** 3
+
+QUERIES = {
+    "enabled and rx > 1G": lambda c, now: c.enabled and c.transfer_rx > GIB,
+    "idle > 1h": lambda c, now: now - unix_time(c.last_handshake_at or c.created_at) > 3600,
+    "not handshake or tx < 100M": lambda c, now: c.last_handshake_at is None or c.transfer_tx < 100 * 1024 ** 2,
+    "name ~ 'peer-1*' and not (rx >= 5G)": lambda c, now: fnmatch.fnmatchcase(c.name, "peer-1*") and c.transfer_rx < 5 * GIB,
+    "expires": lambda c, now: c.expired_at is not None,
+    "expires_in > 1d": lambda c, now: c.expired_at is not None and unix_time(c.expired_at) - now > 86400,
+}
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(snapshot_module, "_numpy_module", None)
+    else:
+        monkeypatch.setattr(snapshot_module, "_numpy_module", False)
+    return request.param
+
+
+def _clients():
+    async def scenario():
+        async with mock_server(peers=200) as (mock, server):
+            for index, client in enumerate(mock.clients.values()):
+                if index % 3 == 0:
+                    client["enabled"] = False
+                if index % 4 == 0:
+                    client["expiredAt"] = "2099-01-01T00:00:00.000Z"
+            return await server.get_clients()
+
+    return asyncio.run(scenario())
+
+
+def test_queries_match_per_client_evaluation(backend):
+    clients = _clients()
+    now = unix_time(max(client.created_at for client in clients)) + 600
+    snapshot = Snapshot.from_clients(clients, now)
+    assert snapshot.vectorized == (backend == "numpy")
+    for query, expected in QUERIES.items():
+        result = snapshot.query(query)
+        assert list(result.project(["uid"])["uid"]) == [c.uid for c in clients if expected(c, now)], query
+
+
+def test_sort_puts_missing_values_last(backend):
+    clients = _clients()
+    snapshot = Snapshot.from_clients(clients)
+    ordered = snapshot.sort("handshake", descending=True).project(["handshake"])["handshake"]
+    present = [value for value in ordered if value is not None]
+    assert present == sorted(present, reverse=True)
+    assert ordered[:len(present)] == present
+    assert snapshot.sort("rx").head(3).project(["rx"])["rx"] == sorted(c.transfer_rx for c in clients)[:3]
+
+
+@pytest.mark.parametrize("query", [
+    "rx >", "enabled and (", "unknown > 1", "rx > 1Q", "idle > soon", "rx ~ '1*'", "enabled = maybe", "name = a b",
+])
+def test_invalid_queries_raise(query):
+    with pytest.raises(QueryError):
+        parse_query(query)
+
+
+def test_empty_query_selects_all():
+    assert parse_query("") is None
+    snapshot = Snapshot.from_clients(_clients())
+    assert len(snapshot.query("")) == len(snapshot)
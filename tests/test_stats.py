@@ -0,0 +1,49 @@
+import asyncio
+import datetime
+
+from wg_easy_api_wrapper.stats import NEVER, StatsCollector, compute_stats
+
+from .mock_server import mock_server
+
+
+def test_stats_match_direct_computation():
+    async def scenario():
+        async with mock_server(peers=300) as (mock, server):
+            clients = await server.get_clients()
+            now = datetime.datetime.utcnow()
+            stats = compute_stats(clients, top=10, now=now)
+
+            assert stats.total == 300
+            assert stats.transfer_rx == sum(client.transfer_rx for client in clients)
+            assert stats.transfer_tx == sum(client.transfer_tx for client in clients)
+            assert sum(stats.handshake_ages.values()) == 300
+            assert stats.handshake_ages[NEVER] == sum(1 for c in clients if c.last_handshake_at is None)
+            assert stats.online == sum(
+                1 for c in clients
+                if c.last_handshake_at is not None and (now - c.last_handshake_at).total_seconds() <= 180
+            )
+            expected_top = sorted(clients, key=lambda c: c.transfer_rx + c.transfer_tx, reverse=True)[:10]
+            assert [peer.uid for peer in stats.top] == [client.uid for client in expected_top]
+
+            streamed = await server.stats(top=10)
+            assert streamed.total == stats.total
+            assert [peer.uid for peer in streamed.top] == [peer.uid for peer in stats.top]
+
+    asyncio.run(scenario())
+
+
+def test_top_keeps_first_seen_on_ties_and_node():
+    async def scenario():
+        async with mock_server(peers=5) as (mock, server):
+            for client in mock.clients.values():
+                client["transferRx"], client["transferTx"] = 100, 0
+            clients = await server.get_clients()
+            collector = StatsCollector(top=2)
+            collector.add_many(clients[:3], node="a")
+            collector.add_many(clients[3:], node="b")
+            stats = collector.result()
+            assert [peer.uid for peer in stats.top] == [client.uid for client in clients[:2]]
+            assert stats.top[0].as_dict()["node"] == "a"
+            assert StatsCollector(top=0).result().top == []
+
+    asyncio.run(scenario())
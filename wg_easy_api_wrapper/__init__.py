@@ -1,5 +1,26 @@
-from .client import Client
 from .errors import *
-from .server import Server
 
-__all__ = ["Client", "Server"]
+__all__ = ["Client", "Fleet", "Server"]
+
+# Client, Fleet и Server тянут aiohttp, поэтому импортируются при первом
+# обращении: так wg-cli и лёгкие модули пакета загружаются быстрее
+_LAZY_ATTRIBUTES = {
+    "Client": ".client",
+    "Fleet": ".fleet",
+    "Server": ".server",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
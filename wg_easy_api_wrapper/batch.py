@@ -0,0 +1,290 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+from .errors import ClientNotFoundError
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .server import Server
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+DELETE = "delete"
+ENABLE = "enable"
+DISABLE = "disable"
+SET_EXPIRE = "set-expire"
+RENAME = "rename"
+EXPORT_CONF = "export-conf"
+
+OPERATIONS = (CREATE, DELETE, ENABLE, DISABLE, SET_EXPIRE, RENAME, EXPORT_CONF)
+
+OK = "ok"
+ERROR = "error"
+SKIPPED = "skipped"
+
+
+class BatchError(ValueError):
+    """Исключение, возникающее при некорректной операции в файле пакета."""
+    pass
+
+
+def parse_operations(lines: Iterable[str]) -> List[dict]:
+    """
+    Разбирает операции пакета, по одной JSON-строке на операцию.
+
+    Примеры строк:
+        {"op": "create", "name": "alice", "expire_date": "2025-12-31"}
+        {"op": "disable", "name": "bob"}
+        {"op": "set-expire", "uid": "...", "days": 30}
+        {"op": "rename", "name": "alice", "new_name": "alice-laptop"}
+        {"op": "export-conf", "name": "alice", "path": "alice.conf"}
+
+    Клиент указывается полем uid или name. Необязательное поле id
+    возвращается в результате как есть. Пустые строки и строки,
+    начинающиеся с #, пропускаются.
+
+    :return: Список операций; в каждой поле line - номер строки, а для
+        некорректных строк - поле error с описанием ошибки
+    """
+    operations = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        operation = None
+        try:
+            operation = json.loads(line)
+            if not isinstance(operation, dict):
+                raise BatchError("Операция должна быть JSON-объектом.")
+            _validate(operation)
+        except ValueError as e:
+            operation = dict(operation, error=str(e)) if isinstance(operation, dict) else {"error": str(e)}
+        operation["line"] = number
+        operations.append(operation)
+    return operations
+
+
+def _validate(operation: dict):
+    op = operation.get("op")
+    if op not in OPERATIONS:
+        raise BatchError(f"Неизвестная операция: {op!r}. Допустимые: {', '.join(OPERATIONS)}.")
+    if op == CREATE:
+        if not operation.get("name"):
+            raise BatchError("Для create нужно поле name.")
+    elif not operation.get("uid") and not operation.get("name"):
+        raise BatchError(f"Для {op} нужно поле uid или name.")
+    if op == RENAME and not operation.get("new_name"):
+        raise BatchError("Для rename нужно поле new_name.")
+    if op == SET_EXPIRE and "expire_date" not in operation and "days" not in operation:
+        raise BatchError("Для set-expire нужно поле expire_date (null - бессрочно) или days.")
+    if "days" in operation and not isinstance(operation["days"], int):
+        raise BatchError("Поле days должно быть целым числом.")
+
+
+def _expire_date(operation: dict) -> Optional[str]:
+    if operation.get("days") is not None:
+        return (datetime.date.today() + datetime.timedelta(days=operation["days"])).strftime("%Y-%m-%d")
+    return operation.get("expire_date")
+
+
+class _CreatedClients:
+    """
+    Находит UID только что созданных клиентов.
+
+    Одновременные запросы объединяются: список перечитывается один раз для
+    всех созданий, завершившихся к его началу.
+    """
+
+    def __init__(self, server: 'Server', known_uids: Set[str]):
+        self._server = server
+        self._known_uids = known_uids
+        self._created: Dict[str, List['Client']] = {}
+        self._lock = asyncio.Lock()
+
+    async def find(self, name: str) -> 'Client':
+        async with self._lock:
+            # Пока мы ждали блокировку, список мог перечитать другой запрос
+            if not self._created.get(name):
+                for client in await self._server.get_clients():
+                    if client.uid not in self._known_uids:
+                        self._known_uids.add(client.uid)
+                        self._created.setdefault(client.name, []).append(client)
+            created = self._created.get(name)
+            if not created:
+                raise ClientNotFoundError(f"Клиент '{name}' был создан, но не найден.")
+            return created.pop(0)
+
+
+async def run_batch(
+    server: 'Server',
+    operations: Iterable[dict],
+    concurrency: int = 10,
+    out_dir: str = ".",
+) -> AsyncIterator[dict]:
+    """
+    Выполняет операции пакета через одну сессию и отдаёт результаты по мере готовности.
+
+    Имена разрешаются по одному списку клиентов, полученному в начале.
+    Операции над одним клиентом выполняются по порядку строк, над разными
+    клиентами - параллельно, не более concurrency запросов одновременно.
+    После ошибки остальные операции над тем же клиентом пропускаются.
+    Ссылки на имя после create, rename и delete в том же пакете относятся
+    к созданному, переименованному или удалённому клиенту.
+
+    :param operations: Операции из parse_operations
+    :param out_dir: Каталог для export-conf без поля path
+    :return: Асинхронный итератор результатов: line, id, op, uid, name, status
+        ("ok", "error" или "skipped"), changed, а при ошибке - error
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency должно быть не меньше 1.")
+    operations = list(operations)
+
+    clients = await server.get_clients()
+    by_uid = {client.uid: client for client in clients}
+    # Имя -> ключ группы; ключ - UID существующего клиента или ("new", номер строки)
+    names: Dict[str, object] = {}
+    for client in clients:
+        names.setdefault(client.name, client.uid)
+    current_names = {client.uid: client.name for client in clients}
+
+    groups: Dict[object, List[dict]] = {}
+    results: List[dict] = []
+    for operation in operations:
+        if operation.get("error"):
+            results.append(_result(operation, ERROR, error=operation["error"]))
+            continue
+        op = operation["op"]
+        if op == CREATE:
+            key = ("new", operation["line"])
+            current_names[key] = operation["name"]
+            names[operation["name"]] = key
+        elif operation.get("uid"):
+            key = operation["uid"]
+        else:
+            key = names.get(operation["name"])
+            if key is None:
+                results.append(_result(
+                    operation, ERROR, error=f"Клиент с именем '{operation['name']}' не найден.",
+                ))
+                continue
+        groups.setdefault(key, []).append(operation)
+
+        old_name = current_names.get(key)
+        if op == RENAME:
+            if old_name is not None and names.get(old_name) == key:
+                del names[old_name]
+            names[operation["new_name"]] = key
+            current_names[key] = operation["new_name"]
+        elif op == DELETE and old_name is not None and names.get(old_name) == key:
+            del names[old_name]
+
+    for result in results:
+        yield result
+
+    semaphore = asyncio.Semaphore(concurrency)
+    created = _CreatedClients(server, set(by_uid))
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def _run_group(key, group: List[dict]):
+        client = by_uid.get(key) if isinstance(key, str) else None
+        failed = deleted = None
+        for operation in group:
+            if failed is not None:
+                await queue.put(_result(
+                    operation, SKIPPED, client,
+                    error=f"Пропущено после ошибки в строке {failed}.",
+                ))
+                continue
+            try:
+                if deleted is not None:
+                    raise ClientNotFoundError(f"Клиент удалён в строке {deleted}.")
+                client, changed = await _execute(server, operation, client, semaphore, created, out_dir)
+                if operation["op"] == DELETE:
+                    deleted = operation["line"]
+                await queue.put(_result(operation, OK, client, changed=changed))
+            except Exception as e:
+                logger.debug(f"Ошибка в строке {operation['line']}: {e!r}")
+                failed = operation["line"]
+                await queue.put(_result(operation, ERROR, client, error=str(e) or type(e).__name__))
+
+    tasks = [asyncio.ensure_future(_run_group(key, group)) for key, group in groups.items()]
+    remaining = sum(len(group) for group in groups.values())
+    try:
+        while remaining:
+            yield await queue.get()
+            remaining -= 1
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _execute(
+    server: 'Server',
+    operation: dict,
+    client: Optional['Client'],
+    semaphore: asyncio.Semaphore,
+    created: _CreatedClients,
+    out_dir: str,
+):
+    """Выполняет одну операцию; возвращает (клиент после операции, были ли изменения)."""
+    op = operation["op"]
+    if op == CREATE:
+        async with semaphore:
+            await server.create_client(operation["name"], _expire_date(operation))
+        return await created.find(operation["name"]), True
+
+    if client is None:
+        reference = operation.get("uid") or operation.get("name")
+        raise ClientNotFoundError(f"Клиент {reference} не найден.")
+
+    async with semaphore:
+        if op == DELETE:
+            await server.remove_client(client.uid)
+            return client, True
+        if op == ENABLE:
+            if client.enabled:
+                return client, False
+            await client.enable()
+        elif op == DISABLE:
+            if not client.enabled:
+                return client, False
+            await client.disable()
+        elif op == SET_EXPIRE:
+            await server.update_client_expire_date(client.uid, _expire_date(operation))
+        elif op == RENAME:
+            if client.name == operation["new_name"]:
+                return client, False
+            await client.rename(operation["new_name"])
+        elif op == EXPORT_CONF:
+            path = operation.get("path") or os.path.join(out_dir, f"{client.uid}.conf")
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            await client.download_configuration(path)
+    return client, True
+
+
+def _result(
+    operation: dict,
+    status: str,
+    client: 'Client' = None,
+    changed: bool = None,
+    error: str = None,
+) -> dict:
+    result = {"line": operation.get("line"), "op": operation.get("op")}
+    if "id" in operation:
+        result["id"] = operation["id"]
+    result["uid"] = client.uid if client is not None else operation.get("uid")
+    result["name"] = client.name if client is not None else operation.get("name")
+    result["status"] = status
+    if changed is not None:
+        result["changed"] = changed
+    if error is not None:
+        result["error"] = error
+    return result
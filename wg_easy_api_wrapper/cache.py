@@ -0,0 +1,120 @@
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .client import Client
+
+
+class ClientCache:
+    """
+    Кэш списка клиентов с индексами по UID, имени, публичному ключу и адресу.
+
+    Кэш считается актуальным, пока с момента последнего полного заполнения
+    не прошло ``ttl`` секунд. Пока он актуален, поиск клиента выполняется
+    за O(1) без обращения к WG-Easy.
+    """
+
+    def __init__(self, ttl: float):
+        """
+        :param ttl: Время жизни кэша в секундах
+        """
+        self.ttl = ttl
+        self._filled_at: Optional[float] = None
+        self._by_uid: Dict[str, 'Client'] = {}
+        self._by_name: Dict[str, 'Client'] = {}
+        self._by_public_key: Dict[str, 'Client'] = {}
+        self._by_address: Dict[str, 'Client'] = {}
+        self._indexes = {
+            "uid": self._by_uid,
+            "name": self._by_name,
+            "public_key": self._by_public_key,
+            "address": self._by_address,
+        }
+
+    def is_fresh(self) -> bool:
+        """Проверяет, что кэш заполнен и его TTL ещё не истёк."""
+        if self._filled_at is None:
+            return False
+        return time.monotonic() - self._filled_at < self.ttl
+
+    def fill(self, clients: Iterable['Client']):
+        """Полностью заменяет содержимое кэша свежим списком клиентов."""
+        self._clear_indexes()
+        for client in clients:
+            self._index(client)
+        self._filled_at = time.monotonic()
+
+    def invalidate(self):
+        """Помечает кэш устаревшим, следующий поиск перечитает список."""
+        self._filled_at = None
+        self._clear_indexes()
+
+    def clients(self) -> List['Client']:
+        """Возвращает все закэшированные клиенты."""
+        return list(self._by_uid.values())
+
+    def lookup(self, attribute: str, value: str) -> Optional['Client']:
+        """
+        Ищет клиента по значению атрибута.
+
+        :param attribute: Одно из "uid", "name", "public_key", "address"
+        """
+        return self._indexes[attribute].get(value)
+
+    def put(self, client: 'Client'):
+        """Добавляет или заменяет клиента в индексах."""
+        self.remove(client.uid)
+        self._index(client)
+
+    def remove(self, uid: str):
+        """Удаляет клиента из всех индексов."""
+        client = self._by_uid.pop(uid, None)
+        if client is None:
+            return
+        self._unindex_name(client.name, client)
+        self._unindex(self._by_public_key, client.public_key, client)
+        self._unindex(self._by_address, client.address, client)
+
+    def reindex(self, client: 'Client', old_name: str = None, old_address: str = None):
+        """Обновляет индексы после изменения имени или адреса клиента."""
+        if self._by_uid.get(client.uid) is not client:
+            self.put(client)
+            return
+        if old_name is not None:
+            self._unindex_name(old_name, client)
+            self._by_name.setdefault(client.name, client)
+        if old_address is not None:
+            self._unindex(self._by_address, old_address, client)
+            self._by_address[client.address] = client
+
+    def _index(self, client: 'Client'):
+        self._by_uid[client.uid] = client
+        # При дубликатах имён побеждает первый клиент, как и при линейном поиске
+        self._by_name.setdefault(client.name, client)
+        self._by_public_key[client.public_key] = client
+        self._by_address[client.address] = client
+
+    def _unindex_name(self, name: str, client: 'Client'):
+        if self._by_name.get(name) is not client:
+            return
+        # Индекс имён короче индекса UID только при дубликатах имён:
+        # тогда передаём имя следующему клиенту с таким же именем
+        indexed = len(self._by_uid) + (client.uid not in self._by_uid)
+        has_duplicates = len(self._by_name) < indexed
+        del self._by_name[name]
+        if has_duplicates:
+            for other in self._by_uid.values():
+                if other.name == name and other is not client:
+                    self._by_name[name] = other
+                    break
+
+    @staticmethod
+    def _unindex(index: Dict[str, 'Client'], key: str, client: 'Client'):
+        if index.get(key) is client:
+            del index[key]
+
+    def _clear_indexes(self):
+        self._by_uid.clear()
+        self._by_name.clear()
+        self._by_public_key.clear()
+        self._by_address.clear()
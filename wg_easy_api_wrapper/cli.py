@@ -1,28 +1,97 @@
 #!/usr/bin/env python3
-import asyncio
-import os
-import datetime
+import importlib
 import logging
+import os
 
 import click
-from dotenv import load_dotenv
 
-from .server import Server
-from .words_generator import get_random_name
-
-# Настройка логирования
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-@click.group()
+# Команда -> модуль пакета commands и функция команды. Модуль импортируется,
+# только когда команда вызывается или выводится её справка.
+COMMANDS = {
+    'list-clients': 'clients:list_clients',
+    'query': 'clients:query',
+    'stats': 'clients:stats',
+    'create-client': 'clients:create_client',
+    'delete-client': 'clients:delete_client',
+    'enable-client': 'clients:enable_client',
+    'disable-client': 'clients:disable_client',
+    'update-client-expire': 'clients:update_client_expire',
+    'get-qr': 'clients:get_qr',
+    'get-conf': 'clients:get_conf',
+    'generate-clients': 'clients:generate_clients',
+    'export': 'bulk:export',
+    'batch': 'bulk:batch',
+    'apply': 'bulk:apply',
+    'expiry-daemon': 'lifecycle:expiry_daemon',
+    'reap': 'lifecycle:reap',
+    'exporter': 'exporter:exporter',
+    'shell': 'shell:shell',
+}
+
+class LazyGroup(click.Group):
+    """Группа click, которая регистрирует команды при первом обращении к ним."""
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        command = super().get_command(ctx, cmd_name)
+        if command is None and cmd_name in self.lazy_commands:
+            module_name, attribute = self.lazy_commands[cmd_name].split(':')
+            module = importlib.import_module(f'{__package__}.commands.{module_name}')
+            command = getattr(module, attribute)
+            self.add_command(command, cmd_name)
+        return command
+
+@click.group(cls=LazyGroup, lazy_commands=COMMANDS)
 @click.option('--url', default=None, help='WG-Easy server URL')
 @click.option('--password', default=None, help='WG-Easy admin password')
+@click.option('--servers', 'servers_file', default=None, type=click.Path(exists=True, dir_okay=False),
+              help='YAML/JSON-файл со списком серверов для работы с несколькими узлами сразу.')
+@click.option('--session-file', default=None, type=click.Path(dir_okay=False),
+              help='Файл для сохранения сессии между запусками (WG_EASY_SESSION_FILE).')
+@click.option('--logout/--no-logout', default=None,
+              help='Выходить ли из WG-Easy по завершении команды. '
+                   'По умолчанию выход не выполняется, если задан --session-file.')
+@click.option('--limit-per-host', default=None, type=click.IntRange(min=0),
+              help='Максимум соединений к WG-Easy, 0 - без ограничения (WG_EASY_LIMIT_PER_HOST).')
+@click.option('--keepalive-timeout', default=None, type=float,
+              help='Сколько секунд держать простаивающее соединение (WG_EASY_KEEPALIVE_TIMEOUT).')
+@click.option('--dns-cache-ttl', default=None, type=int,
+              help='Время жизни DNS-кэша в секундах (WG_EASY_DNS_CACHE_TTL).')
+@click.option('--timeout', default=None, type=float,
+              help='Таймаут на весь запрос в секундах (WG_EASY_TIMEOUT).')
+@click.option('--connect-timeout', default=None, type=float,
+              help='Таймаут установки соединения в секундах (WG_EASY_CONNECT_TIMEOUT).')
+@click.option('--read-timeout', default=None, type=float,
+              help='Таймаут чтения ответа в секундах (WG_EASY_READ_TIMEOUT).')
+@click.option('--compress/--no-compress', default=None,
+              help='Запрашивать сжатые ответы (WG_EASY_COMPRESS, по умолчанию включено).')
+@click.option('--cache-dir', default=None, type=click.Path(file_okay=False),
+              help='Каталог дискового кэша конфигураций и QR-кодов (WG_EASY_CACHE_DIR).')
+@click.option('--cache-max-size', default=None, type=click.IntRange(min=1),
+              help='Максимальный размер дискового кэша в МиБ (WG_EASY_CACHE_MAX_SIZE, по умолчанию 64).')
+@click.option('--verbose', '-v', is_flag=True, help='Подробный журнал запросов и ошибок в stderr.')
+@click.option('--timings', is_flag=True,
+              help='После команды вывести в stderr сводку задержек и статусов запросов к WG-Easy.')
 @click.pass_context
-def cli(ctx, url, password):
+def cli(ctx, url, password, servers_file, session_file, logout, limit_per_host, keepalive_timeout,
+        dns_cache_ttl, timeout, connect_timeout, read_timeout, compress, cache_dir, cache_max_size, verbose, timings):
     """
     CLI для управления WG-Easy.
     Параметры можно указать через флаги или через файл .env.
     """
+    from dotenv import load_dotenv
+
+    # Журнал настраивает только CLI; модули библиотеки его не трогают
+    logging.basicConfig(level=logging.DEBUG if verbose else logging.WARNING)
+
     # Загружаем переменные окружения из .env, если он существует
     load_dotenv()
 
@@ -34,369 +103,57 @@ def cli(ctx, url, password):
     if password is None:
         password = os.getenv("WG_EASY_PASSWORD", "")
 
+    if session_file is None:
+        session_file = os.getenv("WG_EASY_SESSION_FILE") or None
+
+    # С сохранённой сессией выход сделал бы её бесполезной для следующего запуска
+    if logout is None:
+        logout = session_file is None
+
     ctx.ensure_object(dict)
     ctx.obj['url'] = url
     ctx.obj['password'] = password
-
-@cli.command()
-@click.pass_context
-def list_clients(ctx):
-    """Вывести список всех WireGuard-клиентов."""
-    url = ctx.obj['url']
-    password = ctx.obj['password']
-
-    async def _list():
-        async with Server(url, password) as server:
-            clients = await server.get_clients()
-            if not clients:
-                click.echo("Нет доступных клиентов.")
-                return
-            for client in clients:
-                # Определяем дату истечения
-                expiration_str = "бессрочно"
-                # Здесь предполагается, что информация о дате истечения хранится в поле `expiredDate`
-                # Если такого поля нет, отображаем "бессрочно"
-                # Поскольку мы убрали логику ссылок, используем поле `expiredDate` из клиента, если оно есть
-                # Предполагается, что поле `expiredDate` доступно через JSON и преобразовано в объект Client
-                # Если нет, отображаем "бессрочно"
-                # В текущем Client класс нет поля `expiredDate`, поэтому отображаем "бессрочно"
-
-                # Пример, если бы в классе Client было поле `expired_date`
-                # expiration_str = client.expired_date.strftime('%Y-%m-%d') if client.expired_date else "бессрочно"
-
-                # Так как такого поля нет, просто отображаем "бессрочно"
-                expiration_str = "бессрочно"
-
-                click.echo(
-                    f"UID: {client.uid}\n"
-                    f"  Имя: {client.name}\n"
-                    f"  Включен: {'Да' if client.enabled else 'Нет'}\n"
-                    f"  Адрес: {client.address}\n"
-                    f"  Дата создания: {client.created_at.strftime('%Y-%m-%d')}\n"
-                    f"  Дата последней связи: {client.last_handshake_at.strftime('%Y-%m-%d') if client.last_handshake_at else 'Никогда'}\n"
-                    f"  Перманентный KeepAlive: {client.persistent_keepalive}\n"
-                    f"  Трафик RX: {client.transfer_rx} байт\n"
-                    f"  Трафик TX: {client.transfer_tx} байт\n"
-                    f"  Дата истечения: {expiration_str}\n"
-                    "-------------------------------------"
-                )
-    try:
-        asyncio.run(_list())
-    except Exception as e:
-        logger.exception("Ошибка при выводе списка клиентов")
-        click.echo(f"Ошибка при выводе списка клиентов: {e}")
-
-@cli.command()
-@click.argument('name')
-@click.option('--expire-date', default=None, help="Дата истечения в формате YYYY-MM-DD")
-@click.option('--days', default=None, type=int, help="Количество дней до истечения от сегодняшней даты")
-@click.pass_context
-def create_client(ctx, name, expire_date, days):
-    """
-    Создать нового клиента с заданным ИМЕНЕМ.
-    Если клиент с таким именем уже существует, обновить его дату истечения.
-    Можно указать дату истечения либо в виде абсолютной даты, либо в днях от текущей даты.
-    """
-    url = ctx.obj['url']
-    password = ctx.obj['password']
-
-    async def _create_or_update():
-        # Если указано количество дней, вычисляем дату истечения
-        if days is not None:
-            new_date = datetime.date.today() + datetime.timedelta(days=days)
-            calculated_expire_date = new_date.strftime("%Y-%m-%d")
-        else:
-            calculated_expire_date = expire_date
-
-        async with Server(url, password) as server:
-            try:
-                # Получаем список всех клиентов
-                clients = await server.get_clients()
-                # Ищем клиента с заданным именем
-                existing_client = next((c for c in clients if c.name == name), None)
-                if existing_client:
-                    # Если клиент существует, обновляем его дату истечения
-                    await server.update_client_expire_date(existing_client.uid, calculated_expire_date)
-                    click.echo(
-                        f"Клиент '{name}' уже существует. Дата истечения обновлена до: {calculated_expire_date or 'Нет'}"
-                    )
-                    # Получаем обновлённые данные клиента
-                    client = await server.get_client(existing_client.uid)
-                else:
-                    # Если клиента нет, создаём нового
-                    await server.create_client(name, calculated_expire_date)
-                    click.echo(
-                        f"Клиент '{name}' создан. Дата истечения: {calculated_expire_date or 'Нет'}"
-                    )
-                    # Получаем созданного клиента
-                    client = await server.get_client_by_name(name)
-                    if not client:
-                        raise Exception("Клиент был создан, но не найден.")
-                # Получаем QR-код
-                svg_qr = await client.get_qr_code()
-
-                # Определяем дату истечения
-                if calculated_expire_date:
-                    expiration_str = calculated_expire_date
-                else:
-                    expiration_str = "бессрочно"
-
-                # Отображаем результаты
-                click.echo("\n=== Информация о Клиенте ===")
-                click.echo(f"UID: {client.uid}")
-                click.echo(f"Имя: {client.name}")
-                click.echo(f"Дата истечения: {expiration_str}")
-                click.echo("\n=== QR Код Клиента ===")
-                click.echo(svg_qr)
-                click.echo("==============================\n")
-            except Exception as e:
-                # Логируем полную трассировку ошибки
-                logger.exception("Ошибка при создании или обновлении клиента")
-                click.echo(f"Ошибка при создании или обновлении клиента: {e}")
-
-    try:
-        asyncio.run(_create_or_update())
-    except Exception as e:
-        logger.exception("Необработанная ошибка при создании или обновлении клиента")
-        click.echo(f"Необработанная ошибка при создании или обновлении клиента: {e}")
-
-@cli.command()
-@click.argument('uid')
-@click.pass_context
-def delete_client(ctx, uid):
-    """Удалить клиента по UID."""
-    url = ctx.obj['url']
-    password = ctx.obj['password']
-
-    async def _delete():
-        async with Server(url, password) as server:
-            try:
-                client = await server.get_client(uid)
-                if not client:
-                    click.echo(f"Клиент с UID={uid} не найден.")
-                    return
-                await server.remove_client(uid)
-                click.echo(f"Клиент '{client.name}' (UID={uid}) удален.")
-            except Exception as e:
-                logger.exception("Ошибка при удалении клиента")
-                click.echo(f"Ошибка при удалении клиента: {e}")
-
-    try:
-        asyncio.run(_delete())
-    except Exception as e:
-        logger.exception("Необработанная ошибка при удалении клиента")
-        click.echo(f"Необработанная ошибка при удалении клиента: {e}")
-
-@cli.command()
-@click.argument('uid')
-@click.pass_context
-def enable_client(ctx, uid):
-    """Включить клиента по UID."""
-    url = ctx.obj['url']
-    password = ctx.obj['password']
-
-    async def _enable():
-        async with Server(url, password) as server:
-            try:
-                client = await server.get_client(uid)
-                if not client:
-                    click.echo(f"Клиент с UID={uid} не найден.")
-                    return
-                if client.enabled:
-                    click.echo(f"Клиент '{client.name}' уже включен.")
-                    return
-                await client.enable()
-                click.echo(f"Клиент '{client.name}' (UID={uid}) включен.")
-            except Exception as e:
-                logger.exception("Ошибка при включении клиента")
-                click.echo(f"Ошибка при включении клиента: {e}")
-
-    try:
-        asyncio.run(_enable())
-    except Exception as e:
-        logger.exception("Необработанная ошибка при включении клиента")
-        click.echo(f"Необработанная ошибка при включении клиента: {e}")
-
-@cli.command()
-@click.argument('uid')
-@click.pass_context
-def disable_client(ctx, uid):
-    """Отключить клиента по UID."""
-    url = ctx.obj['url']
-    password = ctx.obj['password']
-
-    async def _disable():
-        async with Server(url, password) as server:
+    ctx.obj['servers_file'] = servers_file
+    ctx.obj['session_file'] = session_file
+    ctx.obj['logout'] = logout
+    # ConnectionConfig создаётся при запуске команды, чтобы не импортировать aiohttp заранее
+    ctx.obj['connection_options'] = dict(
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=dns_cache_ttl,
+        total_timeout=timeout,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        compress=compress,
+    )
+    if cache_dir is None:
+        cache_dir = os.getenv("WG_EASY_CACHE_DIR") or None
+    ctx.obj['disk_cache'] = None
+    if cache_dir:
+        # Размер проверяется, только когда кэш включён: без него переменная не нужна
+        if cache_max_size is None:
+            raw_max_size = os.getenv("WG_EASY_CACHE_MAX_SIZE", "64")
             try:
-                client = await server.get_client(uid)
-                if not client:
-                    click.echo(f"Клиент с UID={uid} не найден.")
-                    return
-                if not client.enabled:
-                    click.echo(f"Клиент '{client.name}' уже отключен.")
-                    return
-                await client.disable()
-                click.echo(f"Клиент '{client.name}' (UID={uid}) отключен.")
-            except Exception as e:
-                logger.exception("Ошибка при отключении клиента")
-                click.echo(f"Ошибка при отключении клиента: {e}")
-
-    try:
-        asyncio.run(_disable())
-    except Exception as e:
-        logger.exception("Необработанная ошибка при отключении клиента")
-        click.echo(f"Необработанная ошибка при отключении клиента: {e}")
-
-@cli.command()
-@click.argument('uid')
-@click.option('--expire-date', default=None, help="Новая дата истечения в формате YYYY-MM-DD")
-@click.option('--days', default=None, type=int, help="Количество дней до нового истечения от сегодняшней даты")
-@click.pass_context
-def update_client_expire(ctx, uid, expire_date, days):
-    """Обновить дату истечения для клиента по UID."""
-    url = ctx.obj['url']
-    password = ctx.obj['password']
-
-    async def _update():
-        # Если указано количество дней, вычисляем новую дату истечения
-        if days is not None:
-            new_date = datetime.date.today() + datetime.timedelta(days=days)
-            calculated_expire_date = new_date.strftime("%Y-%m-%d")
-        else:
-            calculated_expire_date = expire_date
-
-        async with Server(url, password) as server:
-            try:
-                client = await server.get_client(uid)
-                if not client:
-                    click.echo(f"Клиент с UID={uid} не найден.")
-                    return
-                await server.update_client_expire_date(uid, calculated_expire_date)
-                click.echo(
-                    f"Дата истечения для клиента '{client.name}' (UID={uid}) обновлена до: "
-                    f"{calculated_expire_date or 'бессрочно'}"
+                cache_max_size = int(raw_max_size)
+            except ValueError:
+                cache_max_size = 0
+            if cache_max_size < 1:
+                raise click.BadParameter(
+                    f"WG_EASY_CACHE_MAX_SIZE должно быть целым числом МиБ не меньше 1, получено: {raw_max_size!r}.",
+                    param_hint='--cache-max-size',
                 )
-            except Exception as e:
-                logger.exception("Ошибка при обновлении даты истечения")
-                click.echo(f"Ошибка при обновлении даты истечения: {e}")
-
-    try:
-        asyncio.run(_update())
-    except Exception as e:
-        logger.exception("Необработанная ошибка при обновлении даты истечения клиента")
-        click.echo(f"Необработанная ошибка при обновлении даты истечения клиента: {e}")
-
-@cli.command()
-@click.argument('uid')
-@click.pass_context
-def get_qr(ctx, uid):
-    """Получить QR-код клиента в формате SVG по UID."""
-    url = ctx.obj['url']
-    password = ctx.obj['password']
-
-    async def _qr():
-        async with Server(url, password) as server:
-            try:
-                client = await server.get_client(uid)
-                if not client:
-                    click.echo(f"Клиент с UID={uid} не найден.")
-                    return
-                svg_content = await client.get_qr_code()
-                click.echo(svg_content)
-            except Exception as e:
-                logger.exception("Ошибка при получении QR-кода")
-                click.echo(f"Ошибка при получении QR-кода: {e}")
-
-    try:
-        asyncio.run(_qr())
-    except Exception as e:
-        logger.exception("Необработанная ошибка при получении QR-кода клиента")
-        click.echo(f"Необработанная ошибка при получении QR-кода клиента: {e}")
-
-@cli.command()
-@click.argument('uid')
-@click.pass_context
-def get_conf(ctx, uid):
-    """Получить конфигурацию клиента по UID."""
-    url = ctx.obj['url']
-    password = ctx.obj['password']
-
-    async def _conf():
-        async with Server(url, password) as server:
-            try:
-                client = await server.get_client(uid)
-                if not client:
-                    click.echo(f"Клиент с UID={uid} не найден.")
-                    return
-                config_text = await client.get_configuration()
-                click.echo(config_text)
-            except Exception as e:
-                logger.exception("Ошибка при получении конфигурации")
-                click.echo(f"Ошибка при получении конфигурации: {e}")
-
-    try:
-        asyncio.run(_conf())
-    except Exception as e:
-        logger.exception("Необработанная ошибка при получении конфигурации клиента")
-        click.echo(f"Необработанная ошибка при получении конфигурации клиента: {e}")
-
-@cli.command()
-@click.option('--count', '-n', default=1, help='Количество клиентов для генерации.')
-@click.option('--expire-date', default=None, help='Дата истечения в формате YYYY-MM-DD')
-@click.option('--days', default=None, type=int, help='Количество дней до истечения от сегодняшней даты')
-@click.pass_context
-def generate_clients(ctx, count, expire_date, days):
-    """
-    Генерировать случайные имена клиентов (прилагательное + существительное) и создавать их.
-    Пример: 'happy-lion'.
-    """
-    url = ctx.obj['url']
-    password = ctx.obj['password']
+        from .disk_cache import DiskCache
 
-    async def _generate():
-        async with Server(url, password) as server:
-            for _ in range(count):
-                try:
-                    name = get_random_name()
-                    # Если указано количество дней, вычисляем дату истечения
-                    if days is not None:
-                        new_date = datetime.date.today() + datetime.timedelta(days=days)
-                        calculated_expire_date = new_date.strftime("%Y-%m-%d")
-                    else:
-                        calculated_expire_date = expire_date
-                    await server.create_client(name, calculated_expire_date)
-                    click.echo(
-                        f"Создан клиент '{name}'. "
-                        f"Дата истечения: {calculated_expire_date or 'Нет'}"
-                    )
-                    # Получаем созданного клиента
-                    client = await server.get_client_by_name(name)
-                    if not client:
-                        click.echo(f"Не удалось найти созданного клиента '{name}'.")
-                        continue
-                    # Получаем QR-код
-                    svg_qr = await client.get_qr_code()
+        ctx.obj['disk_cache'] = DiskCache(cache_dir, cache_max_size * 1024 * 1024)
+    ctx.obj['instrumentation'] = None
+    if timings:
+        from .instrumentation import Instrumentation
 
-                    # Определяем дату истечения
-                    if calculated_expire_date:
-                        expiration_str = calculated_expire_date
-                    else:
-                        expiration_str = "бессрочно"
+        instrumentation = ctx.obj['instrumentation'] = Instrumentation()
+        ctx.call_on_close(lambda: click.echo(instrumentation.memory.format_table(), err=True))
 
-                    # Отображаем результаты
-                    click.echo("\n=== Информация о Клиенте ===")
-                    click.echo(f"UID: {client.uid}")
-                    click.echo(f"Имя: {client.name}")
-                    click.echo(f"Дата истечения: {expiration_str}")
-                    click.echo("\n=== QR Код Клиента ===")
-                    click.echo(svg_qr)
-                    click.echo("==============================\n")
-                except Exception as e:
-                    logger.exception(f"Ошибка при создании клиента '{name}'")
-                    click.echo(f"Ошибка при создании клиента '{name}': {e}")
+def main():
+    cli(obj={})
 
-    try:
-        asyncio.run(_generate())
-    except Exception as e:
-        logger.exception("Необработанная ошибка при генерации клиентов")
-        click.echo(f"Необработанная ошибка при генерации клиентов: {e}")
+if __name__ == '__main__':
+    main()
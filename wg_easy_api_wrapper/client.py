@@ -1,15 +1,96 @@
+import calendar
+import os
+import tempfile
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 import aiohttp
 
+from .qr import default_renderer
+
 time_format = "%Y-%m-%dT%H:%M:%S.%fZ"
 
+# Размер блока при потоковой записи ответа в файл
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 if TYPE_CHECKING:
+    from .qr import QRRenderer
     from .server import Server
 
 
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """
+    Разбирает метку времени WG-Easy вида 2024-03-01T10:15:30.123Z.
+
+    Фиксированный формат разбирается срезами строки, что в разы быстрее
+    datetime.strptime; для всего остального используется strptime.
+    """
+    if not value:
+        return None
+    if len(value) > 20 and value[19] == "." and value[-1] == "Z":
+        try:
+            return datetime(
+                int(value[0:4]),
+                int(value[5:7]),
+                int(value[8:10]),
+                int(value[11:13]),
+                int(value[14:16]),
+                int(value[17:19]),
+                int(value[20:-1].ljust(6, "0")[:6]),
+            )
+        except ValueError:
+            pass
+    # expiredAt встречается и без долей секунды, и в виде одной даты
+    for fmt in (time_format, "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"Неизвестный формат времени: {value!r}")
+
+
+def unix_time(moment: Optional[datetime]) -> Optional[float]:
+    """Переводит наивное UTC-время WG-Easy в секунды Unix."""
+    if moment is None:
+        return None
+    return calendar.timegm(moment.timetuple()) + moment.microsecond / 1e6
+
+
+def _write_atomic(path: str, data: bytes):
+    """Записывает data во временный файл рядом с path и заменяет им path."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 class Client:
+    # Метки времени хранятся строками и разбираются при первом обращении
+    __slots__ = (
+        "_address",
+        "_created_at_raw",
+        "_created_at",
+        "_enabled",
+        "_expired_at_raw",
+        "_expired_at",
+        "_uid",
+        "_last_handshake_at_raw",
+        "_last_handshake_at",
+        "_name",
+        "_persistent_keepalive",
+        "_public_key",
+        "_transfer_rx",
+        "_transfer_tx",
+        "_updated_at_raw",
+        "_updated_at",
+        "_server",
+    )
+
     def __init__(
         self,
         address: str,
@@ -25,90 +106,151 @@ class Client:
         updated_at: str,
         session: aiohttp.ClientSession,
         server: 'Server',
+        expired_at: str = None,
     ):
+        """
+        Параметр session оставлен для совместимости: запросы выполняются
+        через сессию сервера server.
+        """
         self._address = address
-        self._created_at = datetime.strptime(created_at, time_format)
+        self._created_at_raw = created_at
         self._enabled = bool(enabled)
+        self._expired_at_raw = expired_at
         self._uid = uid
-        self._last_handshake_at = (
-            datetime.strptime(last_handshake_at, time_format) if last_handshake_at else None
-        )
+        self._last_handshake_at_raw = last_handshake_at
         self._name = name
         self._persistent_keepalive = persistent_keepalive
         self._public_key = public_key
         self._transfer_rx = transfer_rx
         self._transfer_tx = transfer_tx
-        self._updated_at = datetime.strptime(updated_at, time_format)
-        self._session = session
+        self._updated_at_raw = updated_at
         self._server = server
 
     @classmethod
     def from_json(cls, json, session: aiohttp.ClientSession, server: 'Server'):
-        return cls(
-            address=json["address"],
-            created_at=json["createdAt"],
-            enabled=bool(json["enabled"]),
-            uid=json["id"],
-            last_handshake_at=json["latestHandshakeAt"],
-            name=json["name"],
-            persistent_keepalive=json["persistentKeepalive"],
-            public_key=json["publicKey"],
-            transfer_rx=json["transferRx"],
-            transfer_tx=json["transferTx"],
-            updated_at=json["updatedAt"],
-            session=session,
-            server=server,
-        )
+        # Заполняем слоты напрямую, минуя разбор именованных аргументов __init__
+        client = cls.__new__(cls)
+        client._address = json["address"]
+        client._created_at_raw = json["createdAt"]
+        client._enabled = bool(json["enabled"])
+        client._expired_at_raw = json.get("expiredAt")
+        client._uid = json["id"]
+        client._last_handshake_at_raw = json["latestHandshakeAt"]
+        client._name = json["name"]
+        client._persistent_keepalive = json["persistentKeepalive"]
+        client._public_key = json["publicKey"]
+        client._transfer_rx = json["transferRx"]
+        client._transfer_tx = json["transferTx"]
+        client._updated_at_raw = json["updatedAt"]
+        client._server = server
+        return client
+
+    @property
+    def _session(self) -> aiohttp.ClientSession:
+        return self._server._session
 
     @property
     def name(self):
         return self._name
 
     @name.setter
-    async def name(self, value):
-        async with self._session.put(
-            self._server.url_builder(f"/api/wireguard/client/{self._uid}/name"),
+    def name(self, value):
+        # Присваивание не может дождаться запроса к API
+        raise AttributeError("Имя клиента меняется через await client.rename(name).")
+
+    async def rename(self, value: str):
+        """Переименовывает клиента."""
+        async with self._server._request(
+            "PUT", f"/api/wireguard/client/{self._uid}/name",
+            action="при обновлении имени клиента",
             json={"name": value},
-        ) as response:
-            if response.status != 200:
-                try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при обновлении имени клиента.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                raise Exception(f"Ошибка при обновлении имени клиента: {error_message}")
-            self._name = value
+        ):
+            old_name, self._name = self._name, value
+            self._server._cache_reindex(self, old_name=old_name)
 
     @property
     def address(self):
         return self._address
 
     @address.setter
-    async def address(self, value):
-        async with self._session.put(
-            self._server.url_builder(f"/api/wireguard/client/{self._uid}/address"),
+    def address(self, value):
+        raise AttributeError("Адрес клиента меняется через await client.update_address(address).")
+
+    async def update_address(self, value: str):
+        """Меняет адрес клиента."""
+        async with self._server._request(
+            "PUT", f"/api/wireguard/client/{self._uid}/address",
+            action="при обновлении адреса клиента",
             json={"address": value},
-        ) as response:
-            if response.status != 200:
-                try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при обновлении адреса клиента.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                raise Exception(f"Ошибка при обновлении адреса клиента: {error_message}")
-            self._address = value
+        ):
+            old_address, self._address = self._address, value
+            # Адрес входит в конфигурацию и QR-код, а новый updatedAt неизвестен
+            # до перечитывания списка: убираем записи по старому ключу
+            for resource in ("configuration", "qrcode.svg"):
+                key = self._cache_key(resource)
+                if key is not None:
+                    self._server.disk_cache.delete(key)
+            self._server._cache_reindex(self, old_address=old_address)
 
     @property
     def created_at(self):
-        return self._created_at
+        try:
+            return self._created_at
+        except AttributeError:
+            self._created_at = parse_timestamp(self._created_at_raw)
+            return self._created_at
+
+    @property
+    def created_at_raw(self) -> str:
+        """Метка createdAt в исходном виде."""
+        return self._created_at_raw
 
     @property
     def last_handshake_at(self):
-        return self._last_handshake_at
+        try:
+            return self._last_handshake_at
+        except AttributeError:
+            self._last_handshake_at = parse_timestamp(self._last_handshake_at_raw)
+            return self._last_handshake_at
+
+    @property
+    def last_handshake_at_raw(self) -> Optional[str]:
+        """Метка latestHandshakeAt в исходном виде или None, если клиент не подключался."""
+        return self._last_handshake_at_raw
 
     @property
     def updated_at(self):
-        return self._updated_at
+        try:
+            return self._updated_at
+        except AttributeError:
+            self._updated_at = parse_timestamp(self._updated_at_raw)
+            return self._updated_at
+
+    @property
+    def updated_at_raw(self) -> str:
+        """Метка updatedAt в исходном виде, удобна как версия клиента."""
+        return self._updated_at_raw
+
+    @property
+    def expired_at(self) -> Optional[datetime]:
+        """Время истечения (UTC) или None, если клиент бессрочный."""
+        try:
+            return self._expired_at
+        except AttributeError:
+            self._expired_at = parse_timestamp(self._expired_at_raw)
+            return self._expired_at
+
+    @property
+    def expired_at_raw(self) -> Optional[str]:
+        """Метка expiredAt в исходном виде или None, если клиент бессрочный."""
+        return self._expired_at_raw
+
+    def is_expired(self, now: datetime = None) -> bool:
+        """Истёк ли срок действия клиента к моменту now (UTC, по умолчанию - сейчас)."""
+        expired_at = self.expired_at
+        if expired_at is None:
+            return False
+        return expired_at <= (now or datetime.utcnow())
 
     @property
     def enabled(self):
@@ -137,60 +279,110 @@ class Client:
     async def enable(self):
         if self._enabled:
             raise ValueError("Client is already enabled")
-        async with self._session.post(
-            self._server.url_builder(f"/api/wireguard/client/{self._uid}/enable"),
+        async with self._server._request(
+            "POST", f"/api/wireguard/client/{self._uid}/enable",
+            action="при включении клиента",
+            # Повторное включение или отключение не меняет результат
+            idempotent=True,
             json={"enable": True},
-        ) as response:
-            if response.status != 200:
-                try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при включении клиента.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                raise Exception(f"Ошибка при включении клиента: {error_message}")
+        ):
             self._enabled = True
+            self._server._cache_reindex(self)
 
     async def disable(self):
         if not self._enabled:
             raise ValueError("Client is already disabled")
-        async with self._session.post(
-            self._server.url_builder(f"/api/wireguard/client/{self._uid}/disable"),
-        ) as response:
-            if response.status != 200:
-                try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при отключении клиента.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                raise Exception(f"Ошибка при отключении клиента: {error_message}")
+        async with self._server._request(
+            "POST", f"/api/wireguard/client/{self._uid}/disable",
+            action="при отключении клиента",
+            # Повторное включение или отключение не меняет результат
+            idempotent=True,
+        ):
             self._enabled = False
+            self._server._cache_reindex(self)
 
     async def get_qr_code(self) -> str:
         """Возвращает SVG-код QR в виде строки."""
-        async with self._session.get(
-            self._server.url_builder(f"/api/wireguard/client/{self._uid}/qrcode.svg")
-        ) as response:
-            if response.status != 200:
-                try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при получении QR-кода.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                raise Exception(f"Ошибка при получении QR-кода: {error_message}")
-            svg_content = await response.text()
-            return svg_content
+        svg_content = await self._get_cached("qrcode.svg", "QR-кода")
+        return svg_content.decode("utf-8")
 
     async def get_configuration(self) -> str:
         """Возвращает конфигурацию клиента (строкой)."""
-        async with self._session.get(
-            self._server.url_builder(f"/api/wireguard/client/{self._uid}/configuration")
-        ) as config_file:
-            if config_file.status != 200:
-                try:
-                    json_response = await config_file.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при получении конфигурации.")
-                except aiohttp.ContentTypeError:
-                    error_message = await config_file.text()
-                raise Exception(f"Ошибка при получении конфигурации: {error_message}")
-            config_text = await config_file.text()
-            return config_text
+        config_text = await self._get_cached("configuration", "конфигурации")
+        return config_text.decode("utf-8")
+
+    async def download_configuration(self, path: str):
+        """Потоково сохраняет конфигурацию клиента в файл path."""
+        await self._download("configuration", path, "конфигурации")
+
+    async def download_qr_code(self, path: str):
+        """Потоково сохраняет SVG-код QR клиента в файл path."""
+        await self._download("qrcode.svg", path, "QR-кода")
+
+    def _cache_key(self, resource: str) -> Optional[str]:
+        """Ключ ресурса в дисковом кэше сервера или None, если кэш не используется."""
+        if self._server.disk_cache is None or not self._updated_at_raw:
+            return None
+        return self._server.disk_cache.make_key(self._server.url, self._uid, self._updated_at_raw, resource)
+
+    async def _get_cached(self, resource: str, what: str) -> bytes:
+        """
+        Возвращает ресурс клиента из дискового кэша сервера, если клиент не
+        менялся с момента записи, иначе запрашивает его у WG-Easy.
+        """
+        key = self._cache_key(resource)
+        if key is not None:
+            body = self._server.disk_cache.get(key)
+            if body is not None:
+                return body
+        async with self._server._request(
+            "GET", f"/api/wireguard/client/{self._uid}/{resource}",
+            action=f"при получении {what}",
+        ) as response:
+            body = await response.read()
+        if key is not None:
+            self._server.disk_cache.put(key, body)
+        return body
+
+    async def render_qr_code(self, fmt: str = "svg", renderer: 'QRRenderer' = None) -> bytes:
+        """
+        Генерирует QR локально по тексту конфигурации, без запроса SVG у WG-Easy.
+
+        :param fmt: "svg", "png" или "ansi" (для вывода в терминал)
+        :param renderer: Генератор QR, например с пулом процессов для массовой
+            выгрузки; по умолчанию общий генератор с кэшем в памяти
+        """
+        renderer = renderer or default_renderer()
+        return await renderer.render(await self.get_configuration(), fmt)
+
+    async def save_qr_code(self, path: str, fmt: str = "png", renderer: 'QRRenderer' = None):
+        """Генерирует QR локально (см. render_qr_code) и атомарно записывает его в path."""
+        _write_atomic(path, await self.render_qr_code(fmt, renderer))
+
+    async def save_qr_png(self, path: str, renderer: 'QRRenderer' = None):
+        """Сохраняет QR клиента в формате PNG в файл path."""
+        await self.save_qr_code(path, "png", renderer)
+
+    async def _download(self, resource: str, path: str, what: str):
+        """
+        Скачивает ресурс клиента блоками и атомарно записывает его в path:
+        данные пишутся во временный файл рядом, который затем заменяет целевой.
+        С дисковым кэшем ресурс берётся через него целиком.
+        """
+        if self._cache_key(resource) is not None:
+            _write_atomic(path, await self._get_cached(resource, what))
+            return
+        async with self._server._request(
+            "GET", f"/api/wireguard/client/{self._uid}/{resource}",
+            action=f"при получении {what}",
+        ) as response:
+            directory = os.path.dirname(os.path.abspath(path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        file.write(chunk)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
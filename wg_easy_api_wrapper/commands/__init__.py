@@ -0,0 +1,81 @@
+"""
+Команды wg-cli.
+
+Модули команд импортируются группой wg-cli только при обращении к команде,
+а aiohttp и остальной стек Server загружаются внутри команд при запуске,
+поэтому wg-cli --help и автодополнение не платят за их импорт.
+"""
+from contextlib import asynccontextmanager
+
+
+def make_connection(ctx):
+    """ConnectionConfig по параметрам командной строки и переменным окружения."""
+    from ..connection import ConnectionConfig
+
+    return ConnectionConfig.from_env(**ctx.obj.get('connection_options', {}))
+
+
+def make_server(ctx):
+    """Создаёт Server по параметрам командной строки."""
+    from ..server import Server
+    from ..session_store import SessionStore
+
+    session_file = ctx.obj.get('session_file')
+    return Server(
+        ctx.obj['url'],
+        ctx.obj['password'],
+        session_store=SessionStore(session_file) if session_file else None,
+        logout_on_exit=ctx.obj.get('logout', True),
+        connection=make_connection(ctx),
+        instrumentation=ctx.obj.get('instrumentation'),
+        cache_ttl=ctx.obj.get('cache_ttl'),
+        disk_cache=ctx.obj.get('disk_cache'),
+    )
+
+
+@asynccontextmanager
+async def open_server(ctx):
+    """Server для команды: общий в wg-cli shell, иначе новый на время команды."""
+    server = ctx.obj.get('server')
+    if server is not None:
+        yield server
+        return
+    async with make_server(ctx) as server:
+        yield server
+
+
+def run(ctx, coroutine):
+    """
+    Выполняет корутину команды: в wg-cli shell - в общем цикле событий,
+    иначе - в новом через asyncio.run.
+    """
+    import asyncio
+
+    loop = ctx.obj.get('loop')
+    if loop is None:
+        return asyncio.run(coroutine)
+    task = loop.create_task(coroutine)
+    try:
+        return loop.run_until_complete(task)
+    except KeyboardInterrupt:
+        # Ctrl+C прерывает только текущую команду, сессия остаётся открытой
+        task.cancel()
+        loop.run_until_complete(asyncio.gather(task, return_exceptions=True))
+        raise
+
+
+def make_fleet(ctx):
+    """Создаёт Fleet из файла, указанного в --servers."""
+    from ..fleet import Fleet
+    from ..session_store import SessionStore
+
+    session_file = ctx.obj.get('session_file')
+    return Fleet.from_file(
+        ctx.obj['servers_file'],
+        connection=make_connection(ctx),
+        session_store=SessionStore(session_file) if session_file else None,
+        logout_on_exit=ctx.obj.get('logout', True),
+        instrumentation=ctx.obj.get('instrumentation'),
+        disk_cache=ctx.obj.get('disk_cache'),
+        strict=False,
+    )
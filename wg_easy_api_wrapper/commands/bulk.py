@@ -0,0 +1,148 @@
+import fnmatch
+import json
+import logging
+
+import click
+
+from . import open_server, run
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.option('--out', 'out_dir', required=True, type=click.Path(file_okay=False),
+              help='Каталог для файлов конфигураций и QR-кодов.')
+@click.option('--uid', 'uids', multiple=True, help='Выгрузить только клиента с этим UID (можно повторять).')
+@click.option('--name-glob', default=None, help="Выгрузить только клиентов, чьё имя подходит под шаблон, например 'office-*'.")
+@click.option('--enabled-only', is_flag=True, help='Выгрузить только включённых клиентов.')
+@click.option('--format', 'formats', multiple=True, type=click.Choice(['conf', 'svg', 'png']),
+              help='Что выгружать (по умолчанию conf и svg); png генерируется локально.')
+@click.option('--concurrency', '-c', default=10, show_default=True, type=click.IntRange(min=1),
+              help='Максимальное число одновременных загрузок.')
+@click.option('--force', is_flag=True, help='Выгрузить всех клиентов, даже если они не менялись.')
+@click.pass_context
+def export(ctx, out_dir, uids, name_glob, enabled_only, formats, concurrency, force):
+    """
+    Выгрузить конфигурации и QR-коды клиентов в каталог.
+    Клиенты, не изменившиеся с прошлой выгрузки, пропускаются.
+    """
+    from ..export import EXPORTED, SKIPPED
+
+    async def _export():
+        async with open_server(ctx) as server:
+            # Фильтруем по мере чтения списка, не сохраняя неподходящих клиентов
+            clients = [
+                client
+                async for client in server.iter_clients()
+                if (not uids or client.uid in uids)
+                and (not name_glob or fnmatch.fnmatchcase(client.name, name_glob))
+                and (not enabled_only or client.enabled)
+            ]
+            results = await server.export_clients(
+                out_dir,
+                clients,
+                formats=formats or ("conf", "svg"),
+                concurrency=concurrency,
+                force=force,
+            )
+            exported = sum(1 for result in results.values() if result == EXPORTED)
+            skipped = sum(1 for result in results.values() if result == SKIPPED)
+            for uid, result in results.items():
+                if isinstance(result, Exception):
+                    click.echo(f"Ошибка при выгрузке клиента UID={uid}: {result}")
+            click.echo(
+                f"Выгружено: {exported}, без изменений: {skipped}, "
+                f"ошибок: {len(results) - exported - skipped}. Каталог: {out_dir}"
+            )
+
+    try:
+        run(ctx, _export())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при выгрузке клиентов")
+        click.echo(f"Необработанная ошибка при выгрузке клиентов: {e}")
+
+
+@click.command()
+@click.argument('ops_file', type=click.File('r', encoding='utf-8'))
+@click.option('--concurrency', '-c', default=10, show_default=True, type=click.IntRange(min=1),
+              help='Максимальное число одновременных запросов к WG-Easy.')
+@click.option('--out-dir', default='.', type=click.Path(file_okay=False),
+              help='Каталог для export-conf без поля path.')
+@click.pass_context
+def batch(ctx, ops_file, concurrency, out_dir):
+    """
+    Выполнить операции из JSONL-файла OPS_FILE ('-' - stdin) в одной сессии.
+    Операции: create, delete, enable, disable, set-expire, rename, export-conf;
+    клиент указывается полем uid или name. Результаты выводятся в stdout
+    построчно в формате NDJSON по мере выполнения, итог - в stderr.
+    """
+    from ..batch import ERROR, OK, parse_operations, run_batch
+
+    operations = parse_operations(ops_file)
+    counts = {OK: 0, ERROR: 0}
+
+    async def _batch():
+        async with open_server(ctx) as server:
+            async for result in run_batch(server, operations, concurrency=concurrency, out_dir=out_dir):
+                counts[result["status"]] = counts.get(result["status"], 0) + 1
+                click.echo(json.dumps(result, ensure_ascii=False))
+
+    try:
+        run(ctx, _batch())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при выполнении пакета")
+        click.echo(f"Необработанная ошибка при выполнении пакета: {e}", err=True)
+        ctx.exit(1)
+    failed = len(operations) - counts[OK]
+    click.echo(f"Выполнено: {counts[OK]}, с ошибками или пропущено: {failed}.", err=True)
+    if failed:
+        ctx.exit(1)
+
+
+@click.command()
+@click.argument('desired_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--prune/--no-prune', default=None,
+              help='Удалять клиентов, которых нет в файле (по умолчанию - как указано в поле prune файла).')
+@click.option('--dry-run', is_flag=True, help='Только показать план изменений.')
+@click.option('--concurrency', '-c', default=10, show_default=True, type=click.IntRange(min=1),
+              help='Максимальное число одновременных запросов к WG-Easy.')
+@click.pass_context
+def apply(ctx, desired_file, prune, dry_run, concurrency):
+    """
+    Привести клиентов к состоянию из YAML/JSON-файла DESIRED_FILE.
+    Выполняются только необходимые изменения: создание, удаление,
+    включение, отключение, переименование и смена даты истечения.
+    """
+    from ..reconcile import load_desired_file
+
+    try:
+        desired, file_prune = load_desired_file(desired_file)
+    except (ValueError, ImportError) as e:
+        raise click.UsageError(f"Ошибка в файле {desired_file}: {e}")
+    if prune is None:
+        prune = bool(file_prune)
+
+    async def _apply():
+        async with open_server(ctx) as server:
+            result = await server.reconcile(desired, prune=prune, dry_run=dry_run, concurrency=concurrency)
+            if not result.changed:
+                click.echo("Изменений нет.")
+                return
+            for action in result.actions:
+                line = action.describe()
+                if action.error is not None:
+                    line = f"{line}: ОШИБКА: {action.error}"
+                click.echo(line)
+            summary = result.summary()
+            click.echo(
+                f"{'План' if dry_run else 'Итого'}: создать {summary['create']}, удалить {summary['delete']}, "
+                f"переименовать {summary['rename']}, включить {summary['enable']}, "
+                f"отключить {summary['disable']}, изменить срок {summary['set-expire']}"
+                + ("" if dry_run else f", ошибок {summary['errors']}") + "."
+            )
+
+    try:
+        run(ctx, _apply())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при применении желаемого состояния")
+        click.echo(f"Необработанная ошибка при применении желаемого состояния: {e}")
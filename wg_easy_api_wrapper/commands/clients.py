@@ -0,0 +1,601 @@
+import datetime
+import json
+import logging
+import os
+import sys
+
+import click
+
+from ..formatting import FIELDS, ClientWriter, RowWriter, client_filter, format_bytes, parse_fields, sort_clients
+from ..words_generator import get_random_names
+from . import make_fleet, open_server, run
+
+logger = logging.getLogger(__name__)
+
+
+def _format_client(client) -> str:
+    """Форматирует описание клиента для вывода в list-clients."""
+    if client.expired_at is None:
+        expiration_str = "бессрочно"
+    else:
+        expiration_str = client.expired_at.strftime('%Y-%m-%d')
+        if client.is_expired():
+            expiration_str += " (истёк)"
+    return (
+        f"UID: {client.uid}\n"
+        f"  Имя: {client.name}\n"
+        f"  Включен: {'Да' if client.enabled else 'Нет'}\n"
+        f"  Адрес: {client.address}\n"
+        f"  Дата создания: {client.created_at.strftime('%Y-%m-%d')}\n"
+        f"  Дата последней связи: {client.last_handshake_at.strftime('%Y-%m-%d') if client.last_handshake_at else 'Никогда'}\n"
+        f"  Перманентный KeepAlive: {client.persistent_keepalive}\n"
+        f"  Трафик RX: {client.transfer_rx} байт\n"
+        f"  Трафик TX: {client.transfer_tx} байт\n"
+        f"  Дата истечения: {expiration_str}\n"
+        "-------------------------------------"
+    )
+
+
+@click.command()
+@click.option('--format', 'fmt', default='text', show_default=True,
+              type=click.Choice(['text', 'table', 'json', 'ndjson', 'csv']),
+              help='Формат вывода; text - подробное описание каждого клиента.')
+@click.option('--fields', default=None,
+              help=f"Поля через запятую, например name,enabled,transfer_rx. Доступные: {', '.join(FIELDS)}.")
+@click.option('--sort', 'sort_field', default=None,
+              help="Поле сортировки, '-' перед именем - по убыванию, например -transfer_rx.")
+@click.option('--enabled/--disabled', default=None, help='Показать только включённых или только отключённых клиентов.')
+@click.option('--name-glob', default=None, help="Показать только клиентов, чьё имя подходит под шаблон, например 'office-*'.")
+@click.pass_context
+def list_clients(ctx, fmt, fields, sort_field, enabled, name_glob):
+    """
+    Вывести список WireGuard-клиентов.
+    Без --sort форматы json, ndjson и csv выводятся по мере чтения списка.
+    """
+    try:
+        fields = parse_fields(fields, fmt)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--fields')
+    if sort_field and sort_field.lstrip('-') not in FIELDS:
+        raise click.BadParameter(f"Неизвестное поле: {sort_field.lstrip('-')}.", param_hint='--sort')
+
+    matches = client_filter(enabled, name_glob)
+    fleet_mode = bool(ctx.obj.get('servers_file'))
+    stdout = click.get_text_stream('stdout')
+    writer = None if fmt == 'text' else ClientWriter(stdout.write, fmt, fields, node=fleet_mode)
+
+    def _emit(client, node=None):
+        if writer is None:
+            click.echo(_format_client(client))
+        else:
+            writer.write(client, node)
+
+    async def _list():
+        async with open_server(ctx) as server:
+            found = 0
+            if sort_field:
+                clients = [client async for client in server.iter_clients() if matches(client)]
+                for client in sort_clients(clients, sort_field):
+                    _emit(client)
+                found = len(clients)
+            else:
+                async for client in server.iter_clients():
+                    if matches(client):
+                        found += 1
+                        _emit(client)
+            if writer is not None:
+                writer.close()
+            elif not found:
+                click.echo("Нет доступных клиентов.")
+
+    async def _list_fleet():
+        async with make_fleet(ctx) as fleet:
+            # Узлы опрашиваются параллельно, недоступные узлы не мешают выводу остальных
+            results = dict(fleet.login_errors)
+            results.update(await fleet.map(lambda server: server.get_clients()))
+            for node, clients in results.items():
+                if writer is None:
+                    click.echo(f"=== Узел: {node} ===")
+                if isinstance(clients, Exception):
+                    # Ошибки узлов - в stderr, чтобы не портить машиночитаемый вывод
+                    click.echo(f"Ошибка при получении клиентов узла {node}: {clients}", err=writer is not None)
+                    continue
+                clients = [client for client in clients if matches(client)]
+                if sort_field:
+                    clients = sort_clients(clients, sort_field)
+                if writer is None and not clients:
+                    click.echo("Нет доступных клиентов.")
+                for client in clients:
+                    _emit(client, node)
+            if writer is not None:
+                writer.close()
+
+    try:
+        if fleet_mode:
+            run(ctx, _list_fleet())
+            return
+        run(ctx, _list())
+        stdout.flush()
+    except BrokenPipeError:
+        # Читатель закрыл канал (например, head): остальной вывод не нужен.
+        # stdout перенаправляется в /dev/null, чтобы Python не сообщал об
+        # ошибке при его закрытии на выходе.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        ctx.exit(1)
+    except Exception as e:
+        logger.exception("Ошибка при выводе списка клиентов")
+        click.echo(f"Ошибка при выводе списка клиентов: {e}")
+
+
+# Поля снимка для wg-cli query; список дублирует snapshot.FIELDS, чтобы
+# справка не импортировала модуль клиента вместе с aiohttp
+QUERY_FIELDS = ('uid', 'name', 'address', 'public_key', 'enabled', 'rx', 'tx',
+                'created', 'updated', 'handshake', 'expires', 'idle', 'age', 'expires_in')
+QUERY_TABLE_FIELDS = ('uid', 'name', 'enabled', 'address', 'rx', 'tx', 'idle', 'expires_in')
+
+
+@click.command()
+@click.argument('expression', required=False, default='')
+@click.option('--format', 'fmt', default='table', show_default=True,
+              type=click.Choice(['table', 'json', 'ndjson', 'csv']), help='Формат вывода.')
+@click.option('--fields', default=None,
+              help=f"Поля через запятую. Доступные: {', '.join(QUERY_FIELDS)}.")
+@click.option('--sort', 'sort_field', default=None,
+              help="Поле сортировки, '-' перед именем - по убыванию, например -rx.")
+@click.option('--limit', default=None, type=click.IntRange(min=0), help='Вывести не больше N клиентов.')
+@click.option('--count', 'count_only', is_flag=True, help='Вывести только количество подходящих клиентов.')
+@click.pass_context
+def query(ctx, expression, fmt, fields, sort_field, limit, count_only):
+    """
+    Отобрать клиентов запросом, например: 'enabled and rx > 1G and idle > 30d'.
+
+    \b
+    Сравнения: = != > >= < <= и ~ (шаблон: name ~ 'office-*'),
+    объединяются через and, or, not и скобки.
+    rx, tx - байты, суффиксы K, M, G, T (по 1024);
+    idle, age, expires_in - секунды, суффиксы s, m, h, d, w;
+    created, updated, handshake, expires - дата YYYY-MM-DD (UTC).
+    Поле без сравнения: enabled - включён, handshake - подключался хотя бы раз.
+    """
+    from ..snapshot import QueryError, parse_query, table_cell
+
+    if fields:
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in QUERY_FIELDS]
+        if unknown:
+            raise click.BadParameter(f"Неизвестные поля: {', '.join(unknown)}.", param_hint='--fields')
+    else:
+        fields = list(QUERY_TABLE_FIELDS if fmt == 'table' else QUERY_FIELDS)
+    if sort_field and sort_field.lstrip('-') not in QUERY_FIELDS:
+        raise click.BadParameter(f"Неизвестное поле: {sort_field.lstrip('-')}.", param_hint='--sort')
+    try:
+        tree = parse_query(expression)
+    except QueryError as e:
+        raise click.BadParameter(str(e), param_hint='EXPRESSION')
+
+    stdout = click.get_text_stream('stdout')
+
+    async def _query():
+        async with open_server(ctx) as server:
+            snapshot = await server.snapshot()
+        result = snapshot.query(tree)
+        if count_only:
+            click.echo(len(result))
+            return
+        if sort_field:
+            result = result.sort(sort_field.lstrip('-'), descending=sort_field.startswith('-'))
+        if limit is not None:
+            result = result.head(limit)
+        writer = RowWriter(stdout.write, fmt, fields, table_cell=table_cell)
+        columns = result.project(fields)
+        for index in range(len(result)):
+            writer.write_row([columns[field][index] for field in fields])
+        writer.close()
+
+    try:
+        run(ctx, _query())
+        stdout.flush()
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        ctx.exit(1)
+    except Exception as e:
+        logger.exception("Ошибка при выполнении запроса")
+        click.echo(f"Ошибка при выполнении запроса: {e}")
+
+
+def _format_stats(stats, node_column: bool) -> str:
+    """Таблица сводки wg-cli stats."""
+    buffer = []
+    lines = [
+        f"Клиентов: {stats.total}, включено: {stats.enabled}, "
+        f"онлайн (рукопожатие за {stats.online_window:g} с): {stats.online}",
+        f"Трафик: RX {format_bytes(stats.transfer_rx)}, TX {format_bytes(stats.transfer_tx)}, "
+        f"всего {format_bytes(stats.transfer_rx + stats.transfer_tx)}",
+        "",
+        "Последнее рукопожатие:",
+    ]
+    labels = {'never': 'никогда', '>30d': 'более 30d'}
+    for label, count in stats.handshake_ages.items():
+        lines.append(f"  {labels.get(label, 'до ' + label):<10} {count}")
+    if stats.top:
+        lines += ["", f"Топ-{len(stats.top)} по трафику:"]
+        columns = (['node'] if node_column else []) + ['name', 'uid', 'transfer_rx', 'transfer_tx', 'transfer_total']
+        writer = RowWriter(buffer.append, 'table', columns)
+        for peer in stats.top:
+            data = peer.as_dict()
+            writer.write_row([data.get(column) for column in columns])
+        writer.close()
+    return "\n".join(lines) + "\n" + "".join(buffer)
+
+
+@click.command()
+@click.option('--format', 'fmt', default='table', show_default=True, type=click.Choice(['table', 'json']),
+              help='Формат вывода.')
+@click.option('--top', default=20, show_default=True, type=click.IntRange(min=0),
+              help='Сколько самых активных по трафику клиентов показать.')
+@click.option('--online-window', default=180, show_default=True, type=click.FloatRange(min=0),
+              help='Клиент онлайн, если последнее рукопожатие было не раньше стольких секунд назад.')
+@click.pass_context
+def stats(ctx, fmt, top, online_window):
+    """
+    Сводка по клиентам: суммарный трафик, число клиентов онлайн,
+    давность рукопожатий и самые активные клиенты.
+    С --servers считается по всем узлам вместе.
+    """
+    fleet_mode = bool(ctx.obj.get('servers_file'))
+
+    async def _stats():
+        async with open_server(ctx) as server:
+            return await server.stats(top=top, online_window=online_window)
+
+    async def _stats_fleet():
+        from ..stats import StatsCollector
+
+        async with make_fleet(ctx) as fleet:
+            results = dict(fleet.login_errors)
+            results.update(await fleet.map(lambda server: server.get_clients()))
+            collector = StatsCollector(top=top, online_window=online_window)
+            for node, clients in results.items():
+                if isinstance(clients, Exception):
+                    click.echo(f"Ошибка при получении клиентов узла {node}: {clients}", err=True)
+                    continue
+                collector.add_many(clients, node)
+            return collector.result()
+
+    try:
+        result = run(ctx, _stats_fleet() if fleet_mode else _stats())
+    except Exception as e:
+        logger.exception("Ошибка при подсчёте статистики")
+        click.echo(f"Ошибка при подсчёте статистики: {e}")
+        return
+    if fmt == 'json':
+        click.echo(json.dumps(result.as_dict(), indent=2, ensure_ascii=False))
+    else:
+        click.echo(_format_stats(result, fleet_mode), nl=False)
+
+
+@click.command()
+@click.argument('name')
+@click.option('--expire-date', default=None, help="Дата истечения в формате YYYY-MM-DD")
+@click.option('--days', default=None, type=int, help="Количество дней до истечения от сегодняшней даты")
+@click.pass_context
+def create_client(ctx, name, expire_date, days):
+    """
+    Создать нового клиента с заданным ИМЕНЕМ.
+    Если клиент с таким именем уже существует, обновить его дату истечения.
+    Можно указать дату истечения либо в виде абсолютной даты, либо в днях от текущей даты.
+    """
+    async def _create_or_update():
+        # Если указано количество дней, вычисляем дату истечения
+        if days is not None:
+            new_date = datetime.date.today() + datetime.timedelta(days=days)
+            calculated_expire_date = new_date.strftime("%Y-%m-%d")
+        else:
+            calculated_expire_date = expire_date
+
+        async with open_server(ctx) as server:
+            try:
+                # Ищем клиента с заданным именем (в shell - по индексу в памяти)
+                existing_client = await server.get_client_by_name(name)
+                if existing_client:
+                    # Если клиент существует, обновляем его дату истечения
+                    await server.update_client_expire_date(existing_client.uid, calculated_expire_date)
+                    click.echo(
+                        f"Клиент '{name}' уже существует. Дата истечения обновлена до: {calculated_expire_date or 'Нет'}"
+                    )
+                    # Получаем обновлённые данные клиента
+                    client = await server.get_client(existing_client.uid)
+                else:
+                    # Если клиента нет, создаём нового
+                    await server.create_client(name, calculated_expire_date)
+                    click.echo(
+                        f"Клиент '{name}' создан. Дата истечения: {calculated_expire_date or 'Нет'}"
+                    )
+                    # Получаем созданного клиента
+                    client = await server.get_client_by_name(name)
+                    if not client:
+                        raise Exception("Клиент был создан, но не найден.")
+                # Получаем QR-код
+                svg_qr = await client.get_qr_code()
+
+                # Определяем дату истечения
+                if calculated_expire_date:
+                    expiration_str = calculated_expire_date
+                else:
+                    expiration_str = "бессрочно"
+
+                # Отображаем результаты
+                click.echo("\n=== Информация о Клиенте ===")
+                click.echo(f"UID: {client.uid}")
+                click.echo(f"Имя: {client.name}")
+                click.echo(f"Дата истечения: {expiration_str}")
+                click.echo("\n=== QR Код Клиента ===")
+                click.echo(svg_qr)
+                click.echo("==============================\n")
+            except Exception as e:
+                # Логируем полную трассировку ошибки
+                logger.exception("Ошибка при создании или обновлении клиента")
+                click.echo(f"Ошибка при создании или обновлении клиента: {e}")
+
+    try:
+        run(ctx, _create_or_update())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при создании или обновлении клиента")
+        click.echo(f"Необработанная ошибка при создании или обновлении клиента: {e}")
+
+
+@click.command()
+@click.argument('uid')
+@click.pass_context
+def delete_client(ctx, uid):
+    """Удалить клиента по UID."""
+    async def _delete():
+        async with open_server(ctx) as server:
+            try:
+                client = await server.get_client(uid)
+                if not client:
+                    click.echo(f"Клиент с UID={uid} не найден.")
+                    return
+                await server.remove_client(uid)
+                click.echo(f"Клиент '{client.name}' (UID={uid}) удален.")
+            except Exception as e:
+                logger.exception("Ошибка при удалении клиента")
+                click.echo(f"Ошибка при удалении клиента: {e}")
+
+    try:
+        run(ctx, _delete())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при удалении клиента")
+        click.echo(f"Необработанная ошибка при удалении клиента: {e}")
+
+
+@click.command()
+@click.argument('uid')
+@click.pass_context
+def enable_client(ctx, uid):
+    """Включить клиента по UID."""
+    async def _enable():
+        async with open_server(ctx) as server:
+            try:
+                client = await server.get_client(uid)
+                if not client:
+                    click.echo(f"Клиент с UID={uid} не найден.")
+                    return
+                if client.enabled:
+                    click.echo(f"Клиент '{client.name}' уже включен.")
+                    return
+                await client.enable()
+                click.echo(f"Клиент '{client.name}' (UID={uid}) включен.")
+            except Exception as e:
+                logger.exception("Ошибка при включении клиента")
+                click.echo(f"Ошибка при включении клиента: {e}")
+
+    try:
+        run(ctx, _enable())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при включении клиента")
+        click.echo(f"Необработанная ошибка при включении клиента: {e}")
+
+
+@click.command()
+@click.argument('uid')
+@click.pass_context
+def disable_client(ctx, uid):
+    """Отключить клиента по UID."""
+    async def _disable():
+        async with open_server(ctx) as server:
+            try:
+                client = await server.get_client(uid)
+                if not client:
+                    click.echo(f"Клиент с UID={uid} не найден.")
+                    return
+                if not client.enabled:
+                    click.echo(f"Клиент '{client.name}' уже отключен.")
+                    return
+                await client.disable()
+                click.echo(f"Клиент '{client.name}' (UID={uid}) отключен.")
+            except Exception as e:
+                logger.exception("Ошибка при отключении клиента")
+                click.echo(f"Ошибка при отключении клиента: {e}")
+
+    try:
+        run(ctx, _disable())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при отключении клиента")
+        click.echo(f"Необработанная ошибка при отключении клиента: {e}")
+
+
+@click.command()
+@click.argument('uid')
+@click.option('--expire-date', default=None, help="Новая дата истечения в формате YYYY-MM-DD")
+@click.option('--days', default=None, type=int, help="Количество дней до нового истечения от сегодняшней даты")
+@click.pass_context
+def update_client_expire(ctx, uid, expire_date, days):
+    """Обновить дату истечения для клиента по UID."""
+    async def _update():
+        # Если указано количество дней, вычисляем новую дату истечения
+        if days is not None:
+            new_date = datetime.date.today() + datetime.timedelta(days=days)
+            calculated_expire_date = new_date.strftime("%Y-%m-%d")
+        else:
+            calculated_expire_date = expire_date
+
+        async with open_server(ctx) as server:
+            try:
+                client = await server.get_client(uid)
+                if not client:
+                    click.echo(f"Клиент с UID={uid} не найден.")
+                    return
+                await server.update_client_expire_date(uid, calculated_expire_date)
+                click.echo(
+                    f"Дата истечения для клиента '{client.name}' (UID={uid}) обновлена до: "
+                    f"{calculated_expire_date or 'бессрочно'}"
+                )
+            except Exception as e:
+                logger.exception("Ошибка при обновлении даты истечения")
+                click.echo(f"Ошибка при обновлении даты истечения: {e}")
+
+    try:
+        run(ctx, _update())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при обновлении даты истечения клиента")
+        click.echo(f"Необработанная ошибка при обновлении даты истечения клиента: {e}")
+
+
+@click.command()
+@click.argument('uid')
+@click.option('--format', 'fmt', default='svg', show_default=True, type=click.Choice(['svg', 'png', 'ansi']),
+              help='Формат QR-кода; ansi - для вывода в терминал.')
+@click.option('--out', default=None, type=click.Path(dir_okay=False),
+              help='Сохранить QR-код в файл вместо вывода.')
+@click.option('--local', is_flag=True,
+              help='Генерировать SVG локально по конфигурации (PNG и ANSI генерируются локально всегда).')
+@click.pass_context
+def get_qr(ctx, uid, fmt, out, local):
+    """Получить QR-код клиента по UID."""
+    from ..client import _write_atomic
+    from ..qr import local_rendering_available, svg_to_png
+
+    if fmt == 'png' and not out:
+        raise click.UsageError("Для формата png укажите файл: --out qr.png")
+
+    async def _qr():
+        async with open_server(ctx) as server:
+            try:
+                client = await server.get_client(uid)
+                if not client:
+                    click.echo(f"Клиент с UID={uid} не найден.")
+                    return
+                if fmt == 'svg' and not local:
+                    if out:
+                        await client.download_qr_code(out)
+                    else:
+                        click.echo(await client.get_qr_code())
+                elif fmt == 'png' and not local_rendering_available():
+                    # Без segno/qrcode растеризуем SVG, сгенерированный WG-Easy
+                    _write_atomic(out, svg_to_png(await client.get_qr_code()))
+                elif out:
+                    await client.save_qr_code(out, fmt)
+                else:
+                    click.echo((await client.render_qr_code(fmt)).decode('utf-8'), nl=False)
+                if out:
+                    click.echo(f"QR-код клиента сохранён в {out}")
+            except Exception as e:
+                logger.exception("Ошибка при получении QR-кода")
+                click.echo(f"Ошибка при получении QR-кода: {e}")
+
+    try:
+        run(ctx, _qr())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при получении QR-кода клиента")
+        click.echo(f"Необработанная ошибка при получении QR-кода клиента: {e}")
+
+
+@click.command()
+@click.argument('uid')
+@click.pass_context
+def get_conf(ctx, uid):
+    """Получить конфигурацию клиента по UID."""
+    async def _conf():
+        async with open_server(ctx) as server:
+            try:
+                client = await server.get_client(uid)
+                if not client:
+                    click.echo(f"Клиент с UID={uid} не найден.")
+                    return
+                config_text = await client.get_configuration()
+                click.echo(config_text)
+            except Exception as e:
+                logger.exception("Ошибка при получении конфигурации")
+                click.echo(f"Ошибка при получении конфигурации: {e}")
+
+    try:
+        run(ctx, _conf())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при получении конфигурации клиента")
+        click.echo(f"Необработанная ошибка при получении конфигурации клиента: {e}")
+
+
+@click.command()
+@click.option('--count', '-n', default=1, help='Количество клиентов для генерации.')
+@click.option('--expire-date', default=None, help='Дата истечения в формате YYYY-MM-DD')
+@click.option('--days', default=None, type=int, help='Количество дней до истечения от сегодняшней даты')
+@click.option('--concurrency', '-c', default=10, show_default=True, type=click.IntRange(min=1),
+              help='Максимальное число одновременных запросов к WG-Easy.')
+@click.pass_context
+def generate_clients(ctx, count, expire_date, days, concurrency):
+    """
+    Генерировать случайные имена клиентов (прилагательное + существительное) и создавать их.
+    Пример: 'happy-lion'.
+    """
+    import asyncio
+
+    # Если указано количество дней, вычисляем дату истечения
+    if days is not None:
+        new_date = datetime.date.today() + datetime.timedelta(days=days)
+        calculated_expire_date = new_date.strftime("%Y-%m-%d")
+    else:
+        calculated_expire_date = expire_date
+    expiration_str = calculated_expire_date or "бессрочно"
+
+    async def _generate():
+        async with open_server(ctx) as server:
+            names = get_random_names(count)
+            results = await server.create_clients(names, calculated_expire_date, concurrency=concurrency)
+
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def _qr(client):
+                async with semaphore:
+                    return await client.get_qr_code()
+
+            created = [result for result in results.values() if not isinstance(result, Exception)]
+            qr_codes = await asyncio.gather(*(_qr(client) for client in created), return_exceptions=True)
+
+            for client, svg_qr in zip(created, qr_codes):
+                click.echo(
+                    f"Создан клиент '{client.name}'. "
+                    f"Дата истечения: {calculated_expire_date or 'Нет'}"
+                )
+                # Отображаем результаты
+                click.echo("\n=== Информация о Клиенте ===")
+                click.echo(f"UID: {client.uid}")
+                click.echo(f"Имя: {client.name}")
+                click.echo(f"Дата истечения: {expiration_str}")
+                click.echo("\n=== QR Код Клиента ===")
+                if isinstance(svg_qr, Exception):
+                    click.echo(f"Ошибка при получении QR-кода: {svg_qr}")
+                else:
+                    click.echo(svg_qr)
+                click.echo("==============================\n")
+
+            for name, result in results.items():
+                if isinstance(result, Exception):
+                    logger.error(f"Ошибка при создании клиента '{name}': {result}")
+                    click.echo(f"Ошибка при создании клиента '{name}': {result}")
+
+    try:
+        run(ctx, _generate())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при генерации клиентов")
+        click.echo(f"Необработанная ошибка при генерации клиентов: {e}")
@@ -0,0 +1,38 @@
+import logging
+
+import click
+
+from . import open_server, run
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.option('--listen', default=':9586', show_default=True, help='Адрес HTTP-сервера метрик, например 127.0.0.1:9586.')
+@click.option('--interval', default=30.0, show_default=True, type=click.FloatRange(min=1),
+              help='Интервал обновления списка клиентов в секундах.')
+@click.pass_context
+def exporter(ctx, listen, interval):
+    """
+    Запустить экспортёр метрик Prometheus.
+    Метрики обновляются в фоне и отдаются из памяти на /metrics.
+    """
+    from ..exporter import MetricsExporter, parse_listen
+
+    try:
+        host, port = parse_listen(listen)
+    except ValueError:
+        raise click.BadParameter(f"Некорректный адрес: {listen}", param_hint='--listen')
+
+    async def _serve():
+        async with open_server(ctx) as server:
+            click.echo(f"Экспортёр метрик слушает {host}:{port}, обновление каждые {interval:g} с.")
+            await MetricsExporter(server, interval).serve(host, port)
+
+    try:
+        run(ctx, _serve())
+    except KeyboardInterrupt:
+        click.echo("Экспортёр остановлен.")
+    except Exception as e:
+        logger.exception("Необработанная ошибка в экспортёре метрик")
+        click.echo(f"Необработанная ошибка в экспортёре метрик: {e}")
@@ -0,0 +1,113 @@
+import logging
+
+import click
+
+from . import open_server, run
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.option('--action', type=click.Choice(['disable', 'delete']), default='disable', show_default=True,
+              help='Что делать с клиентами, срок которых истёк.')
+@click.option('--refresh-interval', default=300.0, show_default=True, type=click.FloatRange(min=1),
+              help='Как часто перечитывать список клиентов, в секундах.')
+@click.option('--concurrency', '-c', default=10, show_default=True, type=click.IntRange(min=1),
+              help='Максимальное число одновременных запросов к WG-Easy.')
+@click.option('--dry-run', is_flag=True, help='Только сообщать о клиентах с истёкшим сроком.')
+@click.option('--once', is_flag=True, help='Обработать истёкших клиентов один раз и завершиться.')
+@click.pass_context
+def expiry_daemon(ctx, action, refresh_interval, concurrency, dry_run, once):
+    """
+    Отключать или удалять клиентов по истечении срока действия.
+    Ближайшие сроки хранятся в куче; между обновлениями списка
+    демон спит до ближайшего срока.
+    """
+    from ..expiry import ExpirySweeper
+
+    verb = {'disable': "отключен", 'delete': "удалён"}[action]
+
+    def _report(client, error):
+        if error is not None:
+            click.echo(f"Ошибка для клиента '{client.name}' (UID={client.uid}): {error}")
+        elif dry_run:
+            click.echo(f"Срок истёк: '{client.name}' (UID={client.uid}), {client.expired_at:%Y-%m-%d %H:%M}")
+        else:
+            click.echo(f"Клиент '{client.name}' (UID={client.uid}) {verb}: срок истёк {client.expired_at:%Y-%m-%d %H:%M}")
+
+    async def _sweep():
+        async with open_server(ctx) as server:
+            sweeper = ExpirySweeper(
+                server,
+                action=action,
+                refresh_interval=refresh_interval,
+                concurrency=concurrency,
+                dry_run=dry_run,
+                on_result=_report,
+            )
+            if once:
+                await sweeper.refresh()
+                await sweeper.sweep()
+                return
+            click.echo(f"Демон истечения запущен, список обновляется каждые {refresh_interval:g} с.")
+            await sweeper.run()
+
+    try:
+        run(ctx, _sweep())
+    except KeyboardInterrupt:
+        click.echo("Демон истечения остановлен.")
+    except Exception as e:
+        logger.exception("Необработанная ошибка в демоне истечения")
+        click.echo(f"Необработанная ошибка в демоне истечения: {e}")
+
+
+@click.command()
+@click.option('--idle-days', required=True, type=click.FloatRange(min=0),
+              help='Сколько дней без рукопожатий считать клиента неактивным.')
+@click.option('--action', type=click.Choice(['disable', 'delete']), default='disable', show_default=True,
+              help='Что делать с неактивными клиентами.')
+@click.option('--dry-run', is_flag=True, help='Только показать неактивных клиентов.')
+@click.option('--concurrency', '-c', default=10, show_default=True, type=click.IntRange(min=1),
+              help='Максимальное число одновременных запросов к WG-Easy.')
+@click.pass_context
+def reap(ctx, idle_days, action, dry_run, concurrency):
+    """
+    Отключить или удалить клиентов без рукопожатий за --idle-days дней.
+    Клиенты, ни разу не подключавшиеся, отбираются по дате создания.
+    """
+    verb = {'disable': "отключен", 'delete': "удалён"}[action]
+
+    def _report(peer):
+        client = peer.client
+        if peer.never_connected:
+            reason = f"не подключался, создан {peer.idle_since:%Y-%m-%d}"
+        else:
+            reason = f"последнее рукопожатие {peer.idle_since:%Y-%m-%d}"
+        line = f"'{client.name}' (UID={client.uid}): {reason}, неактивен {peer.idle_days:.0f} дн."
+        if peer.error is not None:
+            line += f" - ошибка: {peer.error}"
+        elif not dry_run:
+            line += f" - {verb}"
+        click.echo(line)
+
+    async def _reap():
+        async with open_server(ctx) as server:
+            result = await server.reap(
+                idle_days,
+                action=action,
+                dry_run=dry_run,
+                concurrency=concurrency,
+                on_result=_report,
+            )
+            summary = result.summary()
+            click.echo(
+                f"Проверено клиентов: {summary['scanned']}, неактивных: {summary['selected']} "
+                f"(из них не подключались ни разу: {summary['never_connected']})"
+                + ("." if dry_run else f", обработано: {summary['processed']}, ошибок: {summary['errors']}.")
+            )
+
+    try:
+        run(ctx, _reap())
+    except Exception as e:
+        logger.exception("Необработанная ошибка при обработке неактивных клиентов")
+        click.echo(f"Необработанная ошибка при обработке неактивных клиентов: {e}")
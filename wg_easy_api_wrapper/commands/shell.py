@@ -0,0 +1,117 @@
+import logging
+import shlex
+
+import click
+
+from . import make_server
+
+logger = logging.getLogger(__name__)
+
+# Команды, которые не имеют смысла внутри shell
+SHELL_EXCLUDED_COMMANDS = ('shell', 'exporter', 'expiry-daemon')
+
+# Короткие имена команд в shell
+SHELL_ALIASES = {
+    'list': 'list-clients',
+    'create': 'create-client',
+    'delete': 'delete-client',
+    'enable': 'enable-client',
+    'disable': 'disable-client',
+    'expire': 'update-client-expire',
+    'qr': 'get-qr',
+    'conf': 'get-conf',
+}
+
+
+def _invoke_in_shell(group_ctx, name, args):
+    """Выполняет команду wg-cli в контексте shell, не завершая процесс при ошибках click."""
+    name = SHELL_ALIASES.get(name, name)
+    command = group_ctx.command.get_command(group_ctx, name)
+    if command is None or name in SHELL_EXCLUDED_COMMANDS:
+        click.echo(f"Команда '{name}' недоступна. Введите help для списка команд.")
+        return
+    try:
+        with command.make_context(name, list(args), parent=group_ctx) as command_ctx:
+            command.invoke(command_ctx)
+    except click.exceptions.Exit:
+        pass
+    except click.ClickException as e:
+        e.show()
+    except click.Abort:
+        click.echo("Прервано.")
+
+
+@click.command()
+@click.option('--cache-ttl', default=300.0, show_default=True, type=click.FloatRange(min=0),
+              help='Сколько секунд искать клиентов по индексу в памяти без повторного запроса списка.')
+@click.pass_context
+def shell(ctx, cache_ttl):
+    """
+    Интерактивная оболочка для выполнения команд wg-cli подряд.
+    Вход выполняется один раз, команды работают в одном цикле событий
+    и ищут клиентов по общему индексу, поэтому каждая команда стоит
+    только своего запроса к API.
+    """
+    import asyncio
+
+    if ctx.obj.get('servers_file'):
+        raise click.UsageError("shell работает с одним сервером, --servers не поддерживается.")
+    try:
+        # История и редактирование строки ввода, если доступны
+        import readline  # noqa: F401
+    except ImportError:
+        pass
+
+    ctx.obj['cache_ttl'] = cache_ttl
+    loop = asyncio.new_event_loop()
+
+    async def _open():
+        server = make_server(ctx)
+        await server.__aenter__()
+        return server
+
+    try:
+        server = loop.run_until_complete(_open())
+    except Exception as e:
+        loop.close()
+        logger.exception("Ошибка при подключении к WG-Easy")
+        click.echo(f"Ошибка при подключении к WG-Easy: {e}")
+        return
+
+    ctx.obj['server'] = server
+    ctx.obj['loop'] = loop
+    click.echo(f"Подключено к {server.url}. help - список команд, exit - выход.")
+    try:
+        while True:
+            try:
+                line = input("wg> ")
+            except EOFError:
+                click.echo()
+                break
+            except KeyboardInterrupt:
+                click.echo()
+                continue
+            try:
+                args = shlex.split(line)
+            except ValueError as e:
+                click.echo(f"Ошибка разбора команды: {e}")
+                continue
+            if not args:
+                continue
+            if args[0] in ('exit', 'quit'):
+                break
+            if args[0] == 'help':
+                click.echo(ctx.parent.get_help())
+                continue
+            try:
+                _invoke_in_shell(ctx.parent, args[0], args[1:])
+            except KeyboardInterrupt:
+                click.echo("\nПрервано.")
+    finally:
+        del ctx.obj['server'], ctx.obj['loop']
+        try:
+            loop.run_until_complete(server.__aexit__(None, None, None))
+        except Exception as e:
+            logger.error(f"Ошибка при закрытии сессии: {e}")
+        finally:
+            loop.close()
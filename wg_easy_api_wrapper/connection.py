@@ -0,0 +1,125 @@
+import os
+from typing import List, Mapping, Optional
+
+import aiohttp
+
+# Переменная окружения -> (параметр ConnectionConfig, тип значения)
+ENVIRONMENT_VARIABLES = {
+    "WG_EASY_LIMIT": ("limit", int),
+    "WG_EASY_LIMIT_PER_HOST": ("limit_per_host", int),
+    "WG_EASY_KEEPALIVE_TIMEOUT": ("keepalive_timeout", float),
+    "WG_EASY_DNS_CACHE_TTL": ("ttl_dns_cache", int),
+    "WG_EASY_TIMEOUT": ("total_timeout", float),
+    "WG_EASY_CONNECT_TIMEOUT": ("connect_timeout", float),
+    "WG_EASY_READ_TIMEOUT": ("read_timeout", float),
+    "WG_EASY_COMPRESS": ("compress", lambda value: value.strip().lower() not in ("0", "false", "no", "off")),
+}
+
+
+class ConnectionConfig:
+    """
+    Параметры пула соединений, таймаутов и сжатия для Server.
+    Параметры со значением None оставляют значения aiohttp по умолчанию.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        limit_per_host: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+        ttl_dns_cache: Optional[int] = None,
+        total_timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        compress: bool = True,
+    ):
+        """
+        :param limit: Максимальное число соединений в пуле
+        :param limit_per_host: Максимальное число соединений к одному WG-Easy (0 - без ограничения)
+        :param keepalive_timeout: Сколько секунд держать простаивающее соединение открытым
+        :param ttl_dns_cache: Время жизни DNS-кэша в секундах
+        :param total_timeout: Таймаут на весь запрос в секундах
+        :param connect_timeout: Таймаут установки соединения в секундах
+        :param read_timeout: Таймаут ожидания очередной порции данных в секундах
+        :param compress: Запрашивать ли у сервера сжатые ответы (gzip, deflate)
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.total_timeout = total_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.compress = compress
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = None, **overrides) -> 'ConnectionConfig':
+        """
+        Собирает конфигурацию из переменных окружения WG_EASY_*.
+        Аргументы overrides со значением, отличным от None, имеют приоритет.
+        """
+        environ = os.environ if environ is None else environ
+        values = {}
+        for variable, (name, convert) in ENVIRONMENT_VARIABLES.items():
+            raw = environ.get(variable)
+            if raw:
+                try:
+                    values[name] = convert(raw)
+                except ValueError:
+                    raise ValueError(f"Некорректное значение {variable}={raw!r}") from None
+        values.update({name: value for name, value in overrides.items() if value is not None})
+        return cls(**values)
+
+    def make_connector(self) -> aiohttp.TCPConnector:
+        """Создаёт TCPConnector с заданными ограничениями пула."""
+        kwargs = {}
+        if self.limit is not None:
+            kwargs["limit"] = self.limit
+        if self.limit_per_host is not None:
+            kwargs["limit_per_host"] = self.limit_per_host
+        if self.keepalive_timeout is not None:
+            kwargs["keepalive_timeout"] = self.keepalive_timeout
+        if self.ttl_dns_cache is not None:
+            kwargs["ttl_dns_cache"] = self.ttl_dns_cache
+        return aiohttp.TCPConnector(**kwargs)
+
+    def make_timeout(self) -> Optional[aiohttp.ClientTimeout]:
+        """Создаёт ClientTimeout или возвращает None, если таймауты не заданы."""
+        if self.total_timeout is None and self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return aiohttp.ClientTimeout(
+            total=self.total_timeout,
+            sock_connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+
+    def headers(self) -> dict:
+        """Заголовки сессии; без сжатия просим у сервера ответ как есть."""
+        if self.compress:
+            return {}
+        return {"Accept-Encoding": "identity"}
+
+    def make_session(
+        self,
+        connector: aiohttp.BaseConnector = None,
+        trace_configs: List[aiohttp.TraceConfig] = None,
+    ) -> aiohttp.ClientSession:
+        """
+        Создаёт ClientSession с этой конфигурацией.
+
+        :param connector: Общий коннектор нескольких сессий; он не закрывается
+            вместе с сессией, его владелец закрывает его сам.
+        :param trace_configs: Трассировки aiohttp для замеров запросов
+        """
+        kwargs = {"headers": self.headers()}
+        if trace_configs:
+            kwargs["trace_configs"] = trace_configs
+        timeout = self.make_timeout()
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        if connector is not None:
+            kwargs["connector"] = connector
+            kwargs["connector_owner"] = False
+        else:
+            kwargs["connector"] = self.make_connector()
+        return aiohttp.ClientSession(**kwargs)
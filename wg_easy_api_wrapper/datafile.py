@@ -0,0 +1,19 @@
+import json
+
+
+def read_data_file(path: str):
+    """
+    Читает YAML- или JSON-файл; формат определяется по расширению .json.
+    Для YAML нужен PyYAML, он импортируется только при необходимости.
+    """
+    with open(path, encoding="utf-8") as file:
+        text = file.read()
+    if path.endswith(".json"):
+        return json.loads(text)
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError(
+            "Для чтения YAML установите PyYAML: pip install wg-easy-api-wrapper[yaml]"
+        ) from None
+    return yaml.safe_load(text)
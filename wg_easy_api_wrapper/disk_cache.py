@@ -0,0 +1,151 @@
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# Временные файлы старше этого возраста остались от прерванных процессов
+_STALE_TMP_AGE = 3600
+# После вытеснения кэш занимает не больше этой доли max_size, чтобы не
+# вытеснять заново при каждой записи
+_LOW_WATERMARK = 0.9
+
+
+class DiskCache:
+    """
+    Кэш конфигураций и QR-кодов клиентов на диске.
+
+    Ключ записи - хэш адреса сервера, UID клиента, его updatedAt и ресурса,
+    поэтому запись никогда не устаревает: после изменения клиента WG-Easy
+    меняет updatedAt, и запрос идёт по новому ключу. Старые записи
+    вытесняются по LRU (время последнего чтения хранится в mtime файла),
+    когда общий размер превышает max_size.
+
+    Каждая запись пишется во временный файл и атомарно переименовывается,
+    поэтому несколько процессов могут одновременно пользоваться одним
+    каталогом: читатель видит либо целый файл, либо его отсутствие.
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        :param directory: Каталог кэша, создаётся при первой записи
+        :param max_size: Максимальный общий размер записей в байтах
+        """
+        self.directory = os.path.expanduser(directory)
+        self.max_size = max_size
+        # Оценка размера кэша этим процессом; None - ещё не подсчитан
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def make_key(url: str, uid: str, version: str, resource: str) -> str:
+        """Ключ записи для ресурса resource клиента uid версии version на сервере url."""
+        return hashlib.sha256("\0".join((url, uid, version, resource)).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Возвращает тело записи или None, если её нет."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                body = file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # Запись могли вытеснить сразу после чтения
+            pass
+        return body
+
+    def put(self, key: str, body: bytes):
+        """Атомарно сохраняет запись и при необходимости вытесняет старые."""
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(body)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        if self._size is None:
+            self._size = sum(size for _, size, _ in self._entries())
+        else:
+            self._size += len(body)
+        if self._size > self.max_size:
+            self.evict()
+
+    def delete(self, key: str):
+        """Удаляет запись, если она есть."""
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """Записи кэша: (время последнего использования, размер, путь)."""
+        entries = []
+        now = time.time()
+        try:
+            buckets = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return entries
+        for bucket in buckets:
+            if not bucket.is_dir():
+                continue
+            try:
+                files = list(os.scandir(bucket.path))
+            except FileNotFoundError:
+                continue
+            for entry in files:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.startswith("."):
+                    if now - stat.st_mtime > _STALE_TMP_AGE:
+                        self._unlink(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            # Запись уже удалил другой процесс
+            pass
+
+    def evict(self):
+        """Удаляет давно не использованные записи, пока кэш не уменьшится до нижней границы."""
+        entries = self._entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        limit = self.max_size * _LOW_WATERMARK
+        if size > limit:
+            entries.sort()
+            removed = 0
+            for _, entry_size, path in entries:
+                if size <= limit:
+                    break
+                self._unlink(path)
+                size -= entry_size
+                removed += 1
+            logger.debug(f"Из кэша {self.directory} вытеснено записей: {removed}")
+        self._size = size
+
+    def clear(self):
+        """Удаляет все записи кэша."""
+        for _, _, path in self._entries():
+            self._unlink(path)
+        self._size = 0
@@ -1,3 +1,66 @@
 class AlreadyLoggedInError(Exception):
     """Исключение, возникающее при попытке повторного входа."""
     pass
+
+
+class APIError(Exception):
+    """Ошибка ответа WG-Easy. Атрибут status содержит HTTP-статус, если он известен."""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class AuthenticationError(APIError):
+    """Исключение, возникающее, когда WG-Easy отклоняет вход."""
+    pass
+
+
+class NotFoundError(APIError):
+    """Исключение, возникающее, когда запрошенный ресурс не найден (404)."""
+    pass
+
+
+class ClientNotFoundError(NotFoundError):
+    """Исключение, возникающее, когда клиент не найден в WG-Easy."""
+    pass
+
+
+class RateLimitError(APIError):
+    """Исключение, возникающее, когда WG-Easy ограничивает частоту запросов (429)."""
+    pass
+
+
+class ServerUnavailableError(APIError):
+    """Исключение, возникающее при ошибках 5xx, таймаутах и сбоях соединения."""
+    pass
+
+
+class CircuitOpenError(ServerUnavailableError):
+    """Исключение, возникающее, когда запросы к узлу временно не выполняются после серии сбоев."""
+    pass
+
+
+class FleetError(Exception):
+    """Исключение, возникающее, когда операция не удалась на части узлов Fleet."""
+
+    def __init__(self, message: str, errors: dict):
+        """
+        :param errors: Словарь имя узла -> исключение
+        """
+        details = "; ".join(f"{node}: {error}" for node, error in errors.items())
+        super().__init__(f"{message} {details}" if details else message)
+        self.errors = errors
+
+
+def error_for_status(status: int, message: str) -> APIError:
+    """Создаёт исключение подходящего типа для HTTP-статуса."""
+    if status == 401:
+        return AuthenticationError(message, status)
+    if status == 404:
+        return NotFoundError(message, status)
+    if status == 429:
+        return RateLimitError(message, status)
+    if status >= 500:
+        return ServerUnavailableError(message, status)
+    return APIError(message, status)
@@ -0,0 +1,171 @@
+import asyncio
+import heapq
+import logging
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .client import unix_time
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .server import Server
+
+logger = logging.getLogger(__name__)
+
+DISABLE = "disable"
+DELETE = "delete"
+
+
+class ExpirySweeper:
+    """
+    Отключает или удаляет клиентов по истечении срока действия.
+
+    Ближайшие сроки хранятся в куче (время истечения, UID), поэтому между
+    обновлениями списка проверяется только вершина кучи, а не все клиенты.
+    При обновлении в кучу добавляются лишь клиенты, чей срок изменился;
+    устаревшие записи не удаляются сразу, а отбрасываются при извлечении,
+    если не совпадают с текущим сроком клиента.
+    """
+
+    def __init__(
+        self,
+        server: 'Server',
+        action: str = DISABLE,
+        refresh_interval: float = 300.0,
+        concurrency: int = 10,
+        dry_run: bool = False,
+        on_result: Callable[['Client', Optional[Exception]], None] = None,
+    ):
+        """
+        :param server: Сервер с активной сессией
+        :param action: "disable" - отключать клиентов, "delete" - удалять
+        :param refresh_interval: Как часто перечитывать список клиентов, в секундах
+        :param concurrency: Максимальное число одновременных запросов
+        :param dry_run: Только сообщать о клиентах с истёкшим сроком, ничего не меняя
+        :param on_result: Функция, вызываемая для каждого обработанного клиента
+            с исключением или None при успехе
+        """
+        if action not in (DISABLE, DELETE):
+            raise ValueError(f"Неизвестное действие: {action}")
+        if concurrency < 1:
+            raise ValueError("concurrency должно быть не меньше 1.")
+        self._server = server
+        self.action = action
+        self.refresh_interval = refresh_interval
+        self.concurrency = concurrency
+        self.dry_run = dry_run
+        self._on_result = on_result
+        self._heap: List[Tuple[float, str]] = []
+        # UID -> актуальный срок; запись кучи действительна, только если совпадает с ним
+        self._deadlines: Dict[str, float] = {}
+        self._clients: Dict[str, 'Client'] = {}
+        self._last_refresh: Optional[float] = None
+
+    @property
+    def scheduled(self) -> int:
+        """Число клиентов, ожидающих истечения срока."""
+        return len(self._deadlines)
+
+    def _eligible(self, client: 'Client') -> bool:
+        # Отключённых клиентов повторно отключать не нужно
+        return client.expired_at is not None and (self.action == DELETE or client.enabled)
+
+    def update(self, clients: Iterable['Client']):
+        """Обновляет расписание по свежему списку клиентов."""
+        seen = set()
+        for client in clients:
+            uid = client.uid
+            seen.add(uid)
+            if not self._eligible(client):
+                self._deadlines.pop(uid, None)
+                self._clients.pop(uid, None)
+                continue
+            self._clients[uid] = client
+            deadline = unix_time(client.expired_at)
+            if self._deadlines.get(uid) != deadline:
+                self._deadlines[uid] = deadline
+                heapq.heappush(self._heap, (deadline, uid))
+        for uid in self._deadlines.keys() - seen:
+            del self._deadlines[uid]
+            del self._clients[uid]
+        # Если устаревших записей накопилось много, перестраиваем кучу
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(deadline, uid) for uid, deadline in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    async def refresh(self):
+        """Перечитывает список клиентов и обновляет расписание."""
+        self.update([client async for client in self._server.iter_clients()])
+        self._last_refresh = time.time()
+
+    def next_deadline(self) -> Optional[float]:
+        """Ближайший срок истечения (секунды Unix) или None."""
+        heap = self._heap
+        while heap and self._deadlines.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def due(self, now: float = None) -> List['Client']:
+        """Извлекает из расписания клиентов, срок которых истёк к моменту now."""
+        now = time.time() if now is None else now
+        due = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                return due
+            _, uid = heapq.heappop(self._heap)
+            del self._deadlines[uid]
+            due.append(self._clients.pop(uid))
+
+    async def sweep(self, now: float = None) -> List[Tuple['Client', Optional[Exception]]]:
+        """
+        Обрабатывает клиентов с истёкшим сроком, не более concurrency одновременно.
+        Клиенты, которых не удалось обработать, вернутся в расписание при
+        следующем обновлении списка.
+
+        :return: Список (клиент, исключение или None)
+        """
+        clients = self.due(now)
+        if not clients:
+            return []
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _expire(client: 'Client') -> Optional[Exception]:
+            if self.dry_run:
+                return None
+            try:
+                async with semaphore:
+                    if self.action == DELETE:
+                        await self._server.remove_client(client.uid)
+                    elif client.enabled:
+                        await client.disable()
+            except Exception as e:
+                logger.error(f"Ошибка при обработке клиента '{client.name}' с истёкшим сроком: {e}")
+                return e
+            return None
+
+        errors = await asyncio.gather(*(_expire(client) for client in clients))
+        results = list(zip(clients, errors))
+        if self._on_result is not None:
+            for client, error in results:
+                self._on_result(client, error)
+        return results
+
+    async def run(self):
+        """Обновляет расписание и обрабатывает истёкших клиентов до отмены задачи."""
+        while True:
+            now = time.time()
+            if self._last_refresh is None or now - self._last_refresh >= self.refresh_interval:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.error(f"Ошибка при обновлении списка клиентов: {e}")
+                    self._last_refresh = now
+            await self.sweep()
+
+            # Спим до ближайшего срока или до следующего обновления списка
+            wake = self._last_refresh + self.refresh_interval
+            deadline = self.next_deadline()
+            if deadline is not None:
+                wake = min(wake, deadline)
+            await asyncio.sleep(max(wake - time.time(), 0))
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from typing import TYPE_CHECKING, Dict, Iterable, Union
+
+from .client import _write_atomic
+from .qr import QRRenderer
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .server import Server
+
+logger = logging.getLogger(__name__)
+
+# Файл в каталоге выгрузки, где хранится updatedAt каждого выгруженного клиента
+EXPORT_STATE_FILE = ".wg-export-state.json"
+
+# Формат выгрузки -> (расширение файла, метод Client для скачивания)
+EXPORT_FORMATS = {
+    "conf": ("conf", "download_configuration"),
+    "svg": ("svg", "download_qr_code"),
+    "png": ("png", "save_qr_png"),
+}
+
+# Форматы, которые генерируются локально и принимают генератор QR
+_RENDERED_FORMATS = ("png",)
+
+EXPORTED = "exported"
+SKIPPED = "skipped"
+
+
+def _load_state(out_dir: str) -> dict:
+    try:
+        with open(os.path.join(out_dir, EXPORT_STATE_FILE), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        logger.warning("Файл состояния выгрузки повреждён, выгружаем всех клиентов заново.")
+        return {}
+
+
+def _save_state(out_dir: str, state: dict):
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, os.path.join(out_dir, EXPORT_STATE_FILE))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _version(client: 'Client') -> str:
+    return client.updated_at_raw
+
+
+async def export_clients(
+    server: 'Server',
+    out_dir: str,
+    clients: Iterable['Client'] = None,
+    formats: Iterable[str] = ("conf", "svg"),
+    concurrency: int = 10,
+    force: bool = False,
+) -> Dict[str, Union[str, Exception]]:
+    """
+    Выгружает конфигурации и QR-коды клиентов в каталог out_dir.
+
+    Файлы называются <uid>.conf, <uid>.svg и <uid>.png. PNG генерируется
+    локально из конфигурации в пуле процессов (см. QRRenderer). Клиенты, у которых updatedAt
+    не изменился с прошлой выгрузки и файлы на месте, пропускаются.
+
+    :param server: Сервер с активной сессией
+    :param out_dir: Каталог для файлов, создаётся при необходимости
+    :param clients: Клиенты для выгрузки; по умолчанию все клиенты сервера
+    :param formats: Форматы из EXPORT_FORMATS
+    :param concurrency: Максимальное число одновременных загрузок
+    :param force: Выгрузить всех клиентов, даже если они не менялись
+    :return: Словарь UID -> "exported", "skipped" или исключение
+    """
+    formats = list(formats)
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Неизвестные форматы выгрузки: {', '.join(unknown)}")
+    if concurrency < 1:
+        raise ValueError("concurrency должно быть не меньше 1.")
+
+    os.makedirs(out_dir, exist_ok=True)
+    if clients is None:
+        clients = await server.get_clients()
+    clients = list(clients)
+
+    state = _load_state(out_dir)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    renderer = QRRenderer(processes=None) if set(formats) & set(_RENDERED_FORMATS) else None
+    reuse_configuration = "conf" in formats and renderer is not None
+
+    def _paths(client: 'Client'):
+        for fmt in formats:
+            extension, method = EXPORT_FORMATS[fmt]
+            yield os.path.join(out_dir, f"{client.uid}.{extension}"), fmt
+
+    def _is_unchanged(client: 'Client') -> bool:
+        entry = state.get(client.uid)
+        if not entry or entry.get("updated_at") != _version(client):
+            return False
+        if not set(formats) <= set(entry.get("formats", ())):
+            return False
+        return all(os.path.exists(path) for path, _ in _paths(client))
+
+    async def _download(client: 'Client', path: str, fmt: str, configuration: str = None):
+        if configuration is not None and fmt == "conf":
+            _write_atomic(path, configuration.encode("utf-8"))
+            return
+        if configuration is not None and fmt in _RENDERED_FORMATS:
+            _write_atomic(path, await renderer.render(configuration, fmt))
+            return
+        method = getattr(client, EXPORT_FORMATS[fmt][1])
+        async with semaphore:
+            if fmt in _RENDERED_FORMATS:
+                await method(path, renderer)
+            else:
+                await method(path)
+
+    async def _export(client: 'Client'):
+        if not force and _is_unchanged(client):
+            return SKIPPED
+        configuration = None
+        if reuse_configuration:
+            # PNG генерируется из той же конфигурации, что пишется в .conf: запрашиваем её один раз
+            async with semaphore:
+                configuration = await client.get_configuration()
+        await asyncio.gather(*(_download(client, path, fmt, configuration) for path, fmt in _paths(client)))
+        state[client.uid] = {
+            "name": client.name,
+            "updated_at": _version(client),
+            "formats": sorted(formats),
+        }
+        return EXPORTED
+
+    try:
+        outcomes = await asyncio.gather(*(_export(client) for client in clients), return_exceptions=True)
+    finally:
+        if renderer is not None:
+            renderer.close()
+    _save_state(out_dir, state)
+
+    results = {}
+    for client, outcome in zip(clients, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Ошибка при выгрузке клиента '{client.name}' (UID={client.uid}): {outcome}")
+        results[client.uid] = outcome
+    return results
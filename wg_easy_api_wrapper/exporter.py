@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from aiohttp import web
+
+from .client import unix_time
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .server import Server
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_PORT = 9586
+
+
+def parse_listen(listen: str) -> Tuple[str, int]:
+    """Разбирает адрес вида ':9586', '127.0.0.1:9586' или '[::1]:9586'."""
+    host, _, port = listen.rpartition(":")
+    host = host.strip("[]") or "0.0.0.0"
+    return host, int(port) if port else DEFAULT_PORT
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsExporter:
+    """
+    Экспортёр метрик клиентов WG-Easy в формате Prometheus.
+
+    Список клиентов обновляется в фоне раз в interval секунд через одну
+    авторизованную сессию, а /metrics отдаёт заранее подготовленный текст из
+    памяти. Поэтому стоимость запроса метрик не зависит от числа сборщиков,
+    а сами запросы никогда не ждут ответа WG-Easy.
+    """
+
+    def __init__(self, server: 'Server', interval: float = 30.0):
+        """
+        :param server: Сервер с активной сессией
+        :param interval: Интервал обновления списка клиентов в секундах
+        """
+        self._server = server
+        self.interval = interval
+        self._clients_text = ""
+        self._up = False
+        self._last_success: Optional[float] = None
+        self._last_duration = 0.0
+        self._body = self._render_body()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def body(self) -> bytes:
+        """Текущий текст метрик."""
+        return self._body
+
+    @staticmethod
+    def render_clients(clients: List['Client']) -> str:
+        """
+        Формирует метрики по клиентам и их суммы.
+
+        Давность рукопожатия не экспортируется: на момент сбора она уже устарела бы,
+        а time() - wg_easy_client_latest_handshake_timestamp_seconds считается в запросе PromQL.
+        """
+        rx_lines, tx_lines, enabled_lines, handshake_lines = [], [], [], []
+        total_rx = total_tx = enabled_count = 0
+
+        for client in clients:
+            labels = (
+                f'{{uid="{_escape(client.uid)}",name="{_escape(client.name)}",'
+                f'address="{_escape(client.address)}"}}'
+            )
+            rx, tx = client.transfer_rx or 0, client.transfer_tx or 0
+            total_rx += rx
+            total_tx += tx
+            enabled_count += client.enabled
+            rx_lines.append(f"wg_easy_client_rx_bytes_total{labels} {rx}")
+            tx_lines.append(f"wg_easy_client_tx_bytes_total{labels} {tx}")
+            enabled_lines.append(f"wg_easy_client_enabled{labels} {int(client.enabled)}")
+            handshake = unix_time(client.last_handshake_at)
+            if handshake is not None:
+                handshake_lines.append(f"wg_easy_client_latest_handshake_timestamp_seconds{labels} {handshake:.3f}")
+
+        sections = [
+            ("wg_easy_client_rx_bytes_total", "counter", "Байты, полученные от клиента.", rx_lines),
+            ("wg_easy_client_tx_bytes_total", "counter", "Байты, отправленные клиенту.", tx_lines),
+            ("wg_easy_client_enabled", "gauge", "1, если клиент включён.", enabled_lines),
+            ("wg_easy_client_latest_handshake_timestamp_seconds", "gauge",
+             "Время последнего рукопожатия, секунды Unix.", handshake_lines),
+            ("wg_easy_clients", "gauge", "Число клиентов.", [f"wg_easy_clients {len(clients)}"]),
+            ("wg_easy_clients_enabled", "gauge", "Число включённых клиентов.",
+             [f"wg_easy_clients_enabled {enabled_count}"]),
+            # Суммы уменьшаются при удалении клиентов, поэтому это не счётчики
+            ("wg_easy_rx_bytes_total", "gauge", "Сумма байт, полученных от всех клиентов.",
+             [f"wg_easy_rx_bytes_total {total_rx}"]),
+            ("wg_easy_tx_bytes_total", "gauge", "Сумма байт, отправленных всем клиентам.",
+             [f"wg_easy_tx_bytes_total {total_tx}"]),
+        ]
+        parts = []
+        for name, kind, help_text, lines in sections:
+            parts.append(f"# HELP {name} {help_text}\n# TYPE {name} {kind}\n")
+            if lines:
+                parts.append("\n".join(lines))
+                parts.append("\n")
+        return "".join(parts)
+
+    def _render_body(self) -> bytes:
+        status = [
+            "# HELP wg_easy_up 1, если последнее обновление списка клиентов удалось.",
+            "# TYPE wg_easy_up gauge",
+            f"wg_easy_up {int(self._up)}",
+            "# HELP wg_easy_refresh_duration_seconds Длительность последнего обновления.",
+            "# TYPE wg_easy_refresh_duration_seconds gauge",
+            f"wg_easy_refresh_duration_seconds {self._last_duration:.6f}",
+        ]
+        if self._last_success is not None:
+            status += [
+                "# HELP wg_easy_last_refresh_timestamp_seconds Время последнего удачного обновления.",
+                "# TYPE wg_easy_last_refresh_timestamp_seconds gauge",
+                f"wg_easy_last_refresh_timestamp_seconds {self._last_success:.3f}",
+            ]
+        return ("\n".join(status) + "\n" + self._clients_text).encode("utf-8")
+
+    async def refresh(self):
+        """Перечитывает список клиентов и обновляет текст метрик."""
+        started = time.monotonic()
+        try:
+            clients = [client async for client in self._server.iter_clients()]
+            self._clients_text = self.render_clients(clients)
+            self._up = True
+            self._last_success = time.time()
+        except Exception as e:
+            # Оставляем последние удачные метрики клиентов, но сообщаем о сбое
+            logger.error(f"Ошибка при обновлении метрик: {e}")
+            self._up = False
+        finally:
+            self._last_duration = time.monotonic() - started
+            self._body = self._render_body()
+
+    async def run(self):
+        """Обновляет метрики каждые interval секунд до отмены задачи."""
+        while True:
+            started = time.monotonic()
+            await self.refresh()
+            await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0))
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(body=self._body, headers={"Content-Type": CONTENT_TYPE})
+
+    async def handle_index(self, request: web.Request) -> web.Response:
+        return web.Response(text='<html><body><a href="/metrics">/metrics</a></body></html>',
+                            content_type="text/html")
+
+    def make_app(self) -> web.Application:
+        """Создаёт приложение aiohttp, запускающее фоновое обновление метрик."""
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.router.add_get("/", self.handle_index)
+
+        async def _start(app):
+            self._task = asyncio.ensure_future(self.run())
+
+        async def _stop(app):
+            if self._task is not None:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+                self._task = None
+
+        app.on_startup.append(_start)
+        app.on_cleanup.append(_stop)
+        return app
+
+    async def serve(self, host: str = "0.0.0.0", port: int = DEFAULT_PORT):
+        """Запускает HTTP-сервер метрик и работает до отмены задачи."""
+        runner = web.AppRunner(self.make_app())
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, host, port).start()
+            logger.info(f"Метрики доступны на http://{host}:{port}/metrics")
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
@@ -0,0 +1,311 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, TypeVar, Union
+
+import aiohttp
+
+from .client import Client
+from .connection import ConnectionConfig
+from .datafile import read_data_file
+from .errors import FleetError
+from .server import Server
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LOAD_BY_PEERS = "peers"
+LOAD_BY_TRAFFIC = "traffic"
+
+
+def load_servers_file(path: str) -> Dict[str, Tuple[str, str]]:
+    """
+    Читает описание серверов из YAML- или JSON-файла.
+
+    Поддерживаются два вида: список ``servers`` с полями name, url, password
+    или словарь имя -> {url, password}. Вместо password можно указать
+    password_env с именем переменной окружения.
+
+    :return: Словарь имя узла -> (url, password)
+    """
+    data = read_data_file(path)
+
+    if isinstance(data, dict) and "servers" in data:
+        data = data["servers"]
+    if isinstance(data, dict):
+        entries = [dict(entry, name=name) for name, entry in data.items()]
+    elif isinstance(data, list):
+        entries = data
+    else:
+        raise ValueError(f"Некорректный формат файла серверов: {path}")
+
+    servers = {}
+    for entry in entries:
+        name = entry.get("name") or entry.get("url")
+        if not entry.get("url"):
+            raise ValueError(f"У сервера '{name}' не указан url.")
+        password = entry.get("password")
+        if password is None and entry.get("password_env"):
+            password = os.getenv(entry["password_env"], "")
+        servers[name] = (entry["url"], password or "")
+    return servers
+
+
+class Fleet:
+    """
+    Набор серверов WG-Easy, работающих через общий пул соединений.
+
+    Вход, выход и запросы ко всем узлам выполняются параллельно; к одному
+    узлу одновременно выполняется не более concurrency_per_node операций.
+    """
+
+    def __init__(
+        self,
+        servers: Mapping[str, Tuple[str, str]],
+        connection: ConnectionConfig = None,
+        concurrency_per_node: int = 4,
+        strict: bool = True,
+        **server_kwargs,
+    ):
+        """
+        :param servers: Словарь имя узла -> (url, password)
+        :param connection: Параметры общего пула соединений и таймаутов
+        :param concurrency_per_node: Максимум одновременных операций на один узел
+        :param strict: Если True, ошибка входа на любой узел прерывает вход в контекст.
+            Если False, недоступные узлы исключаются и перечислены в login_errors.
+        :param server_kwargs: Дополнительные параметры для каждого Server,
+            например cache_ttl или session_store
+        """
+        if concurrency_per_node < 1:
+            raise ValueError("concurrency_per_node должно быть не меньше 1.")
+        self._nodes = dict(servers)
+        self._connection = connection or ConnectionConfig()
+        self._server_kwargs = server_kwargs
+        self.concurrency_per_node = concurrency_per_node
+        self.strict = strict
+        self.login_errors: Dict[str, BaseException] = {}
+        self._connector: Optional[aiohttp.BaseConnector] = None
+        self._servers: Dict[str, Server] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        # Узел -> [(время, число клиентов, суммарный трафик)] за два последних списка
+        self._load: Dict[str, List[Tuple[float, int, int]]] = {}
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'Fleet':
+        """Создаёт Fleet из YAML- или JSON-файла, см. load_servers_file."""
+        return cls(load_servers_file(path), **kwargs)
+
+    @property
+    def servers(self) -> Dict[str, Server]:
+        """Серверы по именам узлов; заполняется при входе в контекст."""
+        return dict(self._servers)
+
+    async def __aenter__(self):
+        self._connector = self._connection.make_connector()
+        self._servers = {
+            node: Server(
+                url,
+                password,
+                connection=self._connection,
+                connector=self._connector,
+                **self._server_kwargs,
+            )
+            for node, (url, password) in self._nodes.items()
+        }
+        self._semaphores = {node: asyncio.Semaphore(self.concurrency_per_node) for node in self._servers}
+
+        outcomes = await asyncio.gather(
+            *(server.__aenter__() for server in self._servers.values()),
+            return_exceptions=True,
+        )
+        errors = {
+            node: outcome
+            for node, outcome in zip(self._servers, outcomes)
+            if isinstance(outcome, BaseException)
+        }
+        for node in errors:
+            logger.error(f"Не удалось войти на узел '{node}': {errors[node]}")
+            del self._servers[node]
+        self.login_errors = errors
+        if errors and self.strict:
+            # Выходим из тех узлов, куда вход удался, и закрываем пул
+            await self.__aexit__(None, None, None)
+            raise FleetError("Не удалось войти на часть узлов.", errors)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_tb):
+        try:
+            await asyncio.gather(
+                *(server.__aexit__(None, None, None) for server in self._servers.values()),
+                return_exceptions=True,
+            )
+        finally:
+            if self._connector is not None:
+                await self._connector.close()
+                self._connector = None
+
+    async def map(
+        self,
+        operation: Callable[[Server], Awaitable[T]],
+        nodes: Iterable[str] = None,
+    ) -> Dict[str, Union[T, Exception]]:
+        """
+        Параллельно выполняет operation(server) на узлах.
+
+        :param operation: Корутинная функция, принимающая Server
+        :param nodes: Имена узлов; по умолчанию все узлы
+        :return: Словарь имя узла -> результат или исключение
+        """
+        nodes = list(self._servers if nodes is None else nodes)
+
+        async def _run(node: str):
+            async with self._semaphores[node]:
+                return await operation(self._servers[node])
+
+        outcomes = await asyncio.gather(*(_run(node) for node in nodes), return_exceptions=True)
+        for node, outcome in zip(nodes, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Ошибка на узле '{node}': {outcome}")
+        return dict(zip(nodes, outcomes))
+
+    @staticmethod
+    def _raise_for_errors(results: Dict[str, object], message: str):
+        errors = {node: result for node, result in results.items() if isinstance(result, Exception)}
+        if errors:
+            raise FleetError(message, errors)
+
+    def _record_load(self, node: str, clients: List[Client]):
+        traffic = sum(client.transfer_rx + client.transfer_tx for client in clients)
+        history = self._load.setdefault(node, [])
+        history.append((time.monotonic(), len(clients), traffic))
+        del history[:-2]
+
+    def _record_created(self, node: str, count: int):
+        """
+        Учитывает созданных на узле клиентов в последнем замере нагрузки, чтобы
+        следующие least_loaded_node видели их без перечитывания списка.
+        Замер обновляется на месте: новая запись с прежним трафиком обнулила
+        бы оценку трафика между двумя последними списками.
+        """
+        history = self._load.get(node)
+        if history and count:
+            moment, peers, traffic = history[-1]
+            history[-1] = (moment, peers + count, traffic)
+
+    async def get_clients(self) -> List[Tuple[str, Client]]:
+        """
+        Возвращает клиентов всех узлов в виде пар (имя узла, Client).
+        Если хотя бы один узел ответил ошибкой, поднимает FleetError.
+        """
+        results = await self.map(lambda server: server.get_clients())
+        self._raise_for_errors(results, "Не удалось получить клиентов с части узлов.")
+        tagged = []
+        for node, clients in results.items():
+            self._record_load(node, clients)
+            tagged.extend((node, client) for client in clients)
+        return tagged
+
+    async def _find(self, lookup: Callable[[Server], Awaitable[Optional[Client]]]):
+        results = await self.map(lookup)
+        self._raise_for_errors(results, "Не удалось выполнить поиск на части узлов.")
+        for node, client in results.items():
+            if client is not None:
+                return node, client
+        return None
+
+    async def get_client(self, uid: str) -> Optional[Tuple[str, Client]]:
+        """Ищет клиента по UID на всех узлах, возвращает (имя узла, Client) или None."""
+        return await self._find(lambda server: server.get_client(uid))
+
+    async def get_client_by_name(self, name: str) -> Optional[Tuple[str, Client]]:
+        """Ищет клиента по имени на всех узлах, возвращает (имя узла, Client) или None."""
+        return await self._find(lambda server: server.get_client_by_name(name))
+
+    async def create_clients(
+        self,
+        names_by_node: Mapping[str, Iterable[str]],
+        expire_date: str = None,
+    ) -> Dict[str, Dict[str, Union[Client, Exception]]]:
+        """
+        Создаёт клиентов на нескольких узлах сразу, см. Server.create_clients.
+
+        :param names_by_node: Словарь имя узла -> имена новых клиентов
+        :return: Словарь имя узла -> (имя клиента -> Client или исключение)
+        """
+        names_by_node = {node: list(names) for node, names in names_by_node.items()}
+        names_by_server = {self._servers[node]: names for node, names in names_by_node.items()}
+        results = await self.map(
+            lambda server: server.create_clients(
+                names_by_server[server],
+                expire_date,
+                concurrency=self.concurrency_per_node,
+            ),
+            nodes=names_by_node,
+        )
+        for node, result in results.items():
+            if not isinstance(result, Exception):
+                self._record_created(node, sum(1 for client in result.values() if isinstance(client, Client)))
+        # Ошибка узла целиком относится ко всем его клиентам
+        return {
+            node: (
+                {name: result for name in names_by_node[node]}
+                if isinstance(result, Exception)
+                else result
+            )
+            for node, result in results.items()
+        }
+
+    async def least_loaded_node(self, by: str = LOAD_BY_PEERS) -> str:
+        """
+        Выбирает наименее загруженный узел.
+
+        :param by: "peers" - по числу клиентов, "traffic" - по трафику между
+            двумя последними получениями списка (при одном списке - по
+            суммарному трафику клиентов)
+        """
+        if by not in (LOAD_BY_PEERS, LOAD_BY_TRAFFIC):
+            raise ValueError(f"Неизвестный способ оценки нагрузки: {by}")
+        missing = [node for node in self._servers if node not in self._load]
+        if missing:
+            results = await self.map(lambda server: server.get_clients(), nodes=missing)
+            for node, clients in results.items():
+                if not isinstance(clients, Exception):
+                    self._record_load(node, clients)
+
+        def _load(node: str) -> float:
+            history = self._load[node]
+            if by == LOAD_BY_PEERS:
+                return history[-1][1]
+            if len(history) < 2:
+                return history[-1][2]
+            (previous_time, _, previous_traffic), (last_time, _, last_traffic) = history
+            # Счётчики сбрасываются при перезапуске WireGuard
+            delta = max(last_traffic - previous_traffic, 0)
+            return delta / max(last_time - previous_time, 1e-9)
+
+        candidates = [node for node in self._servers if node in self._load]
+        if not candidates:
+            raise FleetError("Ни один узел не ответил.", {})
+        return min(candidates, key=_load)
+
+    async def create_client(
+        self,
+        name: str,
+        expire_date: str = None,
+        node: str = None,
+        by: str = LOAD_BY_PEERS,
+    ) -> Tuple[str, Client]:
+        """
+        Создаёт клиента на узле node или на наименее загруженном узле.
+
+        :return: (имя узла, созданный Client)
+        """
+        if node is None:
+            node = await self.least_loaded_node(by)
+        results = await self.create_clients({node: [name]}, expire_date)
+        result = results[node][name]
+        if isinstance(result, Exception):
+            raise result
+        return node, result
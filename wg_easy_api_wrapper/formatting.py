@@ -0,0 +1,210 @@
+import csv
+import fnmatch
+import io
+import json
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .client import Client
+
+TABLE = "table"
+JSON = "json"
+NDJSON = "ndjson"
+CSV = "csv"
+
+FORMATS = (TABLE, JSON, NDJSON, CSV)
+
+# Поле -> значение клиента. Метки времени берутся в исходном виде ISO 8601:
+# их не нужно разбирать, а строки сортируются в хронологическом порядке.
+FIELDS: Dict[str, Callable[['Client'], object]] = {
+    "uid": lambda client: client.uid,
+    "name": lambda client: client.name,
+    "enabled": lambda client: client.enabled,
+    "address": lambda client: client.address,
+    "public_key": lambda client: client.public_key,
+    "created_at": lambda client: client.created_at_raw,
+    "updated_at": lambda client: client.updated_at_raw,
+    "last_handshake_at": lambda client: client.last_handshake_at_raw,
+    "expired_at": lambda client: client.expired_at_raw,
+    "persistent_keepalive": lambda client: client.persistent_keepalive,
+    "transfer_rx": lambda client: client.transfer_rx,
+    "transfer_tx": lambda client: client.transfer_tx,
+}
+
+# Поле узла при выводе списка с нескольких серверов
+NODE_FIELD = "node"
+
+TABLE_FIELDS = ("uid", "name", "enabled", "address", "last_handshake_at", "expired_at", "transfer_rx", "transfer_tx")
+
+_TIMESTAMP_FIELDS = {"created_at", "updated_at", "last_handshake_at", "expired_at"}
+_BYTE_FIELDS = {"transfer_rx", "transfer_tx", "transfer_total"}
+
+
+def parse_fields(spec: Optional[str], fmt: str = TABLE) -> List[str]:
+    """
+    Разбирает список полей через запятую.
+
+    :param spec: Например "name,enabled,transfer_rx"; None - поля по умолчанию
+        для формата fmt: основные для таблицы, все для остальных форматов
+    """
+    if not spec:
+        return list(TABLE_FIELDS if fmt == TABLE else FIELDS)
+    fields = [field.strip() for field in spec.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in FIELDS]
+    if unknown:
+        raise ValueError(f"Неизвестные поля: {', '.join(unknown)}. Доступные: {', '.join(FIELDS)}.")
+    return fields
+
+
+def client_filter(enabled: Optional[bool] = None, name_glob: str = None) -> Callable[['Client'], bool]:
+    """Условие отбора клиентов по состоянию и шаблону имени."""
+    def _matches(client: 'Client') -> bool:
+        if enabled is not None and client.enabled != enabled:
+            return False
+        return name_glob is None or fnmatch.fnmatchcase(client.name, name_glob)
+    return _matches
+
+
+def sort_clients(clients: Iterable['Client'], field: str) -> List['Client']:
+    """
+    Сортирует клиентов по полю; "-" перед именем поля - по убыванию.
+    Клиенты без значения поля (например, ни разу не подключавшиеся) идут последними.
+    """
+    reverse = field.startswith("-")
+    field = field.lstrip("-")
+    if field not in FIELDS:
+        raise ValueError(f"Неизвестное поле сортировки: {field}. Доступные: {', '.join(FIELDS)}.")
+    getter = FIELDS[field]
+    present, missing = [], []
+    for client in clients:
+        (missing if getter(client) is None else present).append(client)
+    present.sort(key=getter, reverse=reverse)
+    return present + missing
+
+
+def format_bytes(value: int) -> str:
+    """Размер в байтах в виде 12.3 MiB."""
+    value = float(value or 0)
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TiB"
+
+
+def _table_cell(field: str, value) -> str:
+    if value is None:
+        return "-"
+    if field == "enabled":
+        return "да" if value else "нет"
+    if field in _TIMESTAMP_FIELDS:
+        # 2024-03-01T10:15:30.123Z -> 2024-03-01 10:15
+        return value[:16].replace("T", " ")
+    if field in _BYTE_FIELDS:
+        return format_bytes(value)
+    return str(value)
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+class RowWriter:
+    """
+    Выводит строки значений в одном из форматов FORMATS по мере поступления.
+
+    JSON, NDJSON и CSV пишутся построчно сразу при вызове write_row, поэтому
+    вывод начинается до окончания разбора списка. Таблица накапливает строки
+    и ширины столбцов за один проход и выводится при close.
+    """
+
+    def __init__(self, write: Callable[[str], object], fmt: str, columns: Iterable[str],
+                 table_cell: Callable[[str, object], str] = None):
+        """
+        :param write: Функция вывода текста, например sys.stdout.write
+        :param columns: Имена столбцов в порядке значений строки
+        :param table_cell: Форматирование ячейки таблицы по имени столбца и значению
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Неизвестный формат вывода: {fmt}")
+        self._write = write
+        self.format = fmt
+        self._columns = list(columns)
+        self._table_cell = table_cell or _table_cell
+        self.count = 0
+        self._rows: List[List[str]] = []
+        self._widths = [len(column) for column in self._columns]
+        self._csv_buffer = io.StringIO()
+        self._csv = csv.writer(self._csv_buffer, lineterminator="\n")
+        if fmt == CSV:
+            self._write_csv(self._columns)
+        elif fmt == JSON:
+            self._write("[")
+
+    def _write_csv(self, values: list):
+        self._csv.writerow(values)
+        self._write(self._csv_buffer.getvalue())
+        self._csv_buffer.seek(0)
+        self._csv_buffer.truncate()
+
+    def write_row(self, values: list):
+        """Выводит строку (в таблице - запоминает её до close)."""
+        fmt = self.format
+        if fmt == NDJSON or fmt == JSON:
+            line = json.dumps(dict(zip(self._columns, values)), ensure_ascii=False)
+            if fmt == NDJSON:
+                self._write(line + "\n")
+            else:
+                self._write(("\n  " if not self.count else ",\n  ") + line)
+        elif fmt == CSV:
+            self._write_csv([_csv_cell(value) for value in values])
+        else:
+            table_cell = self._table_cell
+            cells = [table_cell(column, value) for column, value in zip(self._columns, values)]
+            widths = self._widths
+            for index, cell in enumerate(cells):
+                if len(cell) > widths[index]:
+                    widths[index] = len(cell)
+            self._rows.append(cells)
+        self.count += 1
+
+    def close(self):
+        """Завершает вывод: закрывает JSON-массив или печатает таблицу."""
+        if self.format == JSON:
+            self._write("\n]\n" if self.count else "]\n")
+        elif self.format == TABLE:
+            widths = self._widths
+            # Последний столбец не дополняется пробелами
+            last = len(widths) - 1
+            lines = [
+                "  ".join(cell if index == last else cell.ljust(widths[index]) for index, cell in enumerate(row))
+                for row in [self._columns] + self._rows
+            ]
+            self._write("\n".join(lines) + "\n")
+            self._rows = []
+
+
+class ClientWriter(RowWriter):
+    """Выводит клиентов в одном из форматов FORMATS по мере поступления, см. RowWriter."""
+
+    def __init__(self, write: Callable[[str], object], fmt: str = TABLE, fields: Iterable[str] = None, node: bool = False):
+        """
+        :param write: Функция вывода текста, например sys.stdout.write
+        :param fields: Поля из FIELDS; по умолчанию см. parse_fields
+        :param node: Добавить первым столбец node - имя узла из write(client, node)
+        """
+        self.fields = list(fields) if fields is not None else parse_fields(None, fmt)
+        self._node = node
+        self._getters = [FIELDS[field] for field in self.fields]
+        super().__init__(write, fmt, ([NODE_FIELD] if node else []) + self.fields)
+
+    def write(self, client: 'Client', node: str = None):
+        """Выводит клиента (в таблице - запоминает строку до close)."""
+        values = [getter(client) for getter in self._getters]
+        if self._node:
+            values.insert(0, node)
+        self.write_row(values)
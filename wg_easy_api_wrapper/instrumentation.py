@@ -0,0 +1,349 @@
+import json
+import re
+import socket
+import sys
+import time
+from collections import Counter
+from typing import IO, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+# Границы корзин гистограмм задержки в миллисекундах
+DEFAULT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Фазы запроса:
+# dns - разрешение имени; connect - установка соединения вместе с TLS
+#   (aiohttp не сообщает о TLS-рукопожатии отдельно); first_byte - от начала
+#   запроса до получения заголовков ответа; total - до освобождения ответа,
+#   то есть вместе с чтением и разбором тела.
+PHASES = ("dns", "connect", "first_byte", "total")
+
+_CLIENT_ID = re.compile(r"^(/api/wireguard/client/)[^/]+")
+
+
+def endpoint_template(path: str) -> str:
+    """Заменяет идентификатор клиента в пути на {id}."""
+    return _CLIENT_ID.sub(r"\1{id}", path.split("?", 1)[0])
+
+
+class RequestTiming:
+    """Замеры одного HTTP-запроса; передаётся в aiohttp как trace_request_ctx."""
+
+    __slots__ = (
+        "method", "endpoint", "started", "status", "bytes", "error",
+        "dns", "connect", "first_byte", "total", "_dns_started", "_connect_started",
+    )
+
+    def __init__(self, method: str, endpoint: str):
+        self.method = method
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.status: Optional[int] = None
+        self.bytes = 0
+        self.error: Optional[str] = None
+        self.dns: Optional[float] = None
+        self.connect: Optional[float] = None
+        self.first_byte: Optional[float] = None
+        self.total: Optional[float] = None
+        self._dns_started: Optional[float] = None
+        self._connect_started: Optional[float] = None
+
+    def headers_received(self):
+        self.first_byte = (time.perf_counter() - self.started) * 1000
+
+    def phases(self) -> Dict[str, float]:
+        """Измеренные фазы запроса в миллисекундах."""
+        return {phase: getattr(self, phase) for phase in PHASES if getattr(self, phase) is not None}
+
+    def as_dict(self) -> dict:
+        data = {
+            "method": self.method,
+            "endpoint": self.endpoint,
+            "status": self.status,
+            "bytes": self.bytes,
+        }
+        data.update({f"{phase}_ms": round(value, 3) for phase, value in self.phases().items()})
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class Histogram:
+    """Гистограмма задержек с фиксированными корзинами."""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # Последняя корзина - всё, что больше последней границы
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = 0
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Оценка квантиля сверху: граница корзины, не больше максимума."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                bound = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "min": round(self.min, 3) if self.count else None,
+            "max": round(self.max, 3),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip([*map(str, self.buckets), "+Inf"], self.counts)),
+        }
+
+
+class EndpointStats:
+    """Накопленная статистика по одному шаблону пути и методу."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.statuses: Counter = Counter()
+        self.latency = {phase: Histogram(buckets) for phase in PHASES}
+
+    def add(self, timing: RequestTiming):
+        self.count += 1
+        self.bytes += timing.bytes
+        if timing.error is not None:
+            self.errors += 1
+        else:
+            self.statuses[timing.status] += 1
+        for phase, value in timing.phases().items():
+            self.latency[phase].observe(value)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "latency_ms": {phase: histogram.as_dict() for phase, histogram in self.latency.items() if histogram.count},
+        }
+
+
+class MemorySink:
+    """Приёмник, накапливающий статистику в памяти для итоговой сводки."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self.endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+
+    def record(self, timing: RequestTiming):
+        key = (timing.method, timing.endpoint)
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats(self._buckets)
+        stats.add(timing)
+
+    def summary(self) -> Dict[str, dict]:
+        """Статистика в виде словаря "МЕТОД путь" -> данные, пригодного для JSON."""
+        return {f"{method} {endpoint}": stats.as_dict() for (method, endpoint), stats in sorted(self.endpoints.items())}
+
+    def format_table(self) -> str:
+        """Сводная таблица: запросы, статусы, байты и задержки p50/p95 в мс."""
+        def _ms(value: Optional[float]) -> str:
+            return "-" if value is None else f"{value:.0f}" if value >= 10 else f"{value:.1f}"
+
+        header = ("Запрос", "Число", "Статусы", "Байты", "connect p50", "1-й байт p50/p95", "всего p50/p95")
+        rows = []
+        for (method, endpoint), stats in sorted(self.endpoints.items()):
+            statuses = " ".join(f"{status}:{count}" for status, count in sorted(stats.statuses.items()))
+            if stats.errors:
+                statuses = f"{statuses} ошибки:{stats.errors}".strip()
+            latency = stats.latency
+            rows.append((
+                f"{method} {endpoint}",
+                str(stats.count),
+                statuses,
+                str(stats.bytes),
+                _ms(latency["connect"].quantile(0.5)),
+                f"{_ms(latency['first_byte'].quantile(0.5))}/{_ms(latency['first_byte'].quantile(0.95))}",
+                f"{_ms(latency['total'].quantile(0.5))}/{_ms(latency['total'].quantile(0.95))}",
+            ))
+        if not rows:
+            return "Запросов к WG-Easy не было."
+        widths = [max(len(row[column]) for row in (header, *rows)) for column in range(len(header))]
+        lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in (header, *rows)]
+        lines.insert(1, "  ".join("-" * width for width in widths))
+        return "\n".join(lines)
+
+
+class JSONLogSink:
+    """Приёмник, записывающий каждый запрос строкой JSON."""
+
+    def __init__(self, stream: IO[str] = None):
+        """
+        :param stream: Текстовый поток для записи; по умолчанию sys.stderr
+        """
+        self._stream = stream
+
+    def record(self, timing: RequestTiming):
+        stream = self._stream or sys.stderr
+        data = {"time": round(time.time(), 3)}
+        data.update(timing.as_dict())
+        stream.write(json.dumps(data, ensure_ascii=False) + "\n")
+        stream.flush()
+
+
+class StatsDSink:
+    """
+    Приёмник, отправляющий метрики по UDP в StatsD.
+
+    Для каждого запроса отправляются счётчики <prefix>.<метод>.<путь>.requests,
+    .status.<код> (или .errors), .bytes и таймеры фаз в миллисекундах.
+    Ошибки отправки игнорируются, чтобы метрики не влияли на работу клиента.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8125, prefix: str = "wg_easy"):
+        self.address = (host, port)
+        self.prefix = prefix
+        self._socket: Optional[socket.socket] = None
+
+    @staticmethod
+    def metric_key(method: str, endpoint: str) -> str:
+        path = re.sub(r"[^A-Za-z0-9_.]+", "_", endpoint.strip("/").replace("/", ".").replace("{id}", "id"))
+        return f"{method.lower()}.{path}"
+
+    def lines(self, timing: RequestTiming) -> List[str]:
+        key = f"{self.prefix}.{self.metric_key(timing.method, timing.endpoint)}"
+        lines = [f"{key}.requests:1|c"]
+        if timing.error is not None:
+            lines.append(f"{key}.errors:1|c")
+        else:
+            lines.append(f"{key}.status.{timing.status}:1|c")
+        if timing.bytes:
+            lines.append(f"{key}.bytes:{timing.bytes}|c")
+        lines.extend(f"{key}.{phase}:{value:.3f}|ms" for phase, value in timing.phases().items())
+        return lines
+
+    def record(self, timing: RequestTiming):
+        try:
+            if self._socket is None:
+                self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._socket.setblocking(False)
+            self._socket.sendto("\n".join(self.lines(timing)).encode("ascii"), self.address)
+        except OSError:
+            pass
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class Instrumentation:
+    """
+    Замеры запросов Server к WG-Easy.
+
+    Фазы dns и connect измеряются через aiohttp.TraceConfig и доступны, только
+    если сессию создаёт сам Server. Статусы, байты тела ответа, first_byte и
+    total измеряются всегда. Каждый запрос, включая повторы, передаётся во все
+    приёмники (sinks) - объекты с методом record(timing).
+    """
+
+    def __init__(self, sinks: Iterable[object] = None):
+        """
+        :param sinks: Приёмники замеров; по умолчанию один MemorySink
+        """
+        self.sinks = list(sinks) if sinks is not None else [MemorySink()]
+        self._trace_config: Optional[aiohttp.TraceConfig] = None
+
+    @property
+    def memory(self) -> Optional[MemorySink]:
+        """Первый MemorySink среди приёмников, если он есть."""
+        for sink in self.sinks:
+            if isinstance(sink, MemorySink):
+                return sink
+        return None
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """TraceConfig для ClientSession; один на все сессии этого объекта."""
+        if self._trace_config is None:
+            self._trace_config = self._make_trace_config()
+        return self._trace_config
+
+    @staticmethod
+    def _make_trace_config() -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        def _timing(context) -> Optional[RequestTiming]:
+            timing = context.trace_request_ctx
+            return timing if isinstance(timing, RequestTiming) else None
+
+        async def on_dns_start(session, context, params):
+            timing = _timing(context)
+            if timing is not None:
+                timing._dns_started = time.perf_counter()
+
+        async def on_dns_end(session, context, params):
+            timing = _timing(context)
+            if timing is not None and timing._dns_started is not None:
+                timing.dns = (time.perf_counter() - timing._dns_started) * 1000
+
+        async def on_connect_start(session, context, params):
+            timing = _timing(context)
+            if timing is not None:
+                timing._connect_started = time.perf_counter()
+
+        async def on_connect_end(session, context, params):
+            timing = _timing(context)
+            if timing is not None and timing._connect_started is not None:
+                timing.connect = (time.perf_counter() - timing._connect_started) * 1000
+
+        trace_config.on_dns_resolvehost_start.append(on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(on_dns_end)
+        trace_config.on_connection_create_start.append(on_connect_start)
+        trace_config.on_connection_create_end.append(on_connect_end)
+        return trace_config
+
+    def start(self, method: str, path: str) -> RequestTiming:
+        return RequestTiming(method, endpoint_template(path))
+
+    def finish(
+        self,
+        timing: RequestTiming,
+        response: aiohttp.ClientResponse = None,
+        error: BaseException = None,
+    ):
+        """Завершает замер и передаёт его приёмникам."""
+        timing.total = (time.perf_counter() - timing.started) * 1000
+        if response is not None:
+            timing.status = response.status
+            timing.bytes = response.content.total_bytes
+        if error is not None:
+            timing.error = type(error).__name__
+        for sink in self.sinks:
+            sink.record(timing)
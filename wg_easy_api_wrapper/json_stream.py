@@ -0,0 +1,99 @@
+import codecs
+import json
+from typing import Any, List
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+class JSONArrayDecoder:
+    """
+    Инкрементальный разбор JSON-массива верхнего уровня.
+
+    Байты ответа подаются в feed() по мере поступления, а метод возвращает
+    элементы массива, которые уже удалось разобрать целиком. В памяти
+    хранится только ещё не разобранный хвост, а не весь ответ.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        # start -> item_or_end -> separator -> item -> separator ... -> done
+        self._state = "start"
+
+    @property
+    def done(self) -> bool:
+        """True, если закрывающая скобка массива уже разобрана."""
+        return self._state == "done"
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Добавляет очередной блок данных и возвращает разобранные элементы."""
+        self._buffer += self._text_decoder.decode(data)
+        items = self._parse()
+        # Отбрасываем разобранную часть, чтобы буфер не рос
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        return items
+
+    def close(self):
+        """Проверяет, что поток содержал ровно один законченный массив."""
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        self._skip_whitespace()
+        if self._state != "done":
+            raise ValueError("Неожиданный конец JSON-массива.")
+        if self._pos < len(self._buffer):
+            raise ValueError("Лишние данные после JSON-массива.")
+
+    def _skip_whitespace(self):
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+
+    def _parse(self) -> List[Any]:
+        items = []
+        buffer = self._buffer
+        while True:
+            self._skip_whitespace()
+            if self._pos >= len(buffer) or self._state == "done":
+                return items
+            char = buffer[self._pos]
+
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError(f"Ожидался JSON-массив, получено {char!r}.")
+                self._pos += 1
+                self._state = "item_or_end"
+                continue
+
+            if self._state == "separator":
+                if char == ",":
+                    self._pos += 1
+                    self._state = "item"
+                elif char == "]":
+                    self._pos += 1
+                    self._state = "done"
+                else:
+                    raise ValueError(f"Ожидалась ',' или ']', получено {char!r}.")
+                continue
+
+            if self._state == "item_or_end" and char == "]":
+                self._pos += 1
+                self._state = "done"
+                continue
+
+            try:
+                item, end = self._decoder.raw_decode(buffer, self._pos)
+            except json.JSONDecodeError:
+                # Элемент ещё не пришёл целиком, ждём следующий блок
+                return items
+            # Число или литерал завершены, только если за ними уже пришёл
+            # разделитель: "2" из блока "2." - лишь начало числа 2.5
+            if not isinstance(item, (dict, list, str)) and (end == len(buffer) or buffer[end] not in _DELIMITERS):
+                return items
+            items.append(item)
+            self._pos = end
+            self._state = "separator"
@@ -0,0 +1,244 @@
+import asyncio
+import hashlib
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional
+
+SVG = "svg"
+PNG = "png"
+ANSI = "ansi"
+
+FORMATS = (SVG, PNG, ANSI)
+
+# Размер модуля QR в пикселях для PNG и ширина светлой рамки в модулях
+DEFAULT_SCALE = 8
+DEFAULT_BORDER = 4
+
+
+def _import_error(package: str, extra: str) -> ImportError:
+    return ImportError(f"Для этого установите {package}: pip install wg-easy-api-wrapper[{extra}]")
+
+
+def local_rendering_available() -> bool:
+    """Установлен ли segno или qrcode для генерации QR без обращения к WG-Easy."""
+    for module in ("segno", "qrcode"):
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            pass
+    return False
+
+
+def qr_matrix(text: str) -> List[List[bool]]:
+    """Матрица модулей QR для text без рамки; True - тёмный модуль."""
+    try:
+        import segno
+    except ImportError:
+        segno = None
+    if segno is not None:
+        code = segno.make(text, error="m", micro=False)
+        return [[bool(module) for module in row] for row in code.matrix]
+    try:
+        import qrcode
+    except ImportError:
+        raise _import_error("segno", "qr") from None
+    code = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=0)
+    code.add_data(text)
+    code.make(fit=True)
+    return [[bool(module) for module in row] for row in code.get_matrix()]
+
+
+def matrix_to_svg(matrix: List[List[bool]], scale: int = DEFAULT_SCALE, border: int = DEFAULT_BORDER) -> bytes:
+    """SVG с одним контуром из горизонтальных отрезков тёмных модулей."""
+    size = len(matrix) + 2 * border
+    path = []
+    for y, row in enumerate(matrix, border):
+        x = 0
+        while x < len(row):
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < len(row) and row[x]:
+                x += 1
+            path.append(f"M{start + border},{y}h{x - start}v1h-{x - start}z")
+    pixels = size * scale
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path fill="#000" d="{"".join(path)}"/></svg>\n'
+    ).encode("utf-8")
+
+
+def matrix_to_png(matrix: List[List[bool]], scale: int = DEFAULT_SCALE, border: int = DEFAULT_BORDER) -> bytes:
+    """Чёрно-белый PNG (1 бит на пиксель), закодированный средствами zlib."""
+    width = (len(matrix) + 2 * border) * scale
+    light_row = b"\x00" + _pack_bits("1" * width)
+    raw = [light_row] * (border * scale)
+    padding = "1" * (border * scale)
+    for row in matrix:
+        bits = padding + "".join(("0" if module else "1") * scale for module in row) + padding
+        line = b"\x00" + _pack_bits(bits)
+        raw.extend([line] * scale)
+    raw.extend([light_row] * (border * scale))
+
+    def _chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, width, 1, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _chunk(b"IHDR", header)
+        + _chunk(b"IDAT", zlib.compress(b"".join(raw)))
+        + _chunk(b"IEND", b"")
+    )
+
+
+def _pack_bits(bits: str) -> bytes:
+    bits += "1" * (-len(bits) % 8)
+    return int(bits, 2).to_bytes(len(bits) // 8, "big")
+
+
+def matrix_to_ansi(matrix: List[List[bool]], border: int = 2) -> bytes:
+    """
+    QR для вывода в терминал: две строки модулей на строку текста.
+    Цвета задаются явно, поэтому код читается и на тёмном фоне.
+    """
+    size = len(matrix) + 2 * border
+    light = [False] * size
+    rows = [light] * border + [[False] * border + row + [False] * border for row in matrix] + [light] * border
+    if len(rows) % 2:
+        rows.append(light)
+    blocks = {(False, False): " ", (True, False): "▀", (False, True): "▄", (True, True): "█"}
+    lines = []
+    for top, bottom in zip(rows[::2], rows[1::2]):
+        lines.append("\x1b[30;47m" + "".join(blocks[pair] for pair in zip(top, bottom)) + "\x1b[0m")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def render_qr(text: str, fmt: str = SVG, scale: int = DEFAULT_SCALE, border: int = DEFAULT_BORDER) -> bytes:
+    """Генерирует QR для text в формате svg, png или ansi."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Неизвестный формат QR: {fmt}")
+    matrix = qr_matrix(text)
+    if fmt == SVG:
+        return matrix_to_svg(matrix, scale, border)
+    if fmt == PNG:
+        return matrix_to_png(matrix, scale, border)
+    return matrix_to_ansi(matrix)
+
+
+def svg_to_png(svg: str, scale: float = 1.0) -> bytes:
+    """Растеризует SVG (например, QR из WG-Easy) в PNG через cairosvg."""
+    try:
+        import cairosvg
+    except ImportError:
+        raise _import_error("cairosvg", "png") from None
+    return cairosvg.svg2png(bytestring=svg.encode("utf-8"), scale=scale)
+
+
+class QRRenderer:
+    """
+    Генератор QR с кэшем результатов.
+
+    Результаты кэшируются в памяти по SHA-256 от текста и параметров,
+    поэтому повторный запрос QR для той же конфигурации ничего не считает.
+    При processes > 0 генерация выполняется в пуле процессов, что ускоряет
+    массовую выгрузку и не блокирует цикл событий.
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = 0,
+        cache_size: int = 256,
+        scale: int = DEFAULT_SCALE,
+        border: int = DEFAULT_BORDER,
+    ):
+        """
+        :param processes: Размер пула процессов; 0 - генерировать в текущем
+            процессе, None - по числу процессоров
+        :param cache_size: Сколько последних результатов хранить в памяти
+        """
+        self.processes = os.cpu_count() if processes is None else processes
+        self.cache_size = cache_size
+        self.scale = scale
+        self.border = border
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _key(self, text: str, fmt: str) -> str:
+        digest = hashlib.sha256(f"{fmt}:{self.scale}:{self.border}\0".encode("utf-8"))
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _cached(self, key: str) -> Optional[bytes]:
+        body = self._cache.get(key)
+        if body is not None:
+            self._cache.move_to_end(key)
+        return body
+
+    def _store(self, key: str, body: bytes):
+        self._cache[key] = body
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def render_sync(self, text: str, fmt: str = SVG) -> bytes:
+        """Генерирует QR в текущем процессе, используя кэш."""
+        key = self._key(text, fmt)
+        body = self._cached(key)
+        if body is None:
+            body = render_qr(text, fmt, self.scale, self.border)
+            self._store(key, body)
+        return body
+
+    async def render(self, text: str, fmt: str = SVG) -> bytes:
+        """Генерирует QR; при наличии пула процессов - в нём."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Неизвестный формат QR: {fmt}")
+        if not self.processes:
+            return self.render_sync(text, fmt)
+        key = self._key(text, fmt)
+        body = self._cached(key)
+        if body is None:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.processes)
+            loop = asyncio.get_running_loop()
+            body = await loop.run_in_executor(self._executor, render_qr, text, fmt, self.scale, self.border)
+            self._store(key, body)
+        return body
+
+    async def render_many(self, texts: Iterable[str], fmt: str = SVG) -> List[bytes]:
+        """Генерирует QR для нескольких текстов параллельно; одинаковые тексты считаются один раз."""
+        texts = list(texts)
+        unique = {text: None for text in texts}
+        bodies = await asyncio.gather(*(self.render(text, fmt) for text in unique))
+        rendered = dict(zip(unique, bodies))
+        return [rendered[text] for text in texts]
+
+    def close(self):
+        """Останавливает пул процессов."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
+
+_default_renderer: Optional[QRRenderer] = None
+
+
+def default_renderer() -> QRRenderer:
+    """Общий генератор без пула процессов, с кэшем в памяти."""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = QRRenderer()
+    return _default_renderer
@@ -0,0 +1,126 @@
+import asyncio
+import datetime
+import logging
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .server import Server
+
+logger = logging.getLogger(__name__)
+
+DISABLE = "disable"
+DELETE = "delete"
+
+
+class IdlePeer:
+    """Клиент, отобранный как неактивный; после обработки error содержит исключение или None."""
+
+    __slots__ = ("client", "idle_since", "idle_days", "error")
+
+    def __init__(self, client: 'Client', idle_since: datetime.datetime, idle_days: float):
+        self.client = client
+        self.idle_since = idle_since
+        self.idle_days = idle_days
+        self.error: Optional[Exception] = None
+
+    @property
+    def never_connected(self) -> bool:
+        """True, если клиент ни разу не подключался и отсчёт идёт от даты создания."""
+        return self.client.last_handshake_at is None
+
+
+class ReapResult:
+    """Отобранные неактивные клиенты и результат их обработки."""
+
+    def __init__(self, peers: List[IdlePeer], scanned: int, action: str, dry_run: bool):
+        self.peers = peers
+        self.scanned = scanned
+        self.action = action
+        self.dry_run = dry_run
+
+    def summary(self) -> Dict[str, int]:
+        errors = sum(1 for peer in self.peers if peer.error is not None)
+        return {
+            "scanned": self.scanned,
+            "selected": len(self.peers),
+            "never_connected": sum(1 for peer in self.peers if peer.never_connected),
+            "processed": 0 if self.dry_run else len(self.peers) - errors,
+            "errors": errors,
+        }
+
+
+def select_idle(
+    clients: Iterable['Client'],
+    idle_days: float,
+    now: datetime.datetime = None,
+    include_disabled: bool = False,
+) -> List[IdlePeer]:
+    """
+    Отбирает клиентов без рукопожатий за последние idle_days дней.
+
+    Для клиентов, ни разу не подключавшихся, отсчёт идёт от даты создания,
+    поэтому только что созданные клиенты не отбираются.
+
+    :param now: Текущее время UTC; по умолчанию datetime.utcnow()
+    :param include_disabled: Отбирать и отключённых клиентов
+    :return: Неактивные клиенты, начиная с самых давно неактивных
+    """
+    now = now or datetime.datetime.utcnow()
+    threshold = now - datetime.timedelta(days=idle_days)
+    peers = []
+    for client in clients:
+        if not client.enabled and not include_disabled:
+            continue
+        idle_since = client.last_handshake_at or client.created_at
+        if idle_since is not None and idle_since <= threshold:
+            peers.append(IdlePeer(client, idle_since, (now - idle_since).total_seconds() / 86400))
+    peers.sort(key=lambda peer: peer.idle_since)
+    return peers
+
+
+async def reap(
+    server: 'Server',
+    idle_days: float,
+    action: str = DISABLE,
+    dry_run: bool = False,
+    concurrency: int = 10,
+    now: datetime.datetime = None,
+    on_result: Callable[[IdlePeer], None] = None,
+) -> ReapResult:
+    """
+    Отключает или удаляет клиентов, неактивных idle_days дней и дольше.
+
+    Список клиентов читается один раз; изменения выполняются параллельно,
+    не более concurrency запросов одновременно. При action="disable"
+    уже отключённые клиенты не отбираются, при "delete" - отбираются.
+
+    :param dry_run: Только отобрать клиентов, ничего не меняя
+    :param on_result: Функция, вызываемая для каждого обработанного клиента
+    """
+    if action not in (DISABLE, DELETE):
+        raise ValueError(f"Неизвестное действие: {action}")
+    if concurrency < 1:
+        raise ValueError("concurrency должно быть не меньше 1.")
+
+    clients = [client async for client in server.iter_clients()]
+    peers = select_idle(clients, idle_days, now=now, include_disabled=action == DELETE)
+    result = ReapResult(peers, len(clients), action, dry_run)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _reap(peer: IdlePeer):
+        if not dry_run:
+            try:
+                async with semaphore:
+                    if action == DELETE:
+                        await server.remove_client(peer.client.uid)
+                    else:
+                        await peer.client.disable()
+            except Exception as e:
+                logger.error(f"Ошибка при обработке неактивного клиента '{peer.client.name}': {e}")
+                peer.error = e
+        if on_result is not None:
+            on_result(peer)
+
+    await asyncio.gather(*(_reap(peer) for peer in peers))
+    return result
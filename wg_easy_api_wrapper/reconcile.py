@@ -0,0 +1,300 @@
+import asyncio
+import datetime
+import logging
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from .datafile import read_data_file
+from .errors import ClientNotFoundError
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .server import Server
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+DELETE = "delete"
+ENABLE = "enable"
+DISABLE = "disable"
+RENAME = "rename"
+SET_EXPIRE = "set-expire"
+
+# Порядок вывода плана
+ACTIONS = (CREATE, DELETE, RENAME, ENABLE, DISABLE, SET_EXPIRE)
+
+# Значение expire_date, если поле не указано: срок не проверяется
+_UNMANAGED = object()
+
+
+class DesiredClient:
+    """Желаемое состояние одного клиента."""
+
+    __slots__ = ("name", "enabled", "expire_date", "uid")
+
+    def __init__(self, name: str, enabled: bool = True, expire_date=_UNMANAGED, uid: str = None):
+        """
+        :param name: Имя клиента; по нему клиент ищется, если не указан uid
+        :param enabled: Должен ли клиент быть включён
+        :param expire_date: Дата истечения YYYY-MM-DD или None - бессрочно.
+            Если не указана, срок действия не меняется.
+        :param uid: UID существующего клиента; позволяет его переименовать
+        """
+        if isinstance(expire_date, datetime.date):
+            expire_date = expire_date.strftime("%Y-%m-%d")
+        self.name = name
+        self.enabled = enabled
+        self.expire_date = expire_date
+        self.uid = uid
+
+    @property
+    def manages_expiry(self) -> bool:
+        return self.expire_date is not _UNMANAGED
+
+
+def parse_desired(data) -> Tuple[List[DesiredClient], Optional[bool]]:
+    """
+    Разбирает описание желаемого состояния.
+
+    Поддерживаются список ``clients`` с полями name, enabled, expire_date, uid
+    или словарь имя -> {enabled, expire_date, uid}. Поле верхнего уровня
+    ``prune: true`` разрешает удалять клиентов, которых нет в описании.
+
+    :return: (желаемые клиенты, prune или None, если не указан)
+    """
+    prune = None
+    if isinstance(data, dict) and "clients" in data:
+        prune = data.get("prune")
+        # Строка "false" в YAML или JSON иначе разрешила бы удаление
+        if prune is not None and not isinstance(prune, bool):
+            raise ValueError(f"Поле prune должно быть true или false, получено: {prune!r}")
+        data = data["clients"]
+    if isinstance(data, dict):
+        entries = [dict(entry or {}, name=name) for name, entry in data.items()]
+    elif isinstance(data, list):
+        entries = data
+    else:
+        raise ValueError("Некорректный формат желаемого состояния: ожидается список или словарь клиентов.")
+
+    desired = []
+    names = set()
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"name": entry}
+        name = entry.get("name")
+        if not name:
+            raise ValueError(f"У клиента не указано имя: {entry}")
+        if name in names:
+            raise ValueError(f"Клиент '{name}' описан несколько раз.")
+        names.add(name)
+        enabled = entry.get("enabled", True)
+        if not isinstance(enabled, bool):
+            raise ValueError(f"Поле enabled клиента '{name}' должно быть true или false, получено: {enabled!r}")
+        desired.append(DesiredClient(
+            name,
+            enabled=enabled,
+            expire_date=entry.get("expire_date", _UNMANAGED),
+            uid=entry.get("uid"),
+        ))
+    return desired, prune
+
+
+def load_desired_file(path: str) -> Tuple[List[DesiredClient], Optional[bool]]:
+    """Читает желаемое состояние из YAML- или JSON-файла, см. parse_desired."""
+    return parse_desired(read_data_file(path))
+
+
+def current_expire_date(client: 'Client') -> Optional[str]:
+    """Дата истечения клиента в виде YYYY-MM-DD или None."""
+    raw = client.expired_at_raw
+    return raw[:10] if raw else None
+
+
+class Action:
+    """Одно изменение плана; после выполнения error содержит исключение или None."""
+
+    __slots__ = ("kind", "name", "client", "value", "desired", "error")
+
+    def __init__(self, kind: str, name: str, client: 'Client' = None, value=None, desired: DesiredClient = None):
+        self.kind = kind
+        self.name = name
+        self.client = client
+        self.value = value
+        self.desired = desired
+        self.error: Optional[BaseException] = None
+
+    @property
+    def uid(self) -> Optional[str]:
+        return self.client.uid if self.client is not None else None
+
+    def describe(self) -> str:
+        if self.kind == CREATE:
+            expire = self.value or "бессрочно"
+            state = "" if self.desired.enabled else ", отключён"
+            return f"+ создать '{self.name}' (истекает: {expire}{state})"
+        if self.kind == DELETE:
+            return f"- удалить '{self.name}' (UID={self.uid})"
+        if self.kind == RENAME:
+            return f"~ переименовать '{self.name}' в '{self.value}' (UID={self.uid})"
+        if self.kind == ENABLE:
+            return f"~ включить '{self.name}' (UID={self.uid})"
+        if self.kind == DISABLE:
+            return f"~ отключить '{self.name}' (UID={self.uid})"
+        return f"~ срок '{self.name}': {current_expire_date(self.client) or 'бессрочно'} -> {self.value or 'бессрочно'}"
+
+
+class ReconcileResult:
+    """План приведения к желаемому состоянию и результат его выполнения."""
+
+    def __init__(self, actions: List[Action], dry_run: bool):
+        self.actions = actions
+        self.dry_run = dry_run
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.actions)
+
+    @property
+    def errors(self) -> List[Action]:
+        return [action for action in self.actions if action.error is not None]
+
+    def summary(self) -> Dict[str, int]:
+        """Число изменений каждого вида и число ошибок."""
+        counts = {kind: 0 for kind in ACTIONS}
+        for action in self.actions:
+            counts[action.kind] += 1
+        counts["errors"] = len(self.errors)
+        return counts
+
+
+def plan(clients: Iterable['Client'], desired: Iterable[DesiredClient], prune: bool = False) -> List[Action]:
+    """
+    Строит минимальный план изменений по текущим клиентам.
+
+    Клиенты с uid сопоставляются по UID, остальные - по имени; из нескольких
+    клиентов с одним именем сопоставляется первый. Несопоставленные текущие
+    клиенты удаляются, только если prune=True.
+    """
+    clients = list(clients)
+    by_uid = {client.uid: client for client in clients}
+    by_name: Dict[str, List['Client']] = {}
+    for client in clients:
+        by_name.setdefault(client.name, []).append(client)
+    matched = set()
+    actions: List[Action] = []
+
+    def _match(spec: DesiredClient) -> Optional['Client']:
+        if spec.uid is not None:
+            client = by_uid.get(spec.uid)
+            if client is None:
+                raise ClientNotFoundError(f"Клиент '{spec.name}' с UID={spec.uid} не найден.")
+            return client
+        for client in by_name.get(spec.name, ()):
+            if client.uid not in matched:
+                return client
+        return None
+
+    # Сначала закрепляем клиентов с UID, чтобы поиск по имени их не занял
+    ordered = sorted(desired, key=lambda spec: spec.uid is None)
+    for spec in ordered:
+        client = _match(spec)
+        if client is None:
+            expire = spec.expire_date if spec.manages_expiry else None
+            actions.append(Action(CREATE, spec.name, value=expire, desired=spec))
+            continue
+        matched.add(client.uid)
+        if client.name != spec.name:
+            actions.append(Action(RENAME, client.name, client, spec.name, spec))
+        if client.enabled != spec.enabled:
+            actions.append(Action(ENABLE if spec.enabled else DISABLE, spec.name, client, desired=spec))
+        if spec.manages_expiry and current_expire_date(client) != spec.expire_date:
+            actions.append(Action(SET_EXPIRE, spec.name, client, spec.expire_date, spec))
+
+    if prune:
+        actions.extend(Action(DELETE, client.name, client) for client in clients if client.uid not in matched)
+    actions.sort(key=lambda action: ACTIONS.index(action.kind))
+    return actions
+
+
+async def apply(server: 'Server', actions: List[Action], existing_uids: Iterable[str], concurrency: int = 10):
+    """
+    Выполняет план, не более concurrency запросов одновременно.
+    Ошибки записываются в Action.error, остальные изменения продолжаются.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run(action: Action):
+        try:
+            async with semaphore:
+                if action.kind == CREATE:
+                    await server.create_client(action.name, action.value)
+                elif action.kind == DELETE:
+                    await server.remove_client(action.uid)
+                elif action.kind == RENAME:
+                    await action.client.rename(action.value)
+                elif action.kind == ENABLE:
+                    await action.client.enable()
+                elif action.kind == DISABLE:
+                    await action.client.disable()
+                elif action.kind == SET_EXPIRE:
+                    await server.update_client_expire_date(action.uid, action.value)
+        except Exception as e:
+            logger.error(f"Ошибка при выполнении '{action.describe()}': {e}")
+            action.error = e
+
+    await asyncio.gather(*(_run(action) for action in actions))
+
+    # Отключённых новых клиентов можно отключить только по UID, который
+    # известен лишь из списка, поэтому список читается один раз и только здесь
+    pending = [
+        action for action in actions
+        if action.kind == CREATE and action.error is None and not action.desired.enabled
+    ]
+    if not pending:
+        return
+    existing_uids = set(existing_uids)
+    created: Dict[str, List['Client']] = {}
+    for client in await server.get_clients():
+        if client.uid not in existing_uids:
+            created.setdefault(client.name, []).append(client)
+
+    async def _disable(action: Action):
+        candidates = created.get(action.name)
+        if not candidates:
+            action.error = ClientNotFoundError(f"Клиент '{action.name}' был создан, но не найден.")
+            return
+        action.client = candidates.pop(0)
+        try:
+            async with semaphore:
+                await action.client.disable()
+        except Exception as e:
+            logger.error(f"Ошибка при отключении нового клиента '{action.name}': {e}")
+            action.error = e
+
+    await asyncio.gather(*(_disable(action) for action in pending))
+
+
+async def reconcile(
+    server: 'Server',
+    desired: Iterable[DesiredClient],
+    prune: bool = False,
+    dry_run: bool = False,
+    concurrency: int = 10,
+) -> ReconcileResult:
+    """
+    Приводит клиентов сервера к желаемому состоянию.
+
+    Текущее состояние читается одним запросом списка; если изменений нет,
+    других запросов не выполняется.
+
+    :param desired: Желаемые клиенты, см. DesiredClient и load_desired_file
+    :param prune: Удалять клиентов, которых нет в desired
+    :param dry_run: Только построить план, ничего не меняя
+    :param concurrency: Максимальное число одновременных запросов
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency должно быть не меньше 1.")
+    clients = await server.get_clients()
+    actions = plan(clients, desired, prune=prune)
+    if actions and not dry_run:
+        await apply(server, actions, (client.uid for client in clients), concurrency=concurrency)
+    return ReconcileResult(actions, dry_run)
@@ -0,0 +1,120 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+
+from .errors import CircuitOpenError
+
+# Методы, повтор которых не меняет результат
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Статусы, при которых запрос имеет смысл повторить
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class RetryPolicy:
+    """Политика повторов с экспоненциальной задержкой и случайным разбросом."""
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        max_retry_after: float = 60.0,
+        statuses: Iterable[int] = RETRY_STATUSES,
+    ):
+        """
+        :param attempts: Сколько раз повторять запрос после первой неудачи
+        :param base_delay: Задержка перед первым повтором в секундах
+        :param max_delay: Верхняя граница вычисленной задержки
+        :param max_retry_after: Верхняя граница задержки из заголовка Retry-After
+        :param statuses: HTTP-статусы, при которых запрос повторяется
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.statuses = frozenset(statuses)
+
+    def backoff(self, attempt: int) -> float:
+        """Задержка перед повтором номер attempt (с нуля), "full jitter"."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def retry_after(self, header: Optional[str]) -> Optional[float]:
+        """Разбирает Retry-After в секундах или HTTP-дате."""
+        if not header:
+            return None
+        try:
+            delay = float(header)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(header).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0.0), self.max_retry_after)
+
+
+class CircuitBreaker:
+    """
+    Размыкатель цепи для одного узла WG-Easy.
+
+    После failure_threshold сбоев подряд запросы отклоняются сразу в течение
+    reset_timeout секунд. Затем пропускается один пробный запрос: при успехе
+    цепь замыкается, при сбое снова размыкается.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        :param failure_threshold: Число сбоев подряд, после которого цепь размыкается
+        :param reset_timeout: Через сколько секунд пропустить пробный запрос
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_request(self, target: str = "") -> bool:
+        """
+        Поднимает CircuitOpenError, если запрос сейчас выполнять нельзя.
+
+        :return: True, если запрос пропущен как пробный; без исхода его нужно освободить через release_probe
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return False
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+        raise CircuitOpenError(
+            f"Узел {target} временно недоступен после {self._failures} сбоев подряд, "
+            f"повтор через {max(remaining, 0):.0f} с."
+        )
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        """Освобождает пробный запрос, завершившийся без результата, например отменённый."""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
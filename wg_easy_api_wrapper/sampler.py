@@ -0,0 +1,216 @@
+import asyncio
+import heapq
+import logging
+import math
+import time
+from array import array
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .server import Server
+
+logger = logging.getLogger(__name__)
+
+# Окна усреднения скорости в секундах
+WINDOWS = {"1m": 60.0, "5m": 300.0, "1h": 3600.0}
+
+
+class _PeerRing:
+    """
+    Кольцевые буферы счётчиков одного клиента.
+
+    Слоты совпадают со слотами общего буфера меток времени TrafficSampler,
+    поэтому время каждого замера хранится один раз на всех клиентов.
+    Счётчики хранятся накопленными с учётом сбросов, то есть не убывают.
+    """
+
+    __slots__ = ("rx", "tx", "first_seq", "last_rx", "last_tx", "rx_offset", "tx_offset")
+
+    def __init__(self, capacity: int, first_seq: int):
+        self.rx = array("Q", bytes(8 * capacity))
+        self.tx = array("Q", bytes(8 * capacity))
+        self.first_seq = first_seq
+        self.last_rx = 0
+        self.last_tx = 0
+        self.rx_offset = 0
+        self.tx_offset = 0
+
+
+class TrafficSampler:
+    """
+    Периодически опрашивает список клиентов и считает скорость трафика по каждому.
+
+    Для каждого клиента хранится фиксированное число замеров (rx, tx) в
+    кольцевых буферах на основе array, а метки времени - в одном общем
+    буфере, так что объём памяти не растёт со временем работы. Сброс
+    счётчиков при перезапуске WireGuard учитывается: убывание счётчика
+    считается началом отсчёта с нуля.
+    """
+
+    def __init__(self, server: 'Server', interval: float = 30.0, history: float = 3600.0):
+        """
+        :param server: Сервер с активной сессией
+        :param interval: Интервал опроса в секундах
+        :param history: Сколько секунд истории хранить; определяет самое
+            длинное окно усреднения
+        """
+        if interval <= 0 or history <= 0:
+            raise ValueError("interval и history должны быть положительными.")
+        self._server = server
+        self.interval = interval
+        # Замер на границе окна тоже нужен, поэтому +2
+        self.capacity = int(math.ceil(history / interval)) + 2
+        self._times = array("d", bytes(8 * self.capacity))
+        self._count = 0
+        self._peers: Dict[str, _PeerRing] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def peers(self) -> int:
+        """Число отслеживаемых клиентов."""
+        return len(self._peers)
+
+    def record(self, clients: Iterable['Client'], timestamp: float = None):
+        """
+        Добавляет замер счётчиков клиентов.
+        Клиенты, пропавшие из списка, перестают отслеживаться.
+
+        :param timestamp: Монотонное время замера; по умолчанию time.monotonic()
+        """
+        seq = self._count
+        slot = seq % self.capacity
+        self._times[slot] = time.monotonic() if timestamp is None else timestamp
+
+        seen = set()
+        for client in clients:
+            uid = client.uid
+            seen.add(uid)
+            ring = self._peers.get(uid)
+            if ring is None:
+                ring = self._peers[uid] = _PeerRing(self.capacity, seq)
+            rx, tx = client.transfer_rx or 0, client.transfer_tx or 0
+            # Счётчик уменьшился - WireGuard перезапущен и считает с нуля
+            if rx < ring.last_rx:
+                ring.rx_offset += ring.last_rx
+            if tx < ring.last_tx:
+                ring.tx_offset += ring.last_tx
+            ring.last_rx, ring.last_tx = rx, tx
+            ring.rx[slot] = rx + ring.rx_offset
+            ring.tx[slot] = tx + ring.tx_offset
+
+        for uid in self._peers.keys() - seen:
+            del self._peers[uid]
+        self._count = seq + 1
+
+    async def sample(self):
+        """Получает список клиентов и записывает замер."""
+        self.record([client async for client in self._server.iter_clients()])
+
+    async def run(self):
+        """Опрашивает сервер каждые interval секунд до отмены задачи."""
+        while True:
+            started = time.monotonic()
+            try:
+                await self.sample()
+            except Exception as e:
+                logger.error(f"Ошибка при опросе трафика: {e}")
+            await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0))
+
+    def start(self) -> asyncio.Task:
+        """Запускает run() в фоновой задаче."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    async def stop(self):
+        """Останавливает фоновую задачу."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _oldest_seq(self, ring: _PeerRing) -> int:
+        return max(ring.first_seq, self._count - self.capacity)
+
+    def _seq_before(self, lo: int, hi: int, moment: float) -> int:
+        """Последний замер в [lo, hi], сделанный не позже moment, или lo."""
+        times, capacity = self._times, self.capacity
+        while lo < hi:
+            middle = (lo + hi + 1) // 2
+            if times[middle % capacity] <= moment:
+                lo = middle
+            else:
+                hi = middle - 1
+        return lo
+
+    def _rate_between(self, ring: _PeerRing, start: int, end: int) -> Optional[Tuple[float, float]]:
+        if start >= end:
+            return None
+        capacity = self.capacity
+        first, last = start % capacity, end % capacity
+        elapsed = self._times[last] - self._times[first]
+        if elapsed <= 0:
+            return None
+        return (
+            (ring.rx[last] - ring.rx[first]) / elapsed,
+            (ring.tx[last] - ring.tx[first]) / elapsed,
+        )
+
+    def rate(self, uid: str, window: float = None) -> Optional[Tuple[float, float]]:
+        """
+        Средняя скорость клиента в байтах в секунду (rx, tx).
+
+        :param window: Окно усреднения в секундах; по умолчанию - между двумя
+            последними замерами. Если истории меньше окна, усреднение идёт по
+            всей доступной истории.
+        :return: (rx, tx) или None, если замеров меньше двух
+        """
+        ring = self._peers.get(uid)
+        if ring is None:
+            return None
+        last = self._count - 1
+        oldest = self._oldest_seq(ring)
+        if window is None:
+            return self._rate_between(ring, max(last - 1, oldest), last)
+        moment = self._times[last % self.capacity] - window
+        return self._rate_between(ring, self._seq_before(oldest, last, moment), last)
+
+    def rates(self, uid: str) -> Dict[str, Optional[Tuple[float, float]]]:
+        """Текущая скорость и средние за 1m, 5m и 1h для клиента."""
+        result = {"current": self.rate(uid)}
+        for name, window in WINDOWS.items():
+            result[name] = self.rate(uid, window)
+        return result
+
+    def top_talkers(
+        self,
+        n: int = 10,
+        window: float = None,
+        direction: str = "total",
+    ) -> List[Tuple[str, float, float]]:
+        """
+        Клиенты с наибольшей скоростью трафика.
+
+        :param window: Окно усреднения, см. rate()
+        :param direction: "rx", "tx" или "total"
+        :return: Список (uid, rx, tx) по убыванию скорости
+        """
+        keys = {
+            "rx": lambda item: item[1],
+            "tx": lambda item: item[2],
+            "total": lambda item: item[1] + item[2],
+        }
+        if direction not in keys:
+            raise ValueError(f"Неизвестное направление: {direction}")
+
+        def _items():
+            for uid in self._peers:
+                rate = self.rate(uid, window)
+                if rate is not None:
+                    yield uid, rate[0], rate[1]
+
+        return heapq.nlargest(n, _items(), key=keys[direction])
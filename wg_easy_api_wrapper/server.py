@@ -1,45 +1,143 @@
-import aiohttp
+import asyncio
+import datetime
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Union
+
+import aiohttp
+from yarl import URL
+
+from .cache import ClientCache
 from .client import Client
-from .errors import AlreadyLoggedInError
+from .connection import ConnectionConfig
+from .disk_cache import DiskCache
+from .errors import (
+    AlreadyLoggedInError,
+    APIError,
+    AuthenticationError,
+    ClientNotFoundError,
+    ServerUnavailableError,
+    error_for_status,
+)
+from .export import export_clients
+from .instrumentation import Instrumentation
+from .json_stream import JSONArrayDecoder
+from .reaper import DISABLE, ReapResult, reap
+from .reconcile import DesiredClient, ReconcileResult, reconcile
+from .retry import IDEMPOTENT_METHODS, CircuitBreaker, RetryPolicy
+from .session_store import SessionStore
+from .snapshot import Snapshot
+from .stats import DEFAULT_TOP, ONLINE_WINDOW, ClientStats, StatsCollector
 
-# Настройка логирования
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class Server:
-    def __init__(self, url: str, password: str, session: aiohttp.ClientSession = None):
+    def __init__(
+        self,
+        url: str,
+        password: str,
+        session: aiohttp.ClientSession = None,
+        cache_ttl: float = None,
+        session_store: SessionStore = None,
+        logout_on_exit: bool = True,
+        connection: ConnectionConfig = None,
+        connector: aiohttp.BaseConnector = None,
+        retry: RetryPolicy = None,
+        circuit_breaker: CircuitBreaker = None,
+        instrumentation: Instrumentation = None,
+        disk_cache: DiskCache = None,
+    ):
         """
         :param url: Адрес WG-Easy, например http://wg.example.com:51821
         :param password: Пароль для WG-Easy
         :param session: Опциональная aiohttp.ClientSession
+        :param cache_ttl: Время жизни кэша клиентов в секундах.
+            Если не указано, кэш отключён и каждый поиск перечитывает список.
+        :param session_store: Хранилище куки для повторного использования сессии
+            между запусками. Сохранённые куки используются без повторного входа,
+            вход выполняется, только если WG-Easy ответит 401.
+        :param logout_on_exit: Выполнять ли выход при закрытии контекстного менеджера.
+            При False сессия остаётся действительной и сохраняется в session_store.
+        :param connection: Параметры пула соединений, таймаутов и сжатия.
+            Не используется, если передана session.
+        :param connector: Общий коннектор, через который могут работать несколько
+            экземпляров Server. Server его не закрывает.
+        :param retry: Политика повторов запросов; по умолчанию RetryPolicy()
+        :param circuit_breaker: Размыкатель цепи узла; по умолчанию CircuitBreaker()
+        :param instrumentation: Замеры задержек, статусов и объёма ответов по
+            каждому запросу. Фазы dns и connect измеряются, только если сессию
+            создаёт сам Server.
+        :param disk_cache: Дисковый кэш конфигураций и QR-кодов. Если клиент
+            не менялся (по updatedAt из списка), они берутся из кэша без запроса.
         """
         self.url = url.rstrip("/")
         self._password = password
         self._session_provided = session is not None
-        self._session = session if session else aiohttp.ClientSession()
+        if session is None:
+            trace_configs = [instrumentation.trace_config()] if instrumentation is not None else None
+            session = (connection or ConnectionConfig()).make_session(connector, trace_configs)
+        self._session = session
+        self._cache = ClientCache(cache_ttl) if cache_ttl else None
+        self._session_store = session_store
+        self._logout_on_exit = logout_on_exit
+        self._retry = retry or RetryPolicy()
+        self._circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._instrumentation = instrumentation
+        self._disk_cache = disk_cache
+        self._authenticated = False
+        # Номер входа: запросы, получившие 401 до очередного входа, не входят повторно
+        self._auth_generation = 0
+        self._login_lock = None
 
     def get_session_request(self):
         """Возвращает контекстный менеджер для запроса информации о сессии."""
         return self._session.get(self.url_builder("/api/session"))
 
     async def is_logged_in(self) -> bool:
-        """Проверяем, залогинен ли текущий сеанс."""
+        """
+        Проверяем у WG-Easy, залогинен ли текущий сеанс.
+        Для повседневной работы достаточно локального признака authenticated.
+        """
         async with self.get_session_request() as response:
             json_response = await response.json()
-            return json_response.get("authenticated", False)
+            self._authenticated = json_response.get("authenticated", False)
+            return self._authenticated
+
+    @property
+    def authenticated(self) -> bool:
+        """Локальный признак авторизации, без запроса к WG-Easy."""
+        return self._authenticated
+
+    @property
+    def instrumentation(self):
+        """Замеры запросов, переданные в конструктор, или None."""
+        return self._instrumentation
+
+    @property
+    def disk_cache(self):
+        """Дисковый кэш конфигураций и QR-кодов или None."""
+        return self._disk_cache
 
     def url_builder(self, path: str) -> str:
         """Функция для создания полного URL."""
         return f"{self.url}{path}"
 
     async def __aenter__(self):
-        await self.login()
+        try:
+            if not await self._restore_session():
+                await self.login()
+        except BaseException:
+            # __aexit__ не будет вызван, поэтому закрываем свою сессию здесь
+            if not self._session_provided:
+                await self._session.close()
+            raise
         return self
 
     async def __aexit__(self, exc_type, exc_value, exc_tb):
         try:
-            if await self.is_logged_in():
+            if not self._logout_on_exit:
+                self._save_session()
+            elif self._authenticated:
                 await self.logout()
         except Exception as e:
             # Логируем ошибку выхода, но не поднимаем исключение
@@ -52,93 +150,351 @@ class Server:
         if exc_type:
             raise exc_value
 
+    async def _restore_session(self) -> bool:
+        """
+        Подставляет сохранённые куки без обращения к WG-Easy.
+        Если сессия уже истекла, первый запрос получит 401 и выполнит вход.
+        """
+        if self._session_store is None:
+            return False
+        cookies = self._session_store.load(self.url)
+        if not cookies:
+            return False
+        # Привязываем куки к адресу сервера, чтобы они не уходили на другие хосты
+        url = URL(self.url)
+        self._session.cookie_jar.update_cookies(cookies, response_url=url)
+        if not self._session.cookie_jar.filter_cookies(url):
+            # Стандартный CookieJar не принимает куки для IP-адресов
+            logger.debug("Сохранённые куки не приняты, выполняется вход.")
+            return False
+        self._authenticated = True
+        logger.debug("Используется сохранённая сессия.")
+        return True
+
+    def _save_session(self):
+        """Сохраняет текущие куки сессии в session_store."""
+        if self._session_store is None:
+            return
+        cookies = {morsel.key: morsel.value for morsel in self._session.cookie_jar}
+        if cookies:
+            self._session_store.save(self.url, cookies)
+
+    @asynccontextmanager
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        action: str = "при запросе к WG-Easy",
+        expected: Iterable[int] = (200,),
+        idempotent: bool = None,
+        reauthenticate: bool = True,
+        **kwargs,
+    ):
+        """
+        Единая точка выполнения запросов к API WG-Easy; отдаёт ответ в блок async with.
+
+        - при 401 выполняет повторный вход и повторяет запрос один раз;
+        - идемпотентные запросы повторяет при 429/502/503/504, таймаутах и сбоях
+          соединения с экспоненциальной задержкой, учитывая Retry-After;
+          неидемпотентные повторяются, только если соединение не было установлено;
+        - учитывает в размыкателе цепи узла один исход на запрос вместе с повторами;
+        - при статусе вне expected поднимает исключение из errors с кодом статуса.
+
+        :param action: Описание действия для сообщения об ошибке, например "при удалении клиента"
+        :param expected: Успешные HTTP-статусы
+        :param idempotent: Можно ли повторять запрос; по умолчанию определяется методом
+        :param reauthenticate: Выполнять ли повторный вход при 401
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        url = self.url_builder(path)
+        attempt = 0
+        reauthenticated = not reauthenticate
+
+        probe = self._circuit_breaker.before_request(self.url)
+        recorded = False
+        try:
+            while True:
+                generation = self._auth_generation
+                timing = self._instrumentation.start(method, path) if self._instrumentation is not None else None
+                try:
+                    response = await self._session.request(method, url, trace_request_ctx=timing, **kwargs)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if timing is not None:
+                        self._instrumentation.finish(timing, error=e)
+                    # Если соединение не установлено, запрос точно не дошёл до WG-Easy
+                    retryable = idempotent or isinstance(e, aiohttp.ClientConnectorError)
+                    if retryable and attempt < self._retry.attempts:
+                        delay = self._retry.backoff(attempt)
+                        attempt += 1
+                        logger.debug(f"{method} {path}: {e!r}, повтор {attempt} через {delay:.2f} с.")
+                        await asyncio.sleep(delay)
+                        continue
+                    self._circuit_breaker.record_failure()
+                    recorded = True
+                    raise ServerUnavailableError(f"Ошибка {action}: {e or type(e).__name__}") from e
+
+                if timing is not None:
+                    timing.headers_received()
+                if response.status < 500:
+                    # Узел отвечает; цепь замыкается до повторного входа, который сам проходит через размыкатель
+                    self._circuit_breaker.record_success()
+                    recorded = True
+
+                if response.status == 401 and not reauthenticated:
+                    await self._discard(response)
+                    self._finish_timing(timing, response)
+                    logger.debug(f"Сессия истекла ({method} {path}), выполняется повторный вход.")
+                    await self._reauthenticate(generation)
+                    reauthenticated = True
+                    continue
+
+                if (
+                    response.status in self._retry.statuses
+                    and idempotent
+                    and attempt < self._retry.attempts
+                ):
+                    delay = self._retry.retry_after(response.headers.get("Retry-After"))
+                    if delay is None:
+                        delay = self._retry.backoff(attempt)
+                    await self._discard(response)
+                    self._finish_timing(timing, response)
+                    attempt += 1
+                    logger.debug(f"{method} {path}: статус {response.status}, повтор {attempt} через {delay:.2f} с.")
+                    await asyncio.sleep(delay)
+                    continue
+                break
+
+            if response.status >= 500:
+                self._circuit_breaker.record_failure()
+                recorded = True
+        finally:
+            # Отмена или ошибка повторного входа не должны оставить пробный запрос занятым
+            if probe and not recorded:
+                self._circuit_breaker.release_probe()
+
+        try:
+            if response.status not in expected:
+                message = await self._error_message(response, f"Неизвестная ошибка {action}.")
+                logger.debug(f"Ответ сервера {method} {path}: статус={response.status}, сообщение={message}")
+                raise error_for_status(response.status, f"Ошибка {action}: {message}")
+            yield response
+        finally:
+            response.release()
+            self._finish_timing(timing, response)
+
+    def _finish_timing(self, timing, response: aiohttp.ClientResponse):
+        if timing is not None:
+            self._instrumentation.finish(timing, response)
+
+    @staticmethod
+    async def _error_message(response: aiohttp.ClientResponse, default: str) -> str:
+        """Извлекает сообщение об ошибке из JSON-поля error или текста ответа."""
+        try:
+            json_response = await response.json()
+            return json_response.get("error", default)
+        except (aiohttp.ContentTypeError, ValueError, AttributeError):
+            return await response.text() or default
+
+    @staticmethod
+    async def _discard(response: aiohttp.ClientResponse):
+        """Дочитывает и освобождает ненужный ответ, чтобы соединение вернулось в пул."""
+        try:
+            await response.read()
+        except aiohttp.ClientError:
+            pass
+        finally:
+            response.release()
+
+    async def _reauthenticate(self, generation: int):
+        """
+        Повторно входит в WG-Easy после 401. Одновременные запросы,
+        получившие 401 на одной и той же сессии, выполняют один общий вход.
+        """
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+        async with self._login_lock:
+            if self._auth_generation != generation:
+                # Пока мы ждали блокировку, вход уже выполнил другой запрос
+                return
+            self._authenticated = False
+            await self.login()
+
     async def login(self):
         """Выполняет вход в WG-Easy."""
-        if await self.is_logged_in():
+        if self._authenticated:
             raise AlreadyLoggedInError("Вы уже вошли в систему.")
 
-        async with self._session.post(
-            self.url_builder("/api/session"),
-            json={"password": self._password}
-        ) as response:
-            if response.status != 200:
+        try:
+            request = self._request(
+                "POST", "/api/session",
+                action="входа",
+                reauthenticate=False,
+                json={"password": self._password},
+            )
+            async with request as response:
+                # Обновляем куки из ответа
+                self._session.cookie_jar.update_cookies(response.cookies)
+                self._authenticated = True
+                self._auth_generation += 1
+                self._save_session()
+
+                # Потребляем тело ответа, чтобы избежать предупреждений
                 try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при входе.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                raise Exception(f"Ошибка входа: {error_message}")
+                    await response.text()
+                except Exception as e:
+                    logger.warning(f"Не удалось полностью потребить тело ответа при входе: {e}")
+        except APIError as e:
+            if isinstance(e, (AuthenticationError, ServerUnavailableError)):
+                raise
+            # WG-Easy отвечает на неверный пароль не только 401
+            raise AuthenticationError(str(e), e.status) from e
 
-            # Обновляем куки из ответа
-            self._session.cookie_jar.update_cookies(response.cookies)
+    async def logout(self):
+        """Выполняет выход из WG-Easy."""
+        if not self._authenticated:
+            raise AlreadyLoggedInError("Вы не вошли в систему.")
 
+        async with self._request(
+            "DELETE", "/api/session",
+            action="выхода",
+            expected=(200, 204),
+            reauthenticate=False,
+        ) as response:
+            logger.debug("Успешно завершена сессия.")
+            self._authenticated = False
+            if self._session_store is not None:
+                self._session_store.clear(self.url)
             # Потребляем тело ответа, чтобы избежать предупреждений
             try:
                 await response.text()
             except Exception as e:
-                logger.warning(f"Не удалось полностью потребить тело ответа при входе: {e}")
-
-    async def logout(self):
-        """Выполняет выход из WG-Easy."""
-        if not await self.is_logged_in():
-            raise AlreadyLoggedInError("Вы не вошли в систему.")
-
-        async with self._session.delete(self.url_builder("/api/session")) as response:
-            if response.status not in [204, 200]:
-                try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при выходе.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                logger.debug(f"Ответ сервера при logout: статус={response.status}, сообщение={error_message}")
-                raise Exception(f"Ошибка выхода: {error_message}")
-            else:
-                logger.debug("Успешно завершена сессия.")
-                # Потребляем тело ответа, чтобы избежать предупреждений
-                try:
-                    await response.text()
-                except Exception as e:
-                    logger.warning(f"Не удалось полностью потребить тело ответа при выходе: {e}")
+                logger.warning(f"Не удалось полностью потребить тело ответа при выходе: {e}")
 
     async def get_clients(self):
         """Возвращает список всех WireGuard-клиентов как объекты Client."""
-        async with self._session.get(self.url_builder("/api/wireguard/client")) as response:
-            if response.status != 200:
-                try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при получении клиентов.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                raise Exception(f"Ошибка при получении клиентов: {error_message}")
+        async with self._request("GET", "/api/wireguard/client", action="при получении клиентов") as response:
             data = await response.json()
-            return [Client.from_json(item, self._session, self) for item in data]
+            clients = [Client.from_json(item, self._session, self) for item in data]
+            if self._cache is not None:
+                self._cache.fill(clients)
+            return clients
 
-    async def get_client(self, uid: str):
-        """Возвращает объект Client по его UID, или None, если не найден."""
+    async def iter_clients(self, chunk_size: int = 64 * 1024) -> AsyncIterator[Client]:
+        """
+        Асинхронно перебирает WireGuard-клиентов по мере чтения ответа.
+
+        Массив /api/wireguard/client разбирается из потока блоками по chunk_size
+        байт, поэтому первый клиент доступен до получения всего ответа,
+        а в памяти не держится полный список.
+        """
+        async with self._request("GET", "/api/wireguard/client", action="при получении клиентов") as response:
+            decoder = JSONArrayDecoder()
+            # Кэш заполняется только после полного перебора, и только если он включён
+            collected = [] if self._cache is not None else None
+            async for chunk in response.content.iter_chunked(chunk_size):
+                for item in decoder.feed(chunk):
+                    client = Client.from_json(item, self._session, self)
+                    if collected is not None:
+                        collected.append(client)
+                    yield client
+            decoder.close()
+            if collected is not None:
+                self._cache.fill(collected)
+
+    async def _lookup(self, attribute: str, value: str):
+        """Ищет клиента по атрибуту в кэше, при необходимости перечитывая список."""
+        if self._cache is not None:
+            if not self._cache.is_fresh():
+                await self.get_clients()
+            return self._cache.lookup(attribute, value)
         clients = await self.get_clients()
         for client in clients:
-            if client.uid == uid:
+            if getattr(client, attribute) == value:
                 return client
         return None
 
+    async def get_client(self, uid: str):
+        """Возвращает объект Client по его UID, или None, если не найден."""
+        return await self._lookup("uid", uid)
+
     async def get_client_by_name(self, name: str):
         """Возвращает объект Client по его имени, или None, если не найден."""
-        clients = await self.get_clients()
-        for client in clients:
-            if client.name == name:
-                return client
-        return None
+        return await self._lookup("name", name)
+
+    async def get_client_by_public_key(self, public_key: str):
+        """Возвращает объект Client по публичному ключу, или None, если не найден."""
+        return await self._lookup("public_key", public_key)
+
+    async def get_client_by_address(self, address: str):
+        """Возвращает объект Client по его адресу, или None, если не найден."""
+        return await self._lookup("address", address)
+
+    async def expiring_within(self, days: float, include_expired: bool = False) -> List[Client]:
+        """
+        Возвращает клиентов, срок действия которых истекает в ближайшие days дней,
+        отсортированных по времени истечения.
+
+        :param include_expired: Включать клиентов, срок которых уже истёк
+        """
+        # Кэш клиентов предназначен для поиска; сроки берутся из свежего списка
+        clients = [client async for client in self.iter_clients()]
+        now = datetime.datetime.utcnow()
+        deadline = now + datetime.timedelta(days=days)
+        expiring = [
+            client for client in clients
+            if client.expired_at is not None
+            and client.expired_at <= deadline
+            and (include_expired or client.expired_at > now)
+        ]
+        expiring.sort(key=lambda client: client.expired_at)
+        return expiring
+
+    async def snapshot(self, now: float = None) -> Snapshot:
+        """
+        Возвращает снимок всех клиентов в виде столбцов для быстрых запросов,
+        см. Snapshot.
+
+        :param now: Момент в секундах Unix, от которого считаются idle, age
+            и expires_in; по умолчанию текущее время
+        """
+        # Трафик и рукопожатия в кэше клиентов могут отставать на cache_ttl
+        clients = [client async for client in self.iter_clients()]
+        return Snapshot.from_clients(clients, now)
+
+    async def stats(self, top: int = DEFAULT_TOP, online_window: float = ONLINE_WINDOW) -> ClientStats:
+        """
+        Возвращает сводку по клиентам: суммарный трафик, число клиентов онлайн,
+        распределение давности рукопожатий и top самых активных по трафику.
+        Считается за один проход по списку клиентов без его сохранения.
+
+        :param online_window: Давность рукопожатия в секундах, при которой клиент онлайн
+        """
+        collector = StatsCollector(top=top, online_window=online_window)
+        # Всегда свежий список: в кэше клиентов трафик мог устареть на cache_ttl
+        async for client in self.iter_clients():
+            collector.add(client)
+        return collector.result()
+
+    def _cache_reindex(self, client: Client, old_name: str = None, old_address: str = None):
+        """Отражает в кэше изменение клиента, сделанное через его методы."""
+        if self._cache is not None and self._cache.is_fresh():
+            self._cache.reindex(client, old_name=old_name, old_address=old_address)
+
+    def invalidate_cache(self):
+        """Сбрасывает кэш клиентов, следующий поиск перечитает список."""
+        if self._cache is not None:
+            self._cache.invalidate()
 
     async def remove_client(self, uid: str):
         """Удаляет клиента по UID."""
-        async with self._session.delete(self.url_builder(f"/api/wireguard/client/{uid}")) as response:
-            if response.status != 204:
-                try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при удалении клиента.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                raise Exception(f"Ошибка при удалении клиента: {error_message}")
+        async with self._request(
+            "DELETE", f"/api/wireguard/client/{uid}",
+            action="при удалении клиента",
+            expected=(204,),
+        ):
+            if self._cache is not None:
+                self._cache.remove(uid)
 
     async def create_client(self, name: str, expire_date: str = None):
         """
@@ -149,25 +505,114 @@ class Server:
         if expire_date:
             payload["expiredDate"] = expire_date
 
-        async with self._session.post(
-            self.url_builder("/api/wireguard/client"),
+        async with self._request(
+            "POST", "/api/wireguard/client",
+            action="при создании клиента",
+            expected=(200, 201),
             json=payload
         ) as response:
-            if response.status not in [200, 201]:
-                try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при создании клиента.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                logger.debug(f"Ответ сервера при создании клиента: статус={response.status}, сообщение={error_message}")
-                raise Exception(f"Ошибка при создании клиента: {error_message}")
-            else:
-                logger.debug(f"Клиент '{name}' успешно создан.")
-                # Потребляем тело ответа, чтобы избежать предупреждений
-                try:
-                    await response.text()
-                except Exception as e:
-                    logger.warning(f"Не удалось полностью потребить тело ответа при создании клиента: {e}")
+            logger.debug(f"Клиент '{name}' успешно создан.")
+            # UID нового клиента известен только из списка, поэтому сбрасываем кэш
+            self.invalidate_cache()
+            # Потребляем тело ответа, чтобы избежать предупреждений
+            try:
+                await response.text()
+            except Exception as e:
+                logger.warning(f"Не удалось полностью потребить тело ответа при создании клиента: {e}")
+
+    async def create_clients(
+        self,
+        names: Iterable[str],
+        expire_date: str = None,
+        concurrency: int = 10,
+    ) -> Dict[str, Union[Client, Exception]]:
+        """
+        Создаёт сразу несколько клиентов, выполняя не более concurrency запросов одновременно.
+        После всех созданий список клиентов перечитывается один раз.
+
+        :param names: Уникальные имена новых клиентов
+        :param expire_date: Дата истечения для всех клиентов, формат YYYY-MM-DD
+        :param concurrency: Максимальное число одновременных запросов
+        :return: Словарь имя -> созданный Client или исключение, из-за которого создание не удалось
+        """
+        names = list(names)
+        if len(set(names)) != len(names):
+            raise ValueError("Имена клиентов должны быть уникальными.")
+        if concurrency < 1:
+            raise ValueError("concurrency должно быть не меньше 1.")
+
+        # Известные до создания UID: из кэша, если он свежий, без отдельного запроса списка
+        if self._cache is not None and self._cache.is_fresh():
+            existing_uids = {client.uid for client in self._cache.clients()}
+        else:
+            existing_uids = set()
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _create(name: str):
+            async with semaphore:
+                await self.create_client(name, expire_date)
+
+        outcomes = await asyncio.gather(*(_create(name) for name in names), return_exceptions=True)
+        results = {
+            name: outcome
+            for name, outcome in zip(names, outcomes)
+            if isinstance(outcome, Exception)
+        }
+
+        if len(results) < len(names):
+            # Из тёзок новым считается созданный последним: метки createdAt
+            # в одном формате ISO 8601 сравниваются как строки
+            wanted = set(names) - set(results)
+            created = {}
+            for client in await self.get_clients():
+                if client.name not in wanted or client.uid in existing_uids:
+                    continue
+                current = created.get(client.name)
+                if current is None or client.created_at_raw > current.created_at_raw:
+                    created[client.name] = client
+            for name in names:
+                if name not in results:
+                    results[name] = created.get(name) or ClientNotFoundError(
+                        f"Клиент '{name}' был создан, но не найден."
+                    )
+
+        return {name: results[name] for name in names}
+
+    async def export_clients(self, out_dir: str, clients: Iterable[Client] = None, **kwargs):
+        """
+        Выгружает конфигурации и QR-коды клиентов в каталог out_dir.
+        Параметры описаны в wg_easy_api_wrapper.export.export_clients.
+        """
+        return await export_clients(self, out_dir, clients, **kwargs)
+
+    async def reconcile(
+        self,
+        desired: Iterable[DesiredClient],
+        prune: bool = False,
+        dry_run: bool = False,
+        concurrency: int = 10,
+    ) -> ReconcileResult:
+        """
+        Приводит клиентов к желаемому состоянию за один запрос списка плюс
+        только необходимые изменения. Параметры описаны в
+        wg_easy_api_wrapper.reconcile.reconcile.
+        """
+        return await reconcile(self, desired, prune=prune, dry_run=dry_run, concurrency=concurrency)
+
+    async def reap(
+        self,
+        idle_days: float,
+        action: str = DISABLE,
+        dry_run: bool = False,
+        concurrency: int = 10,
+        **kwargs,
+    ) -> ReapResult:
+        """
+        Отключает или удаляет клиентов без рукопожатий за idle_days дней.
+        Параметры описаны в wg_easy_api_wrapper.reaper.reap.
+        """
+        return await reap(self, idle_days, action=action, dry_run=dry_run, concurrency=concurrency, **kwargs)
 
     async def update_client_expire_date(self, uid: str, expire_date: str = None):
         """
@@ -175,22 +620,15 @@ class Server:
         Если expire_date=None, возможно, нужно передать {"expireDate": null} или пустой JSON.
         """
         payload = {"expireDate": expire_date} if expire_date is not None else {}
-        async with self._session.put(
-            self.url_builder(f"/api/wireguard/client/{uid}/expireDate"),
+        async with self._request(
+            "PUT", f"/api/wireguard/client/{uid}/expireDate",
+            action="при обновлении даты истечения",
             json=payload
         ) as response:
-            if response.status != 200:
-                try:
-                    json_response = await response.json()
-                    error_message = json_response.get("error", "Неизвестная ошибка при обновлении даты истечения.")
-                except aiohttp.ContentTypeError:
-                    error_message = await response.text()
-                logger.debug(f"Ответ сервера при обновлении даты истечения: статус={response.status}, сообщение={error_message}")
-                raise Exception(f"Ошибка при обновлении даты истечения: {error_message}")
-            else:
-                logger.debug(f"Дата истечения клиента '{uid}' успешно обновлена.")
-                # Потребляем тело ответа, чтобы избежать предупреждений
-                try:
-                    await response.text()
-                except Exception as e:
-                    logger.warning(f"Не удалось полностью потребить тело ответа при обновлении даты истечения: {e}")
+            logger.debug(f"Дата истечения клиента '{uid}' успешно обновлена.")
+            self.invalidate_cache()
+            # Потребляем тело ответа, чтобы избежать предупреждений
+            try:
+                await response.text()
+            except Exception as e:
+                logger.warning(f"Не удалось полностью потребить тело ответа при обновлении даты истечения: {e}")
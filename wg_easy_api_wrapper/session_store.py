@@ -0,0 +1,74 @@
+import json
+import logging
+import os
+import stat
+import tempfile
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """
+    Хранит куки авторизованных сессий WG-Easy между запусками.
+
+    Куки записываются в JSON-файл с правами 0600, по одной записи на адрес
+    сервера. Файл перезаписывается атомарно, поэтому одновременные запуски
+    CLI не повреждают его, хотя последний записавший и побеждает.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Путь к файлу хранилища, каталоги создаются при необходимости
+        """
+        self.path = os.path.expanduser(path)
+
+    def load(self, url: str) -> Optional[Dict[str, str]]:
+        """Возвращает сохранённые куки для сервера url или None."""
+        entry = self._read().get(url)
+        if not entry:
+            return None
+        return entry.get("cookies") or None
+
+    def save(self, url: str, cookies: Dict[str, str]):
+        """Сохраняет куки для сервера url."""
+        data = self._read()
+        data[url] = {"cookies": cookies, "saved_at": int(time.time())}
+        self._write(data)
+
+    def clear(self, url: str):
+        """Удаляет сохранённую сессию для сервера url."""
+        data = self._read()
+        if data.pop(url, None) is not None:
+            self._write(data)
+
+    def _read(self) -> dict:
+        try:
+            mode = os.stat(self.path).st_mode
+            if mode & (stat.S_IRWXG | stat.S_IRWXO):
+                logger.warning(
+                    f"Файл сессий {self.path} доступен другим пользователям, "
+                    "выполните chmod 600."
+                )
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except ValueError:
+            logger.warning(f"Файл сессий {self.path} повреждён и будет перезаписан.")
+            return {}
+
+    def _write(self, data: dict):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        # mkstemp создаёт файл с правами 0600
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
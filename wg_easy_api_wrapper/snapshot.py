@@ -0,0 +1,478 @@
+import datetime
+import fnmatch
+import operator
+import re
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .client import parse_timestamp, unix_time
+from .formatting import format_bytes
+
+if TYPE_CHECKING:
+    from .client import Client
+
+# Столбцы снимка. Метки времени хранятся в секундах Unix; отсутствующие
+# значения - None (или NaN в массивах NumPy).
+STRING_COLUMNS = ("uid", "name", "address", "public_key")
+TIMESTAMP_COLUMNS = ("created", "updated", "handshake", "expires")
+COLUMNS = STRING_COLUMNS + ("enabled", "rx", "tx") + TIMESTAMP_COLUMNS
+
+# Вычисляемые столбцы, в секундах относительно момента снимка:
+# idle - с последнего рукопожатия (или создания, если клиент не подключался),
+# age - с создания, expires_in - до истечения срока
+DURATION_COLUMNS = ("idle", "age", "expires_in")
+SIZE_COLUMNS = ("rx", "tx")
+
+FIELDS = COLUMNS + DURATION_COLUMNS
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+_OPERATORS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+GLOB = "~"
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class QueryError(ValueError):
+    """Исключение, возникающее при синтаксической ошибке в запросе."""
+    pass
+
+
+_numpy_module = None
+
+
+def _numpy():
+    """Модуль numpy, если установлен, иначе None; импортируется при первом снимке."""
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy_module = numpy
+    return _numpy_module or None
+
+
+def _epoch(raw: Optional[str]) -> Optional[int]:
+    """Секунды Unix для метки времени WG-Easy; наивное время считается UTC."""
+    if not raw:
+        return None
+    try:
+        moment = datetime.datetime.fromisoformat(raw)
+    except ValueError:
+        # До Python 3.11 fromisoformat не принимает суффикс Z
+        return int(unix_time(parse_timestamp(raw)))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return int(moment.timestamp())
+
+
+def _epoch_array(numpy, raws: List[Optional[str]]):
+    """
+    Метки времени в секундах Unix массивом float с NaN вместо отсутствующих.
+    Строки ISO 8601 разбирает сам NumPy, без объектов datetime на каждую строку.
+    """
+    try:
+        parsed = numpy.array(
+            [(raw[:-1] if raw[-1] == "Z" else raw) if raw else "NaT" for raw in raws],
+            dtype="datetime64[ms]",
+        )
+    except ValueError:
+        # Нестандартный формат - построчно, через общий разбор
+        return numpy.array([numpy.nan if raw is None else raw for raw in map(_epoch, raws)], dtype=float)
+    seconds = (parsed.astype(numpy.int64) // 1000).astype(float)
+    seconds[numpy.isnat(parsed)] = numpy.nan
+    return seconds
+
+
+# Разбор запроса
+
+_TOKEN = re.compile(r"""\s*(?:(?P<paren>[()])|(?P<op>==|!=|>=|<=|=|>|<|~)|'(?P<sq>[^']*)'|"(?P<dq>[^"]*)"|(?P<word>[^\s()=!<>~'"]+))""")
+
+
+def _tokenize(query: str) -> List[tuple]:
+    tokens = []
+    position = 0
+    query = query.rstrip()
+    while position < len(query):
+        match = _TOKEN.match(query, position)
+        if match is None or match.end() == position:
+            raise QueryError(f"Не удалось разобрать запрос с позиции {position}: {query[position:]!r}")
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind in ("sq", "dq"):
+            kind = "string"
+        elif kind == "word" and value.lower() in ("and", "or", "not"):
+            kind, value = value.lower(), value.lower()
+        tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    """
+    Рекурсивный разбор запроса в дерево из кортежей:
+    ("and", a, b), ("or", a, b), ("not", a), ("cmp", поле, оператор, значение),
+    ("field", поле).
+    """
+
+    def __init__(self, query: str):
+        self._tokens = _tokenize(query)
+        self._position = 0
+
+    def _peek(self):
+        return self._tokens[self._position] if self._position < len(self._tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self._position += 1
+        return token
+
+    def parse(self):
+        if not self._tokens:
+            return None
+        tree = self._or()
+        if self._position < len(self._tokens):
+            raise QueryError(f"Лишний фрагмент запроса: {self._peek()[1]!r}")
+        return tree
+
+    def _or(self):
+        tree = self._and()
+        while self._peek()[0] == "or":
+            self._next()
+            tree = ("or", tree, self._and())
+        return tree
+
+    def _and(self):
+        tree = self._not()
+        while self._peek()[0] == "and":
+            self._next()
+            tree = ("and", tree, self._not())
+        return tree
+
+    def _not(self):
+        if self._peek()[0] == "not":
+            self._next()
+            return ("not", self._not())
+        return self._atom()
+
+    def _atom(self):
+        kind, value = self._next()
+        if kind is None:
+            raise QueryError("Запрос оборвался: ожидалось имя поля или скобка.")
+        if kind == "paren" and value == "(":
+            tree = self._or()
+            if self._next() != ("paren", ")"):
+                raise QueryError("Не закрыта скобка.")
+            return tree
+        if kind != "word":
+            raise QueryError(f"Ожидалось имя поля, получено: {value!r}")
+        field = value.lower()
+        if field not in FIELDS:
+            raise QueryError(f"Неизвестное поле: {value}. Доступные: {', '.join(FIELDS)}.")
+        if self._peek()[0] != "op":
+            return ("field", field)
+        _, op = self._next()
+        kind, literal = self._next()
+        if kind not in ("word", "string"):
+            raise QueryError(f"После '{field} {op}' ожидалось значение.")
+        return ("cmp", field, op, _parse_value(field, op, literal))
+
+
+def _parse_number(text: str, units: Dict[str, int], what: str) -> float:
+    match = re.fullmatch(r"(-?\d+(?:\.\d+)?)\s*([A-Za-z]*)", text)
+    unit = match.group(2) if match else None
+    if unit is not None and unit not in units:
+        # Размеры допускают суффиксы вида GB и GiB
+        unit = re.sub(r"i?B$", "", unit, flags=re.IGNORECASE).upper() if what == "размер" else unit
+    if match is None or unit not in units:
+        raise QueryError(f"Некорректный {what}: {text!r}. Суффиксы: {', '.join(u for u in units if u)}.")
+    return float(match.group(1)) * units[unit]
+
+
+def _parse_value(field: str, op: str, text: str):
+    if op == GLOB:
+        if field not in STRING_COLUMNS:
+            raise QueryError(f"Оператор ~ применим только к полям {', '.join(STRING_COLUMNS)}.")
+        return re.compile(fnmatch.translate(text))
+    if field in STRING_COLUMNS:
+        return text
+    if field == "enabled":
+        if text.lower() not in ("true", "false", "yes", "no", "1", "0"):
+            raise QueryError(f"Для enabled ожидается true или false, получено: {text!r}")
+        return text.lower() in ("true", "yes", "1")
+    if field in SIZE_COLUMNS:
+        return _parse_number(text, _SIZE_UNITS, "размер")
+    if field in DURATION_COLUMNS:
+        return _parse_number(text, _DURATION_UNITS, "интервал")
+    # Метки времени: дата YYYY-MM-DD[THH:MM[:SS]] (UTC) или секунды Unix
+    if re.fullmatch(r"\d+", text):
+        return float(text)
+    try:
+        return float(_epoch(text))
+    except (TypeError, ValueError):
+        raise QueryError(f"Некорректная дата: {text!r}. Ожидается YYYY-MM-DD или секунды Unix.") from None
+
+
+def parse_query(query: str):
+    """Разбирает запрос; пустой запрос (None в результате) отбирает всех клиентов."""
+    return _Parser(query or "").parse()
+
+
+class Snapshot:
+    """
+    Снимок клиентов в виде столбцов: параллельных списков или, если
+    установлен NumPy, массивов. Запросы вычисляются по столбцам целиком,
+    а не обращением к атрибутам каждого Client.
+
+    Пример:
+        snapshot = await server.snapshot()
+        idle = snapshot.query("enabled and rx > 1G and idle > 30d").sort("rx", descending=True)
+        for row in idle.rows(["name", "rx", "idle"]):
+            ...
+
+    Синтаксис запроса: сравнения "поле оператор значение", объединённые
+    and, or, not и скобками; операторы = != > >= < <= и ~ (шаблон имени,
+    например name ~ 'office-*'). Размеры rx и tx принимают суффиксы K, M,
+    G, T (по 1024), интервалы idle, age, expires_in - s, m, h, d, w, метки
+    времени - дату YYYY-MM-DD (UTC). Поле без сравнения истинно для
+    включённых клиентов (enabled) или при наличии метки времени
+    (например, not handshake - клиенты, ни разу не подключавшиеся).
+    Сравнение с отсутствующим значением всегда ложно.
+    """
+
+    def __init__(self, columns: Dict[str, Sequence], now: float, clients: Sequence['Client'] = None):
+        """
+        :param columns: Столбцы COLUMNS одинаковой длины
+        :param now: Момент снимка в секундах Unix, от него считаются idle, age, expires_in
+        :param clients: Клиенты в порядке строк, если снимок построен из Client
+            (с NumPy хранятся массивом объектов)
+        """
+        self._np = _numpy()
+        self._columns = dict(columns)
+        self.now = now
+        self._length = len(self._columns["uid"])
+        if self._np is not None and clients is not None and not isinstance(clients, self._np.ndarray):
+            # Массив объектов выбирается по индексам так же быстро, как столбцы
+            array = self._np.empty(len(clients), dtype=object)
+            array[:] = clients
+            clients = array
+        self.clients = clients
+
+    @classmethod
+    def from_clients(cls, clients: Iterable['Client'], now: float = None) -> 'Snapshot':
+        """Строит снимок из клиентов; метки времени разбираются один раз при построении."""
+        clients = list(clients)
+        now = time.time() if now is None else now
+        columns = {
+            "uid": [client.uid for client in clients],
+            "name": [client.name for client in clients],
+            "address": [client.address for client in clients],
+            "public_key": [client.public_key for client in clients],
+            "enabled": [client.enabled for client in clients],
+            "rx": [client.transfer_rx or 0 for client in clients],
+            "tx": [client.transfer_tx or 0 for client in clients],
+            "created": [client.created_at_raw for client in clients],
+            "updated": [client.updated_at_raw for client in clients],
+            "handshake": [client.last_handshake_at_raw for client in clients],
+            "expires": [client.expired_at_raw for client in clients],
+        }
+        numpy = _numpy()
+        if numpy is None:
+            for name in TIMESTAMP_COLUMNS:
+                columns[name] = [_epoch(raw) for raw in columns[name]]
+        else:
+            for name in STRING_COLUMNS:
+                columns[name] = numpy.array(columns[name], dtype=object)
+            columns["enabled"] = numpy.array(columns["enabled"], dtype=bool)
+            for name in SIZE_COLUMNS:
+                columns[name] = numpy.array(columns[name], dtype=numpy.int64)
+            for name in TIMESTAMP_COLUMNS:
+                columns[name] = _epoch_array(numpy, columns[name])
+        return cls(columns, now, clients)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def vectorized(self) -> bool:
+        """Вычисляются ли запросы средствами NumPy."""
+        return self._np is not None
+
+    def column(self, name: str):
+        """Столбец по имени из FIELDS: список или массив NumPy."""
+        if name in self._columns:
+            return self._columns[name]
+        if name not in DURATION_COLUMNS:
+            raise KeyError(name)
+        now = self.now
+        created = self._columns["created"]
+        np = self._np
+        if name == "age":
+            values = now - created if np is not None else [None if c is None else now - c for c in created]
+        elif name == "expires_in":
+            expires = self._columns["expires"]
+            values = expires - now if np is not None else [None if e is None else e - now for e in expires]
+        elif np is not None:
+            handshake = self._columns["handshake"]
+            values = now - np.where(np.isnan(handshake), created, handshake)
+        else:
+            values = [
+                None if (h if h is not None else c) is None else now - (h if h is not None else c)
+                for h, c in zip(self._columns["handshake"], created)
+            ]
+        self._columns[name] = values
+        return values
+
+    # Вычисление запроса
+
+    def mask(self, query: Union[str, tuple, None]):
+        """Булев столбец: какие строки подходят под запрос."""
+        tree = parse_query(query) if isinstance(query, str) or query is None else query
+        if tree is None:
+            return self._np.ones(self._length, dtype=bool) if self._np is not None else [True] * self._length
+        return self._evaluate(tree)
+
+    def _evaluate(self, tree):
+        kind = tree[0]
+        np = self._np
+        if kind in ("and", "or"):
+            left, right = self._evaluate(tree[1]), self._evaluate(tree[2])
+            if np is not None:
+                return left & right if kind == "and" else left | right
+            if kind == "and":
+                return [a and b for a, b in zip(left, right)]
+            return [a or b for a, b in zip(left, right)]
+        if kind == "not":
+            inner = self._evaluate(tree[1])
+            return ~inner if np is not None else [not value for value in inner]
+        if kind == "field":
+            return self._truthy(tree[1])
+        _, field, op, value = tree
+        return self._compare(field, op, value)
+
+    def _truthy(self, field: str):
+        column = self.column(field)
+        np = self._np
+        if field == "enabled":
+            return column.copy() if np is not None else list(column)
+        if field in TIMESTAMP_COLUMNS or field in DURATION_COLUMNS:
+            return ~np.isnan(column) if np is not None else [value is not None for value in column]
+        raise QueryError(f"Поле {field} нельзя использовать без сравнения.")
+
+    def _compare(self, field: str, op: str, value):
+        column = self.column(field)
+        np = self._np
+        if op == GLOB:
+            matches = [value.match(item or "") is not None for item in column]
+            return np.array(matches, dtype=bool) if np is not None else matches
+        compare = _OPERATORS[op]
+        if np is None:
+            return [item is not None and compare(item, value) for item in column]
+        result = compare(column, value)
+        if column.dtype == float:
+            # Сравнение с отсутствующим значением ложно, в том числе !=
+            result &= ~np.isnan(column)
+        return np.asarray(result, dtype=bool)
+
+    # Преобразования снимка
+
+    def take(self, indices: Sequence[int]) -> 'Snapshot':
+        """Новый снимок из строк с индексами indices в заданном порядке."""
+        np = self._np
+        clients = self.clients
+        if np is not None:
+            indices = np.asarray(indices, dtype=np.int64)
+            columns = {name: column[indices] for name, column in self._columns.items()}
+            clients = clients[indices] if clients is not None else None
+        else:
+            columns = {name: [column[i] for i in indices] for name, column in self._columns.items()}
+            clients = [clients[i] for i in indices] if clients is not None else None
+        return Snapshot(columns, self.now, clients)
+
+    def query(self, query: Union[str, tuple, None]) -> 'Snapshot':
+        """Строки, подходящие под запрос."""
+        mask = self.mask(query)
+        if self._np is not None:
+            return self.take(self._np.flatnonzero(mask))
+        return self.take([index for index, matched in enumerate(mask) if matched])
+
+    def sort(self, field: str, descending: bool = False) -> 'Snapshot':
+        """Сортирует строки по полю; строки без значения поля идут последними."""
+        if field not in FIELDS:
+            raise QueryError(f"Неизвестное поле: {field}. Доступные: {', '.join(FIELDS)}.")
+        column = self.column(field)
+        np = self._np
+        if np is not None and column.dtype != object:
+            keys = -column.astype(float) if descending else column
+            # NaN при сортировке NumPy оказываются в конце
+            return self.take(np.argsort(keys, kind="stable"))
+        present = [index for index in range(self._length) if column[index] is not None]
+        missing = [index for index in range(self._length) if column[index] is None]
+        present.sort(key=column.__getitem__, reverse=descending)
+        return self.take(present + missing)
+
+    def head(self, count: int) -> 'Snapshot':
+        """Первые count строк."""
+        return self.take(range(min(count, self._length)))
+
+    def project(self, fields: Iterable[str]) -> Dict[str, list]:
+        """Выбранные столбцы в виде обычных списков; отсутствующие значения - None."""
+        projected = {}
+        for field in fields:
+            if field not in FIELDS:
+                raise QueryError(f"Неизвестное поле: {field}. Доступные: {', '.join(FIELDS)}.")
+            column = self.column(field)
+            if self._np is not None:
+                values = column.tolist()
+                if column.dtype == float:
+                    values = [None if value != value else int(value) for value in values]
+            else:
+                values = [int(value) if isinstance(value, float) else value for value in column]
+            projected[field] = values
+        return projected
+
+    def rows(self, fields: Iterable[str] = COLUMNS) -> Iterator[dict]:
+        """Строки в виде словарей поле -> значение."""
+        fields = list(fields)
+        columns = self.project(fields)
+        for index in range(self._length):
+            yield {field: columns[field][index] for field in fields}
+
+
+def format_duration(seconds: float) -> str:
+    """Интервал в виде 12d 3h, 5h 2m или 40s; отрицательный - с минусом."""
+    sign = "-" if seconds < 0 else ""
+    seconds = int(abs(seconds))
+    parts = []
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60), ("s", 1)):
+        if seconds >= size or (size == 1 and not parts):
+            parts.append(f"{seconds // size}{unit}")
+            seconds %= size
+        if len(parts) == 2:
+            break
+    return sign + " ".join(parts)
+
+
+def table_cell(field: str, value) -> str:
+    """Ячейка таблицы wg-cli query для значения столбца снимка."""
+    if value is None:
+        return "-"
+    if field == "enabled":
+        return "да" if value else "нет"
+    if field in TIMESTAMP_COLUMNS:
+        return time.strftime("%Y-%m-%d %H:%M", time.gmtime(value))
+    if field in DURATION_COLUMNS:
+        return format_duration(value)
+    if field in SIZE_COLUMNS:
+        return format_bytes(value)
+    return str(value)
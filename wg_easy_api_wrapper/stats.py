@@ -0,0 +1,158 @@
+import bisect
+import datetime
+import heapq
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    from .client import Client
+
+# Клиент считается онлайн, если рукопожатие было не раньше стольких секунд назад:
+# WireGuard повторяет рукопожатие каждые 2 минуты активного соединения
+ONLINE_WINDOW = 180
+
+DEFAULT_TOP = 20
+
+# Интервалы давности последнего рукопожатия: метка и верхняя граница в секундах
+HANDSHAKE_BUCKETS: Tuple[Tuple[str, float], ...] = (
+    ("3m", 180),
+    ("1h", 3600),
+    ("1d", 86400),
+    ("7d", 7 * 86400),
+    ("30d", 30 * 86400),
+)
+OLDER = ">30d"
+NEVER = "never"
+
+_BUCKET_BOUNDS = [bound for _, bound in HANDSHAKE_BUCKETS]
+_BUCKET_LABELS = [label for label, _ in HANDSHAKE_BUCKETS] + [OLDER]
+
+
+class TopPeer:
+    """Клиент из списка самых активных по трафику."""
+
+    __slots__ = ("uid", "name", "enabled", "transfer_rx", "transfer_tx", "node")
+
+    def __init__(self, client: 'Client', node: str = None):
+        self.uid = client.uid
+        self.name = client.name
+        self.enabled = client.enabled
+        self.transfer_rx = client.transfer_rx or 0
+        self.transfer_tx = client.transfer_tx or 0
+        self.node = node
+
+    @property
+    def transfer_total(self) -> int:
+        return self.transfer_rx + self.transfer_tx
+
+    def as_dict(self) -> dict:
+        data = {
+            "uid": self.uid,
+            "name": self.name,
+            "enabled": self.enabled,
+            "transfer_rx": self.transfer_rx,
+            "transfer_tx": self.transfer_tx,
+            "transfer_total": self.transfer_total,
+        }
+        if self.node is not None:
+            data = {"node": self.node, **data}
+        return data
+
+
+class ClientStats:
+    """Сводка по клиентам: количество, трафик, давность рукопожатий и самые активные клиенты."""
+
+    __slots__ = ("total", "enabled", "online", "transfer_rx", "transfer_tx", "handshake_ages", "top", "online_window")
+
+    def __init__(self, online_window: float = ONLINE_WINDOW):
+        self.total = 0
+        self.enabled = 0
+        self.online = 0
+        self.transfer_rx = 0
+        self.transfer_tx = 0
+        # Метка интервала -> число клиентов, в порядке HANDSHAKE_BUCKETS, затем OLDER и NEVER
+        self.handshake_ages: Dict[str, int] = dict.fromkeys(_BUCKET_LABELS + [NEVER], 0)
+        self.top: List[TopPeer] = []
+        self.online_window = online_window
+
+    def as_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "enabled": self.enabled,
+            "online": self.online,
+            "online_window": self.online_window,
+            "transfer_rx": self.transfer_rx,
+            "transfer_tx": self.transfer_tx,
+            "handshake_ages": dict(self.handshake_ages),
+            "top": [peer.as_dict() for peer in self.top],
+        }
+
+
+class StatsCollector:
+    """
+    Считает ClientStats за один проход: клиенты передаются в add по одному,
+    например прямо из Server.iter_clients, и не хранятся. Для топа по
+    трафику держится куча из top элементов, поэтому весь список не сортируется.
+    """
+
+    def __init__(self, top: int = DEFAULT_TOP, now: datetime.datetime = None, online_window: float = ONLINE_WINDOW):
+        """
+        :param top: Сколько самых активных клиентов запомнить, 0 - не собирать топ
+        :param now: Текущее время UTC; по умолчанию datetime.utcnow()
+        :param online_window: Давность рукопожатия в секундах, при которой клиент онлайн
+        """
+        self._stats = ClientStats(online_window)
+        self._top = top
+        self._now = now or datetime.datetime.utcnow()
+        # (трафик, -номер, клиент, узел): при равном трафике остаётся встреченный раньше
+        self._heap: List[tuple] = []
+        self._seen = 0
+
+    def add(self, client: 'Client', node: str = None):
+        stats = self._stats
+        stats.total += 1
+        if client.enabled:
+            stats.enabled += 1
+        rx = client.transfer_rx or 0
+        tx = client.transfer_tx or 0
+        stats.transfer_rx += rx
+        stats.transfer_tx += tx
+
+        handshake = client.last_handshake_at
+        if handshake is None:
+            stats.handshake_ages[NEVER] += 1
+        else:
+            age = (self._now - handshake).total_seconds()
+            if age <= stats.online_window:
+                stats.online += 1
+            stats.handshake_ages[_BUCKET_LABELS[bisect.bisect_left(_BUCKET_BOUNDS, age)]] += 1
+
+        if self._top:
+            self._seen += 1
+            entry = (rx + tx, -self._seen, client, node)
+            if len(self._heap) < self._top:
+                heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+
+    def add_many(self, clients: Iterable['Client'], node: str = None):
+        for client in clients:
+            self.add(client, node)
+
+    def result(self) -> ClientStats:
+        """Сводка по добавленным клиентам; топ упорядочен по убыванию трафика."""
+        stats = self._stats
+        entries = sorted(self._heap, key=lambda entry: entry[:2], reverse=True)
+        stats.top = [TopPeer(client, node) for _, _, client, node in entries]
+        return stats
+
+
+def compute_stats(
+    clients: Iterable['Client'],
+    top: int = DEFAULT_TOP,
+    now: datetime.datetime = None,
+    online_window: float = ONLINE_WINDOW,
+) -> ClientStats:
+    """Сводка по клиентам за один проход, см. StatsCollector."""
+    collector = StatsCollector(top=top, now=now, online_window=online_window)
+    collector.add_many(clients)
+    return collector.result()
@@ -10,8 +10,6 @@ from dotenv import load_dotenv
 from .server import Server
 from .words_generator import get_random_name
 
-# Настройка логирования
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 @click.group()
@@ -22,3 +22,22 @@ def get_random_name() -> str:
     adj = random.choice(ADJECTIVES)
     noun = random.choice(NOUNS)
     return f"{adj}-{noun}"
+
+def get_random_names(count: int) -> list:
+    """
+    Возвращает count уникальных случайных имён.
+    Когда сочетания слов заканчиваются, к имени добавляется числовой суффикс,
+    например 'happy-lion-2'.
+    """
+    names = []
+    seen = set()
+    while len(names) < count:
+        name = get_random_name()
+        if name in seen:
+            suffix = 2
+            while f"{name}-{suffix}" in seen:
+                suffix += 1
+            name = f"{name}-{suffix}"
+        seen.add(name)
+        names.append(name)
+    return names